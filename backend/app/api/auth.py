@@ -1,13 +1,30 @@
-from fastapi import APIRouter, Request, HTTPException
+from fastapi import APIRouter, Depends, Request, HTTPException
 from fastapi.responses import RedirectResponse
+from app.container import get_linkedin_service
 from app.services.linkedin_service import LinkedInService
 import os
 
 router = APIRouter()
-linkedin_service = LinkedInService()
+
+def _save_access_token(access_token):
+    """Write the access token to the .env file"""
+    with open('.env', 'r') as f:
+        env_content = f.read()
+    
+    # Update or add the access token
+    if 'LINKEDIN_ACCESS_TOKEN=' in env_content:
+        env_content = env_content.replace(
+            'LINKEDIN_ACCESS_TOKEN=.*',
+            f'LINKEDIN_ACCESS_TOKEN={access_token}'
+        )
+    else:
+        env_content += f'\nLINKEDIN_ACCESS_TOKEN={access_token}'
+    
+    with open('.env', 'w') as f:
+        f.write(env_content)
 
 @router.get("/login")
-async def login():
+async def login(linkedin_service: LinkedInService = Depends(get_linkedin_service)):
     """
     Redirect to LinkedIn OAuth login page
     """
@@ -15,7 +32,7 @@ async def login():
     return RedirectResponse(url=auth_url)
 
 @router.get("/callback")
-async def callback(request: Request):
+async def callback(request: Request, linkedin_service: LinkedInService = Depends(get_linkedin_service)):
     """
     Handle LinkedIn OAuth callback
     """
@@ -25,24 +42,13 @@ async def callback(request: Request):
         if not code:
             raise HTTPException(status_code=400, detail="No authorization code provided")
 
-        # Exchange the code for an access token
-        access_token = linkedin_service.authentication.get_access_token(code)
+        # Exchange the code for an access token (a blocking call in the legacy client)
+        access_token = await linkedin_service.legacy.run(
+            lambda: linkedin_service.authentication.get_access_token(code)
+        )
         
         # Save the access token to .env file
-        with open('.env', 'r') as f:
-            env_content = f.read()
-        
-        # Update or add the access token
-        if 'LINKEDIN_ACCESS_TOKEN=' in env_content:
-            env_content = env_content.replace(
-                'LINKEDIN_ACCESS_TOKEN=.*',
-                f'LINKEDIN_ACCESS_TOKEN={access_token}'
-            )
-        else:
-            env_content += f'\nLINKEDIN_ACCESS_TOKEN={access_token}'
-        
-        with open('.env', 'w') as f:
-            f.write(env_content)
+        await linkedin_service.io.run(_save_access_token, access_token)
 
         return {"message": "Successfully authenticated with LinkedIn"}
     except Exception as e:
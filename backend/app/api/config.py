@@ -1,11 +1,13 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Path
 from pydantic import BaseModel
-from app.services.config_service import ConfigService
+from app.container import ServiceContainer, get_container
 from typing import Optional
 from datetime import datetime
 
 router = APIRouter()
-config_service = ConfigService()
+
+# Account IDs name a data directory, so keep them to safe path characters
+ACCOUNT_ID_PATTERN = "^[A-Za-z0-9_-]{1,64}$"
 
 class LinkedInCredentials(BaseModel):
     client_id: str
@@ -13,27 +15,27 @@ class LinkedInCredentials(BaseModel):
     access_token: Optional[str] = None
 
 @router.post("/credentials")
-async def save_credentials(credentials: LinkedInCredentials):
+async def save_credentials(credentials: LinkedInCredentials, container: ServiceContainer = Depends(get_container)):
     """Save LinkedIn credentials"""
     try:
-        config_service.save_credentials(credentials.dict())
+        await container.io_executor.run(container.config_service.save_credentials, credentials.dict())
         return {"message": "Credentials saved successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/credentials")
-async def get_credentials():
+async def get_credentials(container: ServiceContainer = Depends(get_container)):
     """Get stored LinkedIn credentials"""
-    credentials = config_service.get_credentials()
+    credentials = await container.io_executor.run(container.config_service.get_credentials)
     if not credentials:
         raise HTTPException(status_code=404, detail="No credentials found")
     return credentials
 
 @router.get("/status")
-async def get_config_status():
+async def get_config_status(container: ServiceContainer = Depends(get_container)):
     """Get configuration status"""
-    credentials = config_service.get_credentials()
-    last_updated = config_service.get_last_updated()
+    credentials = await container.io_executor.run(container.config_service.get_credentials)
+    last_updated = await container.io_executor.run(container.config_service.get_last_updated)
     
     return {
         "is_configured": credentials is not None,
@@ -41,10 +43,42 @@ async def get_config_status():
     }
 
 @router.delete("/credentials")
-async def clear_credentials():
+async def clear_credentials(container: ServiceContainer = Depends(get_container)):
     """Clear stored credentials"""
     try:
-        config_service.clear_credentials()
+        await container.io_executor.run(container.config_service.clear_credentials)
         return {"message": "Credentials cleared successfully"}
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e)) 
+
+@router.get("/accounts")
+async def list_accounts(container: ServiceContainer = Depends(get_container)):
+    """List managed LinkedIn accounts"""
+    accounts = await container.io_executor.run(container.config_service.list_accounts)
+    return {"accounts": accounts}
+
+@router.put("/accounts/{account_id}")
+async def save_account_credentials(
+    credentials: LinkedInCredentials,
+    account_id: str = Path(..., pattern=ACCOUNT_ID_PATTERN),
+    container: ServiceContainer = Depends(get_container)
+):
+    """Save credentials for a managed LinkedIn account"""
+    try:
+        await container.io_executor.run(
+            container.config_service.save_account_credentials, account_id, credentials.dict()
+        )
+        return {"message": "Account saved successfully"}
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.delete("/accounts/{account_id}")
+async def remove_account(
+    account_id: str = Path(..., pattern=ACCOUNT_ID_PATTERN),
+    container: ServiceContainer = Depends(get_container)
+):
+    """Remove a managed LinkedIn account"""
+    if not await container.io_executor.run(container.config_service.remove_account, account_id):
+        raise HTTPException(status_code=404, detail="Account not found")
+    await container.io_executor.run(container.evict_account, account_id)
+    return {"message": "Account removed successfully"}
\ No newline at end of file
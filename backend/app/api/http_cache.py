@@ -0,0 +1,56 @@
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Optional
+import orjson
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+def make_etag(*parts) -> str:
+    """Weak ETag over the values a response is derived from (weak, since compression changes the bytes)"""
+    return 'W/"' + hashlib.sha256(repr(parts).encode()).hexdigest()[:32] + '"'
+
+def content_etag(content: Any) -> str:
+    """Weak ETag over a JSON body itself, for responses with no stored version to derive one from.
+
+    Keys are sorted, so the same data gives the same ETag whether it was just fetched or decoded
+    from the shared cache, on every worker and across restarts.
+    """
+    body = orjson.dumps(content, default=jsonable_encoder, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SORT_KEYS)
+    return 'W/"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+# For responses whose URL names exactly one representation forever
+IMMUTABLE = "public, max-age=31536000, immutable"
+
+def validator_headers(etag: str, last_modified: Optional[datetime] = None) -> Dict[str, str]:
+    """ETag/Last-Modified headers; no-cache makes clients revalidate instead of reusing blindly"""
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if last_modified is not None:
+        # Naive timestamps are local time, as written by datetime.now()
+        headers["Last-Modified"] = format_datetime(last_modified.astimezone(timezone.utc), usegmt=True)
+    return headers
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """Evaluate If-None-Match, falling back to If-Modified-Since when no ETag was sent"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # Weak comparison: W/"x" and "x" match
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or etag.removeprefix("W/") in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        return last_modified.astimezone(timezone.utc).replace(microsecond=0) <= since
+    return False
+
+def conditional(request: Request, response: Response, etag: str,
+                last_modified: Optional[datetime] = None) -> Optional[Response]:
+    """Return a 304 if the client's copy is current; otherwise add validators to the response"""
+    headers = validator_headers(etag, last_modified)
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    response.headers.update(headers)
+    return None
\ No newline at end of file
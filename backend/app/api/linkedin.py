@@ -1,46 +1,521 @@
-from fastapi import APIRouter, HTTPException
-from app.services.linkedin_service import LinkedInService
-from app.services.config_service import ConfigService
+import asyncio
+import logging
+import math
+from contextlib import AsyncExitStack
+from datetime import datetime
+from typing import AsyncIterator, Awaitable, Callable, Collection, Dict, FrozenSet, List, Literal, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse, StreamingResponse
+from pydantic import BaseModel, Field
+from app.config import settings
+from app.api.http_cache import IMMUTABLE, conditional, content_etag, is_not_modified, make_etag
+from app.api.responses import ORJSONResponse, dumps, trusted_json
+from app.container import ServiceContainer, get_container, get_credentials
+from app.services.cache_service import credential_key
+from app.services.export_service import EXPORT_FORMATS, ExportService
+from app.services.linkedin_service import PROFILE_FIELDS, LinkedInService
+from app.services.media_cache import MediaNotFound, parse_media_name
+from app.services.storage_service import POST_COLUMNS
+from app.services.upstream_scheduler import BACKGROUND, LinkedInAPIError, UpstreamUnavailable, upstream_priority
 
 router = APIRouter()
-linkedin_service = LinkedInService()
-config_service = ConfigService()
+
+logger = logging.getLogger(__name__)
+
+class BatchRequest(BaseModel):
+    accounts: List[str] = Field(..., min_length=1)
+    resources: List[Literal["profile", "posts", "articles"]] = Field(["profile"], min_length=1)
+    limit: int = Field(50, ge=1, le=500)
+    concurrency: Optional[int] = Field(None, ge=1)
+
+def _upstream_error(e: LinkedInAPIError) -> HTTPException:
+    """Translate an upstream failure into the matching HTTP error"""
+    status_code = e.status if e.status in (401, 403, 404, 429, 503) else 502
+    headers = {"Retry-After": str(math.ceil(e.retry_after))} if e.retry_after else None
+    return HTTPException(status_code=status_code, detail=str(e), headers=headers)
+
+def _internal_error(e: Exception) -> HTTPException:
+    """Log an unexpected failure with its traceback and turn it into a 500"""
+    logger.exception("Unhandled error in LinkedIn route")
+    return HTTPException(status_code=500, detail=str(e))
+
+async def _sync(container: ServiceContainer, credentials: dict, data_type: str,
+                linkedin_service: Optional[LinkedInService] = None):
+    """Pull upstream changes at most once per cache TTL; stored data is still served while upstream is down"""
+    linkedin_service = linkedin_service or container.linkedin_service
+    sync = linkedin_service.sync_posts if data_type == "posts" else linkedin_service.sync_articles
+    account = credential_key(credentials)
+
+    async def run() -> int:
+        changed = await sync(credentials)
+        if changed:
+            # Pages and analytics built from the old data are out of date on every node
+            await container.response_cache.invalidate_resources(account, data_type, "analytics")
+        return changed
+
+    try:
+        await container.response_cache.get_or_fetch((account, data_type), run)
+    except UpstreamUnavailable:
+        pass
+
+def _parse_fields(fields: Optional[str], allowed: Collection[str]) -> Optional[FrozenSet[str]]:
+    """Parse a comma-separated fields= value; None means every field"""
+    requested = frozenset(field.strip() for field in (fields or "").split(",") if field.strip())
+    unknown = requested - set(allowed)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+    return requested if requested and len(requested) < len(allowed) else None
+
+def _projection_key(container: ServiceContainer, base: tuple,
+                    fields: Optional[FrozenSet[str]]) -> Tuple[tuple, Optional[FrozenSet[str]]]:
+    """Cache key to serve a field projection from, and the fields its entry holds (None for every field).
+
+    Projections are cached under the base key plus their sorted fields; a fresh entry with every
+    requested field, such as the full response, answers a narrower request without a fetch.
+    """
+    if fields is None:
+        return base, None
+    size = len(base)
+    wider = container.response_cache.find(
+        lambda key: key[:size] == base and (len(key) == size or (len(key) == size + 1 and fields <= set(key[size])))
+    )
+    if wider is None:
+        return base + (tuple(sorted(fields)),), fields
+    return wider, frozenset(wider[size]) if len(wider) > size else None
+
+async def _stored_response(request: Request, response: Response, container: ServiceContainer, account: str,
+                           resource: str, params: tuple, fetch: Callable[[Optional[FrozenSet[str]]], Awaitable],
+                           fields: Optional[FrozenSet[str]] = None, project: Optional[Callable] = None) -> Response:
+    """Serve a response built from stored posts through both cache tiers, validated by the stored data version.
+
+    The version only changes when a post does, so the same data keeps its ETag across restarts and after
+    cache refills, and a sync that changes it also drops the cached responses built from it. The validator
+    is checked first: a 304 never syncs or reads a row, and stored data is kept current by the background
+    refresh and by requests that miss the cache. fetch gets the fields the entry will hold; project
+    narrows a wider entry to the requested fields.
+    """
+    base = (account, resource) + params
+    version, modified = await container.linkedin_service.get_data_state()
+    etag = make_etag(*base, version, sorted(fields) if fields else None)
+    not_modified = conditional(request, response, etag, modified)
+    if not_modified:
+        return not_modified
+    key, stored = _projection_key(container, base, fields)
+    data = await container.response_cache.get_or_fetch(key, lambda: fetch(stored), shared=True)
+    return trusted_json(project(data, fields) if project and stored != fields else data, response)
+
+def _project(item: Dict, fields: FrozenSet[str]) -> Dict:
+    return {name: value for name, value in item.items() if name in fields}
+
+def _project_items(page: Dict, fields: FrozenSet[str]) -> Dict:
+    return {**page, "items": [_project(item, fields) for item in page["items"]]}
 
 @router.get("/profile")
-async def get_profile():
-    """Get LinkedIn profile data"""
+async def get_profile(
+    request: Request,
+    response: Response,
+    fields: Optional[str] = Query(None, description="Comma-separated profile fields to return"),
+    container: ServiceContainer = Depends(get_container)
+):
+    """Get LinkedIn profile data; with fields=, only those fields are fetched from LinkedIn and returned"""
     try:
-        credentials = config_service.get_credentials()
+        credentials = await get_credentials(container)
         if not credentials:
             raise HTTPException(status_code=401, detail="LinkedIn credentials not configured")
-        
-        profile = await linkedin_service.get_profile(credentials)
-        return profile
+
+        fields = _parse_fields(fields, PROFILE_FIELDS)
+        key, stored = _projection_key(container, (credential_key(credentials), "profile"), fields)
+
+        def project(profile: Dict) -> Dict:
+            return profile if stored == fields else _project(profile, fields)
+
+        # Validated by a hash of the profile itself; a fresh cached copy answers without calling LinkedIn
+        cached = container.response_cache.peek(key)
+        if cached is not None:
+            not_modified = conditional(request, response, content_etag(project(cached)))
+            if not_modified:
+                return not_modified
+        profile = project(await container.response_cache.get_or_fetch(
+            key, lambda: container.linkedin_service.get_profile(credentials, stored), shared=True
+        ))
+        return conditional(request, response, content_etag(profile)) or trusted_json(profile, response)
+    except HTTPException:
+        raise
+    except LinkedInAPIError as e:
+        raise _upstream_error(e)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise _internal_error(e)
+
+@router.get("/media/stats")
+async def get_media_stats(container: ServiceContainer = Depends(get_container)):
+    """Get media cache hit/miss/resize/eviction counters and its size on disk"""
+    return container.media_cache.stats()
+
+@router.get("/media/{name}")
+async def get_media(
+    request: Request,
+    name: str,
+    w: Optional[int] = Query(None, description="Width to scale down to; one of MEDIA_WIDTHS"),
+    container: ServiceContainer = Depends(get_container)
+):
+    """Serve a cached image by content hash, resized to w on first request.
+
+    The URL names one image forever, so browsers may keep it without revalidating. FileResponse
+    streams the file from disk in chunks rather than reading it into memory first.
+    """
+    parsed = parse_media_name(name)
+    if parsed is None:
+        raise HTTPException(status_code=404, detail="Image not found")
+    if w is not None and w not in settings.MEDIA_WIDTHS:
+        raise HTTPException(status_code=400, detail=f"w must be one of {settings.MEDIA_WIDTHS}")
+    digest, ext = parsed
+    headers = {"ETag": f'"{digest[:32]}-{w or 0}"', "Cache-Control": IMMUTABLE}
+    if is_not_modified(request, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    try:
+        path, stat_result = await container.media_cache.open(digest, ext, w)
+    except MediaNotFound:
+        raise HTTPException(status_code=404, detail="Image not found")
+    except LinkedInAPIError as e:
+        raise _upstream_error(e)
+    except Exception as e:
+        raise _internal_error(e)
+    return FileResponse(path, headers=headers, stat_result=stat_result)
 
 @router.get("/posts")
-async def get_posts():
-    """Get LinkedIn posts"""
+async def get_posts(
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    fields: Optional[str] = Query(None, description="Comma-separated post fields to return"),
+    container: ServiceContainer = Depends(get_container)
+):
+    """Get a page of LinkedIn posts, newest first; with fields=, only those columns are read and returned"""
     try:
-        credentials = config_service.get_credentials()
+        credentials = await get_credentials(container)
         if not credentials:
             raise HTTPException(status_code=401, detail="LinkedIn credentials not configured")
         
-        posts = await linkedin_service.get_posts(credentials)
-        return posts
+        fields = _parse_fields(fields, POST_COLUMNS)
+
+        async def load(stored: Optional[FrozenSet[str]]) -> Dict:
+            # Sync upstream changes before building the first page
+            if cursor is None:
+                await _sync(container, credentials, "posts")
+            return await container.linkedin_service.get_posts(cursor, limit, stored)
+
+        return await _stored_response(
+            request, response, container, credential_key(credentials), "posts", (cursor, limit), load,
+            fields, _project_items
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
+    except LinkedInAPIError as e:
+        raise _upstream_error(e)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise _internal_error(e)
+
+@router.get("/posts/search")
+async def search_posts(
+    q: str = Query(..., min_length=1, max_length=500),
+    post_type: Optional[str] = Query(None, alias="type", pattern="^(post|article)$"),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    container: ServiceContainer = Depends(get_container)
+):
+    """Search stored posts and articles; supports "quoted phrases", prefix* terms, OR and NOT"""
+    try:
+        credentials = await get_credentials(container)
+        if not credentials:
+            raise HTTPException(status_code=401, detail="LinkedIn credentials not configured")
+
+        return ORJSONResponse(await container.linkedin_service.search_posts(q, post_type, start, end, cursor, limit))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise _internal_error(e)
+
+@router.get("/posts/trending")
+async def get_trending_posts(
+    window_hours: float = Query(24, gt=0, le=24 * 365),
+    limit: int = Query(10, ge=1, le=100),
+    metric: str = Query("likes", pattern="^(likes|comments|shares)$"),
+    post_type: Optional[str] = Query(None, alias="type", pattern="^(post|article)$"),
+    container: ServiceContainer = Depends(get_container)
+):
+    """Get the posts that gained the most engagement over the last window_hours"""
+    try:
+        credentials = await get_credentials(container)
+        if not credentials:
+            raise HTTPException(status_code=401, detail="LinkedIn credentials not configured")
+
+        return await container.engagement_service.trending(window_hours, limit, metric, post_type)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise _internal_error(e)
+
+async def _engagement_query(container: ServiceContainer, query) -> Dict:
+    """Run a per-post engagement query, turning a post without history into a 404"""
+    try:
+        credentials = await get_credentials(container)
+        if not credentials:
+            raise HTTPException(status_code=401, detail="LinkedIn credentials not configured")
+
+        result = await query(container.engagement_service)
+        if result is None:
+            raise HTTPException(status_code=404, detail="No engagement history for this post")
+        return result
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise _internal_error(e)
+
+@router.get("/posts/{post_id}/engagement")
+async def get_engagement_history(post_id: str, container: ServiceContainer = Depends(get_container)):
+    """Get the like/comment/share counts recorded for a post at each refresh"""
+    return await _engagement_query(container, lambda service: service.history(post_id))
+
+@router.get("/posts/{post_id}/velocity")
+async def get_engagement_velocity(
+    post_id: str,
+    window_hours: float = Query(24, gt=0, le=24 * 365),
+    container: ServiceContainer = Depends(get_container)
+):
+    """Get the engagement a post gained per hour over the last window_hours"""
+    return await _engagement_query(container, lambda service: service.velocity(post_id, window_hours))
+
+@router.get("/posts/{post_id}/time-to-likes")
+async def get_time_to_likes(
+    post_id: str,
+    likes: int = Query(..., ge=1),
+    container: ServiceContainer = Depends(get_container)
+):
+    """Get how long after publication a post first reached a number of likes"""
+    return await _engagement_query(container, lambda service: service.time_to_likes(post_id, likes))
 
 @router.get("/articles")
-async def get_articles():
-    """Get LinkedIn articles"""
+async def get_articles(
+    request: Request,
+    response: Response,
+    cursor: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=500),
+    fields: Optional[str] = Query(None, description="Comma-separated article fields to return"),
+    container: ServiceContainer = Depends(get_container)
+):
+    """Get a page of LinkedIn articles, newest first; with fields=, only those columns are read and returned"""
     try:
-        credentials = config_service.get_credentials()
+        credentials = await get_credentials(container)
         if not credentials:
             raise HTTPException(status_code=401, detail="LinkedIn credentials not configured")
         
-        articles = await linkedin_service.get_articles(credentials)
-        return articles
+        fields = _parse_fields(fields, POST_COLUMNS)
+
+        async def load(stored: Optional[FrozenSet[str]]) -> Dict:
+            # Sync upstream changes before building the first page
+            if cursor is None:
+                await _sync(container, credentials, "articles")
+            return await container.linkedin_service.get_articles(cursor, limit, stored)
+
+        return await _stored_response(
+            request, response, container, credential_key(credentials), "articles", (cursor, limit), load,
+            fields, _project_items
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
+    except LinkedInAPIError as e:
+        raise _upstream_error(e)
+    except Exception as e:
+        raise _internal_error(e)
+
+@router.get("/analytics")
+async def get_analytics(
+    request: Request,
+    response: Response,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    granularity: str = Query("day", pattern="^(day|week|month)$"),
+    post_type: Optional[str] = Query(None, alias="type", pattern="^(post|article)$"),
+    top: int = Query(10, ge=1, le=100),
+    container: ServiceContainer = Depends(get_container)
+):
+    """Get engagement analytics aggregated from stored posts and articles"""
+    try:
+        credentials = await get_credentials(container)
+        if not credentials:
+            raise HTTPException(status_code=401, detail="LinkedIn credentials not configured")
+
+        account = credential_key(credentials)
+
+        async def load(_) -> Dict:
+            await asyncio.gather(_sync(container, credentials, "posts"), _sync(container, credentials, "articles"))
+            return await container.analytics_service.get_analytics(account, start, end, granularity, post_type, top)
+
+        return await _stored_response(
+            request, response, container, account, "analytics", (start, end, granularity, post_type, top), load
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
+    except LinkedInAPIError as e:
+        raise _upstream_error(e)
+    except Exception as e:
+        raise _internal_error(e)
+
+@router.get("/export")
+async def export_posts(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    post_type: Optional[str] = Query(None, alias="type", pattern="^(post|article)$"),
+    gzip: bool = False,
+    account: Optional[str] = None,
+    container: ServiceContainer = Depends(get_container)
+):
+    """Stream the full stored post and article history as NDJSON or CSV, oldest first"""
+    # A managed account's storage stays leased until the last chunk is sent
+    leases = AsyncExitStack()
+    try:
+        try:
+            if account:
+                credentials = await container.io_executor.run(container.config_service.get_account_credentials, account)
+                if not credentials:
+                    raise HTTPException(status_code=404, detail="Unknown account")
+                linkedin_service = await leases.enter_async_context(container.account_service(account))
+            else:
+                credentials = await get_credentials(container)
+                if not credentials:
+                    raise HTTPException(status_code=401, detail="LinkedIn credentials not configured")
+                linkedin_service = container.linkedin_service
+
+            # Bring storage up to date first; the export itself never touches LinkedIn
+            data_types = [f"{post_type}s"] if post_type else ["posts", "articles"]
+            await asyncio.gather(*[
+                _sync(container, credentials, data_type, linkedin_service) for data_type in data_types
+            ])
+        except HTTPException:
+            raise
+        except LinkedInAPIError as e:
+            raise _upstream_error(e)
+        except Exception as e:
+            raise _internal_error(e)
+    except BaseException:
+        await leases.aclose()
+        raise
+
+    exporter = ExportService(linkedin_service.storage, container.io_executor)
+
+    async def stream() -> AsyncIterator[bytes]:
+        async with leases:
+            async for chunk in exporter.stream(format, start, end, post_type, compress=gzip):
+                yield chunk
+
+    filename = f"linkedin-export.{format}" + (".gz" if gzip else "")
+    return StreamingResponse(
+        stream(),
+        media_type="application/gzip" if gzip else EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+@router.get("/analytics/rollups/check")
+async def check_rollups(container: ServiceContainer = Depends(get_container)):
+    """Diff the incrementally maintained rollups against a rebuild from raw posts"""
+    return await container.analytics_service.check_consistency()
+
+@router.post("/analytics/rollups/rebuild")
+async def rebuild_rollups(container: ServiceContainer = Depends(get_container)):
+    """Rebuild the rollups from raw posts if they have drifted"""
+    return await container.analytics_service.check_consistency(repair=True)
+
+async def _fetch_account_resource(container: ServiceContainer, account_id: str, resource: str,
+                                  limit: int) -> Dict:
+    """Fetch one resource for a managed account, turning failures into a per-item error"""
+    result = {"account": account_id, "resource": resource}
+    try:
+        credentials = await container.io_executor.run(container.config_service.get_account_credentials, account_id)
+        if not credentials:
+            raise HTTPException(status_code=404, detail="Unknown account")
+        async with container.account_service(account_id) as linkedin_service:
+            if resource == "profile":
+                data = await container.response_cache.get_or_fetch(
+                    (credential_key(credentials), "profile"),
+                    lambda: linkedin_service.get_profile(credentials),
+                    shared=True
+                )
+            else:
+                await _sync(container, credentials, resource, linkedin_service)
+                page = linkedin_service.get_posts if resource == "posts" else linkedin_service.get_articles
+                data = await page(None, limit)
+        return {**result, "status": 200, "data": data}
+    except HTTPException as e:
+        return {**result, "status": e.status_code, "error": e.detail}
+    except LinkedInAPIError as e:
+        error = _upstream_error(e)
+        return {**result, "status": error.status_code, "error": error.detail, "retry_after": e.retry_after}
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e)) 
\ No newline at end of file
+        logger.exception("Batch fetch of %s for %s failed", resource, account_id)
+        return {**result, "status": 500, "error": str(e)}
+
+async def _stream_batch(container: ServiceContainer, batch: BatchRequest, concurrency: int) -> AsyncIterator[str]:
+    """Run the batch with at most `concurrency` items in flight, yielding NDJSON lines as items finish"""
+    # Bulk fetches queue behind interactive requests for the upstream budget
+    upstream_priority.set(BACKGROUND)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(account_id: str, resource: str) -> Dict:
+        async with semaphore:
+            return await _fetch_account_resource(container, account_id, resource, batch.limit)
+
+    tasks = [
+        asyncio.ensure_future(run(account_id, resource))
+        for account_id in dict.fromkeys(batch.accounts)
+        for resource in dict.fromkeys(batch.resources)
+    ]
+    try:
+        for finished in asyncio.as_completed(tasks):
+            yield dumps(await finished) + b"\n"
+    finally:
+        # The client went away or the stream failed; don't keep spending upstream budget
+        for task in tasks:
+            task.cancel()
+
+@router.post("/batch")
+async def batch_fetch(batch: BatchRequest, container: ServiceContainer = Depends(get_container)):
+    """Fetch resources for many managed accounts, streaming one NDJSON line per (account, resource)"""
+    items = len(set(batch.accounts)) * len(set(batch.resources))
+    if items > settings.LINKEDIN_BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=400, detail=f"Batch exceeds {settings.LINKEDIN_BATCH_MAX_ITEMS} items")
+    # More items in flight than the app-wide burst would only queue inside the upstream scheduler
+    concurrency = min(
+        batch.concurrency or settings.LINKEDIN_BATCH_CONCURRENCY,
+        settings.LINKEDIN_BATCH_CONCURRENCY,
+        max(1, int(container.scheduler.app_bucket.capacity))
+    )
+    return StreamingResponse(_stream_batch(container, batch, concurrency), media_type="application/x-ndjson")
+
+@router.get("/cache/stats")
+async def get_cache_stats(container: ServiceContainer = Depends(get_container)):
+    """Get response cache hit/miss/coalesce counters, including the shared tier's"""
+    return container.response_cache.stats()
+
+@router.get("/upstream/stats")
+async def get_upstream_stats(container: ServiceContainer = Depends(get_container)):
+    """Get upstream scheduler request/retry/throttle counters and circuit state"""
+    return container.scheduler.stats()
+
+@router.get("/refresh/stats")
+async def get_refresh_stats(container: ServiceContainer = Depends(get_container)):
+    """Get background refresh counters and the seconds until each job is next due"""
+    return await container.refresh_scheduler.stats()
\ No newline at end of file
@@ -0,0 +1,50 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from app.config import settings
+from app.container import ServiceContainer, get_container
+from app.services.metrics import REGISTRY, gauge_from
+
+router = APIRouter()
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics(container: ServiceContainer = Depends(get_container)):
+    """Expose metrics in the Prometheus text format"""
+    # Point-in-time state, read only from services that already exist
+    extra = []
+    if "response_cache" in container.__dict__:
+        extra.append(gauge_from("response_cache_state", "Response cache size and in-flight fetches", "stat",
+                                {k: v for k, v in container.response_cache.stats().items()
+                                 if k in ("entries", "inflight", "max_entries", "hit_ratio")}))
+    if "scheduler" in container.__dict__:
+        stats = container.scheduler.stats()
+        extra.append(gauge_from("linkedin_upstream_scheduler_state", "Upstream scheduler counters and queue depth",
+                                "stat", stats))
+        extra.append(gauge_from("linkedin_circuit_open", "1 while the LinkedIn circuit breaker is open", "breaker",
+                                {"linkedin": int(container.scheduler.breaker.state == "open")}))
+    return PlainTextResponse(REGISTRY.render(extra), media_type="text/plain; version=0.0.4")
+
+def _require_profiler():
+    if not settings.PROFILER_ENABLED:
+        raise HTTPException(status_code=403, detail="Profiler is disabled (set PROFILER_ENABLED=true)")
+
+@router.get("/api/debug/profiler")
+async def get_profiler_status(container: ServiceContainer = Depends(get_container)):
+    """Get sampling profiler state"""
+    _require_profiler()
+    return container.profiler.stats()
+
+@router.post("/api/debug/profiler/start")
+async def start_profiler(
+    interval_ms: float = Query(10, ge=1, le=1000),
+    container: ServiceContainer = Depends(get_container)
+):
+    """Start sampling every thread's stack"""
+    _require_profiler()
+    container.profiler.start(interval_ms / 1000)
+    return container.profiler.stats()
+
+@router.post("/api/debug/profiler/stop", response_class=PlainTextResponse)
+async def stop_profiler(container: ServiceContainer = Depends(get_container)):
+    """Stop sampling and return collapsed stacks (flamegraph.pl / speedscope input)"""
+    _require_profiler()
+    return PlainTextResponse(container.profiler.stop())
\ No newline at end of file
@@ -0,0 +1,23 @@
+from typing import Any
+import orjson
+from fastapi import Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+def dumps(content: Any) -> bytes:
+    """Compact JSON bytes; types orjson doesn't handle natively go through FastAPI's encoder"""
+    return orjson.dumps(content, default=jsonable_encoder, option=orjson.OPT_NON_STR_KEYS)
+
+class ORJSONResponse(JSONResponse):
+    """JSON response rendered with orjson"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+def trusted_json(content: Any, response: Response) -> ORJSONResponse:
+    """Serialize data the app built itself straight to bytes, skipping FastAPI's jsonable_encoder pass.
+
+    Headers already set on the injected response (such as validators) are carried over.
+    """
+    headers = {name: value for name, value in response.headers.items() if name != "content-length"}
+    return ORJSONResponse(content, headers=headers)
\ No newline at end of file
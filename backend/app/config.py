@@ -9,6 +9,91 @@ class Settings:
     LINKEDIN_CLIENT_ID = os.getenv("LINKEDIN_CLIENT_ID")
     LINKEDIN_CLIENT_SECRET = os.getenv("LINKEDIN_CLIENT_SECRET")
     LINKEDIN_ACCESS_TOKEN = os.getenv("LINKEDIN_ACCESS_TOKEN")
+    LINKEDIN_API_BASE_URL = os.getenv("LINKEDIN_API_BASE_URL", "https://api.linkedin.com/v2")
+
+    # Upstream HTTP client settings
+    LINKEDIN_HTTP_POOL_SIZE = int(os.getenv("LINKEDIN_HTTP_POOL_SIZE", "20"))
+    LINKEDIN_HTTP_KEEPALIVE = float(os.getenv("LINKEDIN_HTTP_KEEPALIVE", "30"))
+    LINKEDIN_HTTP_TIMEOUT = float(os.getenv("LINKEDIN_HTTP_TIMEOUT", "10"))
+
+    # Upstream rate limiting, retries and circuit breaker
+    LINKEDIN_APP_RATE = float(os.getenv("LINKEDIN_APP_RATE", "20"))
+    LINKEDIN_APP_BURST = float(os.getenv("LINKEDIN_APP_BURST", "40"))
+    LINKEDIN_TOKEN_RATE = float(os.getenv("LINKEDIN_TOKEN_RATE", "5"))
+    LINKEDIN_TOKEN_BURST = float(os.getenv("LINKEDIN_TOKEN_BURST", "20"))
+    LINKEDIN_MAX_RETRIES = int(os.getenv("LINKEDIN_MAX_RETRIES", "3"))
+    LINKEDIN_BACKOFF_BASE = float(os.getenv("LINKEDIN_BACKOFF_BASE", "0.5"))
+    LINKEDIN_BACKOFF_MAX = float(os.getenv("LINKEDIN_BACKOFF_MAX", "30"))
+    LINKEDIN_BREAKER_THRESHOLD = int(os.getenv("LINKEDIN_BREAKER_THRESHOLD", "5"))
+    LINKEDIN_BREAKER_COOLDOWN = float(os.getenv("LINKEDIN_BREAKER_COOLDOWN", "30"))
+
+    # In-process response cache settings (seconds / entries)
+    LINKEDIN_CACHE_TTL = float(os.getenv("LINKEDIN_CACHE_TTL", "300"))
+    LINKEDIN_CACHE_STALE_TTL = float(os.getenv("LINKEDIN_CACHE_STALE_TTL", "3600"))
+    LINKEDIN_CACHE_MAX_ENTRIES = int(os.getenv("LINKEDIN_CACHE_MAX_ENTRIES", "1024"))
+
+    # Shared L2 cache in a Redis-protocol server (redis://[:password@]host[:port][/db]), in front of every
+    # worker and task; empty keeps the cache in-process only
+    CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", "")
+    CACHE_REDIS_POOL_SIZE = int(os.getenv("CACHE_REDIS_POOL_SIZE", "10"))
+    CACHE_REDIS_TIMEOUT = float(os.getenv("CACHE_REDIS_TIMEOUT", "0.5"))
+    CACHE_KEY_PREFIX = os.getenv("CACHE_KEY_PREFIX", "linkedin")
+    # Cross-node lock lifetime (also the longest wait for another node's fill), and how often cached
+    # generations are re-read
+    CACHE_LOCK_TTL = float(os.getenv("CACHE_LOCK_TTL", "30"))
+    CACHE_GENERATION_TTL = float(os.getenv("CACHE_GENERATION_TTL", "5"))
+
+    # Thread pools for blocking work: the synchronous python-linkedin-v2 client, and SQLite/file/Fernet I/O
+    LINKEDIN_LEGACY_THREADS = int(os.getenv("LINKEDIN_LEGACY_THREADS", "4"))
+    IO_THREADS = int(os.getenv("IO_THREADS", "8"))
+
+    # Background refresh: re-fetch each account's data at this fraction of the cache TTL, +/- jitter
+    LINKEDIN_REFRESH_ENABLED = os.getenv("LINKEDIN_REFRESH_ENABLED", "true").lower() == "true"
+    LINKEDIN_REFRESH_AHEAD = float(os.getenv("LINKEDIN_REFRESH_AHEAD", "0.8"))
+    LINKEDIN_REFRESH_JITTER = float(os.getenv("LINKEDIN_REFRESH_JITTER", "0.1"))
+    LINKEDIN_REFRESH_POLL = float(os.getenv("LINKEDIN_REFRESH_POLL", "5"))
+
+    # Incremental post/article sync settings
+    LINKEDIN_SYNC_PAGE_SIZE = int(os.getenv("LINKEDIN_SYNC_PAGE_SIZE", "50"))
+    # Upstream does not mark an item modified when it only gains likes, comments or shares, so every sync
+    # also re-reads the counts of up to this many items created within the last this many days
+    LINKEDIN_COUNT_REFRESH_LIMIT = int(os.getenv("LINKEDIN_COUNT_REFRESH_LIMIT", "20"))
+    LINKEDIN_COUNT_REFRESH_DAYS = float(os.getenv("LINKEDIN_COUNT_REFRESH_DAYS", "7"))
+
+    # Multi-account batch fetch settings; concurrency is further capped by the upstream burst size
+    LINKEDIN_BATCH_CONCURRENCY = int(os.getenv("LINKEDIN_BATCH_CONCURRENCY", "16"))
+    LINKEDIN_BATCH_MAX_ITEMS = int(os.getenv("LINKEDIN_BATCH_MAX_ITEMS", "1000"))
+    # Managed accounts whose databases stay open (each holds SQLite handles per I/O thread); least recently
+    # used ones are closed beyond this
+    ACCOUNT_CACHE_SIZE = int(os.getenv("ACCOUNT_CACHE_SIZE", "32"))
+
+    # Rows read from storage per export chunk; bounds export memory
+    EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "1000"))
+
+    # Engagement history: samples kept per post before older ones are thinned to half resolution
+    ENGAGEMENT_HISTORY_MAX_SAMPLES = int(os.getenv("ENGAGEMENT_HISTORY_MAX_SAMPLES", "1024"))
+
+    # Observability: log level, and whether the sampling profiler may be toggled over HTTP
+    LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+    PROFILER_ENABLED = os.getenv("PROFILER_ENABLED", "false").lower() == "true"
+
+    # Response compression
+    GZIP_MINIMUM_SIZE = int(os.getenv("GZIP_MINIMUM_SIZE", "1024"))
+    GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+
+    # Month-partitioned Arrow snapshot of post counts for offline analysis, rewritten in the background after
+    # saves (only kept when pyarrow is installed)
+    SNAPSHOT_ENABLED = os.getenv("SNAPSHOT_ENABLED", "false").lower() == "true"
+
+    # Profile picture proxy: content-addressed image cache on disk, bounded in bytes, with resized widths
+    # (only generated when Pillow is installed) from a pool of their own
+    MEDIA_CACHE_DIR = os.getenv("MEDIA_CACHE_DIR", "data/media")
+    MEDIA_CACHE_MAX_BYTES = int(os.getenv("MEDIA_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+    MEDIA_MAX_SOURCE_BYTES = int(os.getenv("MEDIA_MAX_SOURCE_BYTES", str(10 * 1024 * 1024)))
+    MEDIA_WIDTHS = [int(width) for width in os.getenv("MEDIA_WIDTHS", "64,128,240,480").split(",")]
+    MEDIA_THREADS = int(os.getenv("MEDIA_THREADS", "2"))
+    # Width of the profilePicture URL in profile responses: the 120px dashboard avatar at 2x density
+    PROFILE_PICTURE_WIDTH = int(os.getenv("PROFILE_PICTURE_WIDTH", "240"))
     
     # API settings
     API_V1_STR = "/api/v1"
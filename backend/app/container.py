@@ -0,0 +1,217 @@
+import os
+import threading
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from functools import cached_property
+from typing import TYPE_CHECKING, AsyncIterator, Dict
+from fastapi import Request
+from app.config import settings
+from app.services.cache_service import AsyncTTLCache
+from app.services.config_service import ConfigService
+from app.services.executor import BlockingExecutor
+from app.services.http_client import LinkedInHttpClient
+from app.services.linkedin_service import LinkedInService
+from app.services.media_cache import MediaCache
+from app.services.profiler import SamplingProfiler
+from app.services.redis_client import RedisClient
+from app.services.refresh_service import RefreshScheduler
+from app.services.shared_cache import SharedCache, TieredCache
+from app.services.storage_service import StorageService
+from app.services.upstream_scheduler import UpstreamScheduler, UpstreamUnavailable
+
+if TYPE_CHECKING:
+    from app.services.analytics_service import AnalyticsService
+    from app.services.engagement_service import EngagementService
+
+class ServiceContainer:
+    """Owns the single instance of every shared service; each one is built on first use"""
+
+    def __init__(self):
+        self._account_lock = threading.Lock()
+        # Managed accounts' services, least recently used first, each with its own database; the
+        # upstream client and pools are shared
+        self.account_services: "OrderedDict[str, LinkedInService]" = OrderedDict()
+        # id(service) -> requests using it, and evicted services waiting for their last one to finish
+        self._account_leases: Dict[int, int] = {}
+        self._retired_accounts: Dict[int, LinkedInService] = {}
+
+    @cached_property
+    def io_executor(self) -> BlockingExecutor:
+        # SQLite, config file and Fernet work
+        return BlockingExecutor(settings.IO_THREADS, "io")
+
+    @cached_property
+    def legacy_executor(self) -> BlockingExecutor:
+        # The synchronous python-linkedin-v2 client; kept apart so its slow calls cannot starve storage I/O
+        return BlockingExecutor(settings.LINKEDIN_LEGACY_THREADS, "linkedin-legacy")
+
+    @cached_property
+    def media_executor(self) -> BlockingExecutor:
+        # Image decoding and resizing
+        return BlockingExecutor(settings.MEDIA_THREADS, "media")
+
+    @cached_property
+    def config_service(self) -> ConfigService:
+        return ConfigService()
+
+    @cached_property
+    def storage(self) -> StorageService:
+        return StorageService()
+
+    @cached_property
+    def scheduler(self) -> UpstreamScheduler:
+        return UpstreamScheduler()
+
+    @cached_property
+    def http_client(self) -> LinkedInHttpClient:
+        return LinkedInHttpClient(scheduler=self.scheduler)
+
+    @cached_property
+    def media_cache(self) -> MediaCache:
+        # Shared by every account: files are named by their content
+        return MediaCache(settings.MEDIA_CACHE_DIR, self.http_client, self.io_executor, self.media_executor,
+                          settings.MEDIA_CACHE_MAX_BYTES, settings.MEDIA_MAX_SOURCE_BYTES)
+
+    @cached_property
+    def linkedin_service(self) -> LinkedInService:
+        return LinkedInService(http=self.http_client, storage=self.storage, io_executor=self.io_executor,
+                               legacy_executor=self.legacy_executor, media=self.media_cache)
+
+    def _acquire_account(self, account_id: str, deps: tuple) -> LinkedInService:
+        """Lease a managed account's service, opening its database on first use (blocks: run in the I/O pool)"""
+        built = None
+        with self._account_lock:
+            opened = account_id in self.account_services
+        if not opened:
+            # Opening (and on first use, migrating) a database is slow; other accounts are not held up meanwhile
+            http, io_executor, legacy_executor, media = deps
+            storage = StorageService(os.path.join("data", "accounts", account_id))
+            built = LinkedInService(http=http, storage=storage, io_executor=io_executor,
+                                    legacy_executor=legacy_executor, media=media)
+        evicted = []
+        with self._account_lock:
+            if built is not None:
+                service = self.account_services.setdefault(account_id, built)
+            else:
+                service = self.account_services.get(account_id)
+            if service is None:
+                # Evicted between the two checks
+                return self._acquire_account(account_id, deps)
+            if built is not None and built is not service:
+                # Another thread opened it first
+                evicted.append(built)
+            self.account_services.move_to_end(account_id)
+            self._account_leases[id(service)] = self._account_leases.get(id(service), 0) + 1
+            while len(self.account_services) > settings.ACCOUNT_CACHE_SIZE:
+                _, old = self.account_services.popitem(last=False)
+                if self._account_leases.get(id(old)):
+                    # Still in use; closed when its last lease is released
+                    self._retired_accounts[id(old)] = old
+                else:
+                    evicted.append(old)
+        for old in evicted:
+            old.storage.close()
+        return service
+
+    def _release_account(self, service: LinkedInService):
+        with self._account_lock:
+            leases = self._account_leases.pop(id(service)) - 1
+            if leases:
+                self._account_leases[id(service)] = leases
+                return
+            retired = self._retired_accounts.pop(id(service), None)
+        if retired is not None:
+            retired.storage.close()
+
+    def evict_account(self, account_id: str):
+        """Drop a removed account's service, closing its database once no request is using it (blocks: run in the I/O pool)"""
+        with self._account_lock:
+            service = self.account_services.pop(account_id, None)
+            if service is None:
+                return
+            if self._account_leases.get(id(service)):
+                self._retired_accounts[id(service)] = service
+                return
+        service.storage.close()
+
+    @asynccontextmanager
+    async def account_service(self, account_id: str) -> AsyncIterator[LinkedInService]:
+        """Lease the service bound to a managed account's storage for the duration of the block.
+
+        At most ACCOUNT_CACHE_SIZE accounts keep their databases open; the least recently used
+        one is closed when another is opened, as soon as no request is still using it.
+        """
+        # Shared services are built here on the event loop, never concurrently from pool threads
+        deps = (self.http_client, self.io_executor, self.legacy_executor, self.media_cache)
+        service = await self.io_executor.run(self._acquire_account, account_id, deps)
+        try:
+            yield service
+        finally:
+            await self.io_executor.run(self._release_account, service)
+
+    @cached_property
+    def response_cache(self) -> TieredCache:
+        # While LinkedIn is short-circuited, serve the last known response instead of failing
+        l1 = AsyncTTLCache(fallback_errors=(UpstreamUnavailable,))
+        if not settings.CACHE_REDIS_URL:
+            return TieredCache(l1)
+        # Every worker and task shares what any of them fetched
+        client = RedisClient(settings.CACHE_REDIS_URL, settings.CACHE_REDIS_POOL_SIZE, settings.CACHE_REDIS_TIMEOUT)
+        return TieredCache(l1, SharedCache(client, settings.CACHE_KEY_PREFIX))
+
+    @cached_property
+    def analytics_service(self) -> "AnalyticsService":
+        # pandas/NumPy are the heaviest imports in the app; only pay for them on the first analytics request
+        from app.services.analytics_service import AnalyticsService
+        return AnalyticsService(self.storage, io_executor=self.io_executor)
+
+    @cached_property
+    def engagement_service(self) -> "EngagementService":
+        from app.services.engagement_service import EngagementService
+        return EngagementService(self.storage, io_executor=self.io_executor)
+
+    @cached_property
+    def profiler(self) -> SamplingProfiler:
+        return SamplingProfiler()
+
+    @cached_property
+    def refresh_scheduler(self) -> RefreshScheduler:
+        return RefreshScheduler(self.linkedin_service, self.config_service, self.response_cache, self.scheduler)
+
+    async def startup(self):
+        """Start the background parts of the app (called from the lifespan)"""
+        if settings.CACHE_REDIS_URL:
+            await self.response_cache.start()
+        # Keep each account's data warm so requests rarely wait on LinkedIn
+        if settings.LINKEDIN_REFRESH_ENABLED:
+            await self.refresh_scheduler.start()
+
+    async def shutdown(self):
+        """Stop background work and release upstream connections, skipping anything never built"""
+        if "refresh_scheduler" in self.__dict__:
+            await self.refresh_scheduler.stop()
+        if "response_cache" in self.__dict__:
+            await self.response_cache.stop()
+        if "http_client" in self.__dict__:
+            await self.http_client.close()
+        if "profiler" in self.__dict__:
+            self.profiler.stop()
+        with self._account_lock:
+            services = list(self.account_services.values()) + list(self._retired_accounts.values())
+            self.account_services.clear()
+            self._retired_accounts.clear()
+        for service in services:
+            service.storage.close()
+        for name in ("io_executor", "legacy_executor", "media_executor"):
+            if name in self.__dict__:
+                self.__dict__[name].shutdown()
+
+def get_container(request: Request) -> ServiceContainer:
+    return request.app.state.container
+
+async def get_credentials(container: ServiceContainer) -> Dict:
+    """Read the stored credentials without blocking the event loop on file I/O and decryption"""
+    return await container.io_executor.run(container.config_service.get_credentials)
+
+def get_linkedin_service(request: Request) -> LinkedInService:
+    return get_container(request).linkedin_service
\ No newline at end of file
@@ -0,0 +1,58 @@
+import time
+from typing import Dict, Iterable, Tuple
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.services.metrics import HTTP_IN_FLIGHT, HTTP_LATENCY, HTTP_REQUESTS
+
+class MetricsMiddleware:
+    """Record per-route request counts, latency and in-flight requests"""
+
+    def __init__(self, app: ASGIApp, max_paths: int = 4096):
+        self.app = app
+        self.max_paths = max_paths
+        # (method, path) -> route template learned from earlier requests; the router only resolves
+        # the route during dispatch, so in-flight counts for a path's very first request are "unresolved"
+        self._templates: Dict[Tuple[str, str], str] = {}
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        method, key = scope["method"], (scope["method"], scope["path"])
+        in_flight_route = self._templates.get(key, "unresolved")
+        status = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc(method=method, route=in_flight_route)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            # Label by route template rather than raw path to keep cardinality bounded
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            if key not in self._templates:
+                if len(self._templates) >= self.max_paths:
+                    self._templates.clear()
+                self._templates[key] = route
+            HTTP_LATENCY.observe(elapsed, method=method, route=route)
+            HTTP_REQUESTS.inc(method=method, route=route, status=status)
+            HTTP_IN_FLIGHT.dec(method=method, route=in_flight_route)
+
+class SelectiveGZipMiddleware(GZipMiddleware):
+    """GZip responses except on paths that stream line by line or compress for themselves"""
+
+    def __init__(self, app: ASGIApp, exclude_paths: Iterable[str] = (), **kwargs):
+        super().__init__(app, **kwargs)
+        self.exclude_paths = frozenset(exclude_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] == "http" and scope["path"] in self.exclude_paths:
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
\ No newline at end of file
@@ -0,0 +1,106 @@
+from datetime import datetime
+from typing import Dict, List, Optional
+import numpy as np
+import pandas as pd
+from app.services.cache_service import AsyncTTLCache
+from app.services.executor import BlockingExecutor
+from app.services.storage_service import StorageService
+
+# Columns of StorageService.query_rollups after the day
+DAILY_COLUMNS = ["posts", "articles", "likes", "comments", "shares"]
+COUNT_COLUMNS = ["likes", "comments", "shares"]
+
+# Pandas resample rules for each supported granularity
+GRANULARITIES = {
+    "day": "D",
+    "week": "W-MON",
+    "month": "MS"
+}
+
+class AnalyticsService:
+    """Engagement analytics read from the daily rollup tables maintained by StorageService"""
+
+    def __init__(self, storage: StorageService, cache: Optional[AsyncTTLCache] = None,
+                 io_executor: Optional[BlockingExecutor] = None):
+        self.storage = storage
+        self.io = io_executor or BlockingExecutor(1, "analytics")
+        self.cache = cache or AsyncTTLCache(stale_ttl=0, max_entries=256, name="analytics")
+
+    async def get_analytics(self, account: str, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                            granularity: str = "day", post_type: Optional[str] = None, top: int = 10) -> Dict:
+        """Get cached analytics for an account, recomputed whenever new posts are stored"""
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"Unsupported granularity: {granularity}")
+        # The data version is part of the key, so an ingest makes every older entry unreachable
+        key = (account, start, end, granularity, post_type, top, await self.io.run(self.storage.get_data_version))
+        return await self.cache.get_or_fetch(
+            key, lambda: self._compute_async(start, end, granularity, post_type, top)
+        )
+
+    async def _compute_async(self, start, end, granularity, post_type, top) -> Dict:
+        # The rollup query and pandas work are CPU/disk bound; keep them off the event loop
+        return await self.io.run(self.compute, start, end, granularity, post_type, top)
+
+    def _load_rollups(self, start: Optional[datetime], end: Optional[datetime],
+                      post_type: Optional[str]) -> pd.DataFrame:
+        """Load daily rollup totals indexed by day; one row per day instead of one per post"""
+        rows = self.storage.query_rollups(start, end, post_type).fetchall()
+        days, *columns = zip(*rows) if rows else ((),) * (len(DAILY_COLUMNS) + 1)
+        # Column by column through NumPy; from_records and to_datetime on strings cost more than the query
+        return pd.DataFrame(
+            {name: np.array(column, dtype=np.int64) for name, column in zip(DAILY_COLUMNS, columns)},
+            index=pd.DatetimeIndex(np.array(days, dtype="datetime64[D]").astype("datetime64[ns]"), name="day")
+        )
+
+    def compute(self, start: Optional[datetime] = None, end: Optional[datetime] = None, granularity: str = "day",
+                post_type: Optional[str] = None, top: int = 10) -> Dict:
+        """Compute totals, engagement over time, per-post performance and engagement distribution"""
+        frame = self._load_rollups(start, end, post_type)
+        posts, articles, likes, comments, shares = frame.to_numpy().sum(axis=0).tolist()
+
+        return {
+            "totalPosts": posts,
+            "totalArticles": articles,
+            "totalLikes": likes,
+            "totalComments": comments,
+            "totalShares": shares,
+            "engagementOverTime": self._engagement_over_time(frame, granularity),
+            "postPerformance": self._post_performance(start, end, post_type, top),
+            "engagementDistribution": [
+                {"name": "Likes", "value": likes},
+                {"name": "Comments", "value": comments},
+                {"name": "Shares", "value": shares}
+            ]
+        }
+
+    def _engagement_over_time(self, frame: pd.DataFrame, granularity: str) -> List[Dict]:
+        """Sum daily buckets into day, week or month buckets"""
+        if frame.empty:
+            return []
+        series = frame[COUNT_COLUMNS].resample(GRANULARITIES[granularity], label="left", closed="left").sum()
+        # Convert whole columns at once rather than one Timestamp and numpy scalar per bucket
+        dates = np.datetime_as_string(series.index.to_numpy(), unit="D").tolist()
+        return [
+            {"date": date, "likes": likes, "comments": comments, "shares": shares}
+            for date, (likes, comments, shares) in zip(dates, series.to_numpy().tolist())
+        ]
+
+    def _post_performance(self, start: Optional[datetime], end: Optional[datetime],
+                          post_type: Optional[str], top: int) -> List[Dict]:
+        """Top posts by total engagement"""
+        return [
+            {
+                "id": post["id"],
+                "post": post["text"][:40],
+                "type": post["type"],
+                "created_time": post["created_time"],
+                "likes": post["likes_count"] or 0,
+                "comments": post["comments_count"] or 0,
+                "shares": post["shares_count"] or 0
+            }
+            for post in self.storage.top_posts(top, start, end, post_type)
+        ]
+
+    async def check_consistency(self, repair: bool = False) -> Dict:
+        """Rebuild rollups from raw posts and diff them against the incrementally maintained ones"""
+        return await self.io.run(self.storage.check_rollups, repair)
\ No newline at end of file
@@ -0,0 +1,148 @@
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple, Type
+from app.config import settings
+from app.services.metrics import CACHE_EVENTS
+
+def credential_key(credentials: Dict) -> str:
+    """Stable, non-reversible identity for a credential set"""
+    identity = f"{credentials.get('client_id', '')}:{credentials.get('access_token', '')}"
+    return hashlib.sha256(identity.encode()).hexdigest()[:16]
+
+class AsyncTTLCache:
+    """In-process async cache with TTL, LRU bounds, single-flight fetches and stale-while-revalidate"""
+
+    def __init__(self, ttl: Optional[float] = None, stale_ttl: Optional[float] = None,
+                 max_entries: Optional[int] = None, fallback_errors: Tuple[Type[BaseException], ...] = (),
+                 name: str = "response"):
+        # Label for this cache's counters in /metrics
+        self.name = name
+        # Fetch errors for which any old value, however expired, is better than failing
+        self.fallback_errors = fallback_errors
+        self.ttl = ttl if ttl is not None else settings.LINKEDIN_CACHE_TTL
+        self.stale_ttl = stale_ttl if stale_ttl is not None else settings.LINKEDIN_CACHE_STALE_TTL
+        self.max_entries = max_entries or settings.LINKEDIN_CACHE_MAX_ENTRIES
+        # key -> (value, monotonic fetch time)
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._stats = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "refreshes": 0,
+            "evictions": 0,
+            "errors": 0,
+            "fallbacks": 0
+        }
+
+    async def get_or_fetch(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value for key, calling fetch at most once per key at a time"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            value, fetched_at = entry
+            age = time.monotonic() - fetched_at
+            if age < self.ttl:
+                self._entries.move_to_end(key)
+                self._record("hits")
+                return value
+            if age < self.ttl + self.stale_ttl:
+                # Serve the old value now and refresh in the background
+                self._entries.move_to_end(key)
+                self._record("stale_hits")
+                if key not in self._inflight:
+                    self._record("refreshes")
+                    self._start_fetch(key, fetch)
+                return value
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self._record("coalesced")
+        else:
+            self._record("misses")
+            task = self._start_fetch(key, fetch)
+        try:
+            # Shield so a cancelled caller does not cancel the fetch other callers are waiting on
+            return await asyncio.shield(task)
+        except self.fallback_errors:
+            if entry is None:
+                raise
+            self._record("fallbacks")
+            return entry[0]
+
+    def _record(self, event: str):
+        self._stats[event] += 1
+        CACHE_EVENTS.inc(cache=self.name, event=event)
+
+    def _start_fetch(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        task = asyncio.ensure_future(self._fill(key, fetch))
+        self._inflight[key] = task
+        task.add_done_callback(self._consume_error)
+        return task
+
+    async def _fill(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            value = await fetch()
+        except Exception:
+            self._record("errors")
+            raise
+        finally:
+            self._inflight.pop(key, None)
+        self.set(key, value)
+        return value
+
+    @staticmethod
+    def _consume_error(task: asyncio.Task):
+        # Background refreshes have no awaiter; retrieve the exception so it is not logged as unhandled
+        if not task.cancelled():
+            task.exception()
+
+    def set(self, key: Hashable, value: Any):
+        """Store a value and evict least recently used entries beyond max_entries"""
+        self._entries[key] = (value, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self._record("evictions")
+
+    def peek(self, key: Hashable, fresh: bool = False) -> Any:
+        """The cached value (however old, unless fresh is set), or None, without counting a lookup"""
+        entry = self._entries.get(key)
+        if entry is None or (fresh and time.monotonic() - entry[1] >= self.ttl):
+            return None
+        return entry[0]
+
+    def find(self, predicate: Callable[[Hashable], bool]) -> Optional[Hashable]:
+        """The most recently used key that is still fresh and matches, without counting a lookup"""
+        now = time.monotonic()
+        for key in reversed(self._entries):
+            if now - self._entries[key][1] < self.ttl and predicate(key):
+                return key
+        return None
+
+    def invalidate_where(self, predicate: Callable[[Hashable, Any], bool]) -> int:
+        """Drop every entry whose (key, value) matches; returns how many were dropped"""
+        keys = [key for key, entry in self._entries.items() if predicate(key, entry[0])]
+        for key in keys:
+            del self._entries[key]
+        return len(keys)
+
+    def invalidate(self, key: Optional[Hashable] = None):
+        """Drop one key, or every entry when no key is given"""
+        if key is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(key, None)
+
+    def stats(self) -> Dict:
+        """Counters and sizing information"""
+        lookups = self._stats["hits"] + self._stats["stale_hits"] + self._stats["misses"] + self._stats["coalesced"]
+        return {
+            **self._stats,
+            "entries": len(self._entries),
+            "inflight": len(self._inflight),
+            "max_entries": self.max_entries,
+            "hit_ratio": (self._stats["hits"] + self._stats["stale_hits"]) / lookups if lookups else 0.0
+        }
\ No newline at end of file
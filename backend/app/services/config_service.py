@@ -1,15 +1,30 @@
+import fcntl
+import logging
 import os
+import tempfile
+import threading
+from contextlib import contextmanager
 from cryptography.fernet import Fernet
 from pathlib import Path
 import json
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
 from datetime import datetime
+from app.services.metrics import CRYPTO_LATENCY
+
+logger = logging.getLogger(__name__)
 
 class ConfigService:
     def __init__(self):
         self.config_dir = Path("config")
         self.encrypted_file = self.config_dir / "linkedin_config.enc"
         self.key_file = self.config_dir / ".key"
+        self.lock_file = self.config_dir / ".linkedin_config.lock"
+        # Decrypted config plus the file signature it was read from
+        self._cache: Optional[Dict] = None
+        self._cache_signature: Optional[Tuple] = None
+        self._cache_lock = threading.Lock()
+        # Serializes read-modify-write updates from the I/O pool; _locked() also covers other workers
+        self._write_lock = threading.Lock()
         self._ensure_config_directory()
         self._load_or_create_key()
 
@@ -28,48 +43,132 @@ class ConfigService:
                 key = f.read()
         self.fernet = Fernet(key)
 
-    def save_credentials(self, credentials: Dict):
-        """Save encrypted LinkedIn credentials"""
-        config_data = {
-            'credentials': credentials,
-            'last_updated': datetime.now().isoformat()
-        }
-        encrypted_data = self.fernet.encrypt(json.dumps(config_data).encode())
-        with open(self.encrypted_file, 'wb') as f:
-            f.write(encrypted_data)
+    def _file_signature(self) -> Optional[Tuple]:
+        """Identify the current config file version; changes whenever any worker rewrites it"""
+        try:
+            stat = os.stat(self.encrypted_file)
+        except FileNotFoundError:
+            return None
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
 
-    def get_credentials(self) -> Optional[Dict]:
-        """Get decrypted LinkedIn credentials"""
+    def _read_config(self) -> Optional[Dict]:
+        """Read and decrypt the config file"""
         if not self.encrypted_file.exists():
             return None
-        
+
         with open(self.encrypted_file, 'rb') as f:
             encrypted_data = f.read()
-        
+
         try:
-            decrypted_data = self.fernet.decrypt(encrypted_data)
-            config_data = json.loads(decrypted_data)
-            return config_data['credentials']
+            with CRYPTO_LATENCY.time(operation="decrypt"):
+                decrypted_data = self.fernet.decrypt(encrypted_data)
+            return json.loads(decrypted_data)
         except Exception as e:
-            print(f"Error decrypting credentials: {e}")
+            logger.error("Error decrypting credentials: %s", e)
             return None
 
+    def _load_config(self) -> Optional[Dict]:
+        """Return the decrypted config, re-reading only when the file has changed"""
+        signature = self._file_signature()
+        with self._cache_lock:
+            if self._cache_signature is not None and signature == self._cache_signature:
+                return self._cache
+        config_data = self._read_config() if signature is not None else None
+        with self._cache_lock:
+            self._cache = config_data
+            self._cache_signature = signature
+        return config_data
+
+    def _write_config(self, config_data: Dict):
+        """Encrypt and atomically replace the config file"""
+        with CRYPTO_LATENCY.time(operation="encrypt"):
+            encrypted_data = self.fernet.encrypt(json.dumps(config_data).encode())
+        # Write to a temp file and rename so other workers never read a partial file
+        # and always see a new inode, even within the mtime resolution
+        fd, tmp_path = tempfile.mkstemp(dir=self.config_dir, prefix=".linkedin_config.")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(encrypted_data)
+            os.replace(tmp_path, self.encrypted_file)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+        with self._cache_lock:
+            self._cache = config_data
+            self._cache_signature = self._file_signature()
+
+    @contextmanager
+    def _locked(self):
+        """Hold the update lock across threads and worker processes for a read-modify-write"""
+        with self._write_lock, open(self.lock_file, 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _update_config(self, **changes) -> Dict:
+        """Copy the current config with changes applied and a new timestamp"""
+        config_data = dict(self._load_config() or {})
+        config_data.update(changes)
+        config_data['last_updated'] = datetime.now().isoformat()
+        return config_data
+
+    def save_credentials(self, credentials: Dict):
+        """Save encrypted LinkedIn credentials"""
+        with self._locked():
+            self._write_config(self._update_config(credentials=credentials))
+
+    def get_credentials(self) -> Optional[Dict]:
+        """Get decrypted LinkedIn credentials"""
+        config_data = self._load_config()
+        if not config_data or not config_data.get('credentials'):
+            return None
+        return dict(config_data['credentials'])
+
+    def save_account_credentials(self, account_id: str, credentials: Dict):
+        """Save encrypted credentials for one of several managed accounts"""
+        with self._locked():
+            accounts = dict((self._load_config() or {}).get('accounts', {}))
+            accounts[account_id] = credentials
+            self._write_config(self._update_config(accounts=accounts))
+
+    def get_account_credentials(self, account_id: str) -> Optional[Dict]:
+        """Get decrypted credentials for a managed account"""
+        credentials = (self._load_config() or {}).get('accounts', {}).get(account_id)
+        return dict(credentials) if credentials else None
+
+    def list_accounts(self) -> List[str]:
+        """List the IDs of all managed accounts"""
+        return sorted((self._load_config() or {}).get('accounts', {}))
+
+    def remove_account(self, account_id: str) -> bool:
+        """Remove a managed account; returns False if it did not exist"""
+        with self._locked():
+            accounts = dict((self._load_config() or {}).get('accounts', {}))
+            if accounts.pop(account_id, None) is None:
+                return False
+            self._write_config(self._update_config(accounts=accounts))
+            return True
+
     def get_last_updated(self) -> Optional[datetime]:
         """Get last update timestamp"""
-        if not self.encrypted_file.exists():
+        config_data = self._load_config()
+        if not config_data:
             return None
-        
-        with open(self.encrypted_file, 'rb') as f:
-            encrypted_data = f.read()
-        
         try:
-            decrypted_data = self.fernet.decrypt(encrypted_data)
-            config_data = json.loads(decrypted_data)
             return datetime.fromisoformat(config_data['last_updated'])
         except Exception:
             return None
 
     def clear_credentials(self):
-        """Clear stored credentials"""
-        if self.encrypted_file.exists():
-            self.encrypted_file.unlink() 
\ No newline at end of file
+        """Clear stored credentials, keeping any managed accounts"""
+        with self._locked():
+            if (self._load_config() or {}).get('accounts'):
+                self._write_config(self._update_config(credentials=None))
+                return
+            if self.encrypted_file.exists():
+                self.encrypted_file.unlink()
+            with self._cache_lock:
+                self._cache = None
+                self._cache_signature = None
\ No newline at end of file
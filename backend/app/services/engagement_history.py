@@ -0,0 +1,82 @@
+from typing import TYPE_CHECKING, Iterable, Sequence, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Fields of one engagement sample; time is epoch seconds
+SAMPLE_FIELDS = ("time", "likes", "comments", "shares")
+
+def _append_varint(value: int, out: bytearray):
+    """Zigzag-encode a signed integer and append it as a LEB128 varint"""
+    value = value << 1 if value >= 0 else (-value << 1) - 1
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+def encode_samples(samples: Iterable[Sequence[int]], previous: Sequence[int]) -> bytes:
+    """Encode samples as varint deltas from the sample before each one.
+
+    Times are seconds and counts move by small steps between refreshes, so a sample usually
+    takes 4-8 bytes instead of four 8-byte integers (or a dict per sample).
+    """
+    out = bytearray()
+    previous = tuple(previous)
+    for sample in samples:
+        for value, before in zip(sample, previous):
+            _append_varint(value - before, out)
+        previous = tuple(sample)
+    return bytes(out)
+
+def _decode_deltas(data: bytes) -> "np.ndarray":
+    """Decode concatenated varint deltas into an (n, 4) int64 array, without a Python loop"""
+    import numpy as np
+
+    raw = np.frombuffer(data, dtype=np.uint8)
+    if not len(raw):
+        return np.empty((0, len(SAMPLE_FIELDS)), dtype=np.int64)
+    # Every varint ends at the first byte without the continuation bit
+    ends = np.flatnonzero(raw < 0x80)
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    shifts = ((np.arange(len(raw)) - np.repeat(starts, ends - starts + 1)) * 7).astype(np.uint64)
+    values = np.add.reduceat((raw & 0x7F).astype(np.uint64) << shifts, starts)
+    deltas = (values >> np.uint64(1)).astype(np.int64) ^ -(values & np.uint64(1)).astype(np.int64)
+    return deltas.reshape(-1, len(SAMPLE_FIELDS))
+
+def decode_samples(data: bytes, first_time: int) -> "np.ndarray":
+    """Decode one history into an (n, 4) int64 array of absolute samples"""
+    samples = _decode_deltas(data).cumsum(axis=0)
+    # Times are stored relative to the first sample
+    samples[:, 0] += first_time
+    return samples
+
+def decode_histories(histories: Sequence[bytes], first_times: Sequence[int],
+                     lengths: Sequence[int]) -> Tuple["np.ndarray", "np.ndarray"]:
+    """Decode many histories in one pass: all samples in one (n, 4) array, plus where each history starts"""
+    import numpy as np
+
+    lengths = np.asarray(lengths, dtype=np.int64)
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    deltas = _decode_deltas(b"".join(histories))
+    deltas[starts, 0] += np.asarray(first_times, dtype=np.int64)
+    totals = deltas.cumsum(axis=0)
+    # Restart the running sum at each history by removing everything accumulated before it
+    offsets = totals[starts] - deltas[starts]
+    return totals - np.repeat(offsets, lengths, axis=0), starts
+
+def thin_samples(samples: "np.ndarray") -> "np.ndarray":
+    """Halve a history's resolution, keeping the first and latest samples"""
+    import numpy as np
+
+    if len(samples) <= 2:
+        return samples
+    return np.concatenate((samples[:1], samples[1:-1:2], samples[-1:]))
+
+def value_at(samples: "np.ndarray", timestamp: float) -> "np.ndarray":
+    """Counts as of timestamp (the last sample at or before it); zeros before the first sample"""
+    import numpy as np
+
+    index = int(np.searchsorted(samples[:, 0], timestamp, side="right")) - 1
+    if index < 0:
+        return np.zeros(len(SAMPLE_FIELDS) - 1, dtype=np.int64)
+    return samples[index, 1:]
\ No newline at end of file
@@ -0,0 +1,134 @@
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from app.services.engagement_history import SAMPLE_FIELDS, decode_histories, decode_samples, value_at
+from app.services.executor import BlockingExecutor
+from app.services.storage_service import StorageService
+
+COUNT_FIELDS = SAMPLE_FIELDS[1:]
+
+class EngagementService:
+    """Velocity, time-to-N-likes and trending queries over the per-post engagement histories"""
+
+    def __init__(self, storage: StorageService, io_executor: Optional[BlockingExecutor] = None):
+        self.storage = storage
+        self.io = io_executor or BlockingExecutor(1, "engagement")
+
+    def _load(self, post_id: str) -> Optional[Tuple[float, np.ndarray]]:
+        """A post's creation time (epoch seconds) and decoded samples, or None if it has no history"""
+        row = self.storage.get_engagement_history(post_id)
+        if row is None:
+            return None
+        created_time, first_time, deltas = row
+        return datetime.fromisoformat(created_time).timestamp(), decode_samples(deltas, first_time)
+
+    @staticmethod
+    def _baseline(samples: np.ndarray, created: float, start: float) -> np.ndarray:
+        """Counts at the start of a window; a post first seen inside the window counts from its first sample"""
+        if samples[0, 0] <= start:
+            return value_at(samples, start)
+        if created >= start:
+            return np.zeros(len(COUNT_FIELDS), dtype=np.int64)
+        return samples[0, 1:]
+
+    async def history(self, post_id: str) -> Optional[Dict]:
+        """Every recorded sample of a post's engagement"""
+        return await self.io.run(self.compute_history, post_id)
+
+    def compute_history(self, post_id: str) -> Optional[Dict]:
+        loaded = self._load(post_id)
+        if loaded is None:
+            return None
+        _, samples = loaded
+        return {
+            "postId": post_id,
+            "samples": [
+                {"time": datetime.fromtimestamp(sample[0]).isoformat(), **dict(zip(COUNT_FIELDS, sample[1:]))}
+                for sample in samples.tolist()
+            ]
+        }
+
+    async def velocity(self, post_id: str, window_hours: float) -> Optional[Dict]:
+        """Engagement gained per hour over the last window_hours"""
+        return await self.io.run(self.compute_velocity, post_id, window_hours, time.time())
+
+    def compute_velocity(self, post_id: str, window_hours: float, now: float) -> Optional[Dict]:
+        loaded = self._load(post_id)
+        if loaded is None:
+            return None
+        created, samples = loaded
+        start = now - window_hours * 3600
+        gained = samples[-1, 1:] - self._baseline(samples, created, start)
+        # A post younger than the window has only been gaining for its own age
+        hours = max(min(window_hours, (now - created) / 3600), 1 / 60)
+        return {
+            "postId": post_id,
+            "windowHours": window_hours,
+            "gained": dict(zip(COUNT_FIELDS, gained.tolist())),
+            "perHour": {field: value / hours for field, value in zip(COUNT_FIELDS, gained.tolist())}
+        }
+
+    async def time_to_likes(self, post_id: str, likes: int) -> Optional[Dict]:
+        """How long after publication a post first had at least `likes` likes.
+
+        Samples are taken at each refresh, so this is an upper bound with the refresh interval's resolution.
+        """
+        return await self.io.run(self.compute_time_to_likes, post_id, likes)
+
+    def compute_time_to_likes(self, post_id: str, likes: int) -> Optional[Dict]:
+        loaded = self._load(post_id)
+        if loaded is None:
+            return None
+        created, samples = loaded
+        reached = samples[:, 1] >= likes
+        if not reached.any():
+            return {"postId": post_id, "likes": likes, "reached": False}
+        reached_at = int(samples[int(np.argmax(reached)), 0])
+        return {
+            "postId": post_id,
+            "likes": likes,
+            "reached": True,
+            "reachedAt": datetime.fromtimestamp(reached_at).isoformat(),
+            "seconds": max(0, int(reached_at - created))
+        }
+
+    async def trending(self, window_hours: float, limit: int = 10, metric: str = "likes",
+                       post_type: Optional[str] = None) -> List[Dict]:
+        """Top posts by engagement gained over the last window_hours"""
+        if metric not in COUNT_FIELDS:
+            raise ValueError(f"Unsupported metric: {metric}")
+        return await self.io.run(self.compute_trending, window_hours, limit, metric, post_type, time.time())
+
+    def compute_trending(self, window_hours: float, limit: int, metric: str, post_type: Optional[str],
+                         now: float) -> List[Dict]:
+        start = now - window_hours * 3600
+        field = COUNT_FIELDS.index(metric) + 1
+        # Posts whose counts last changed before the window gained nothing in it, so SQLite skips them
+        rows = self.storage.engagement_changed_since(int(start), post_type).fetchall()
+        if not rows:
+            return []
+        post_ids, created_times, first_times, lengths, histories = zip(*rows)
+        samples, starts = decode_histories(histories, first_times, lengths)
+        latest = samples[starts + np.asarray(lengths) - 1, field]
+
+        # Same baseline as _baseline, for every post at once: histories are sorted by time,
+        # so the number of samples at or before the window start locates the baseline sample
+        seen = np.add.reduceat((samples[:, 0] <= start).astype(np.int64), starts)
+        created = np.array([datetime.fromisoformat(created_time).timestamp() for created_time in created_times])
+        baseline = np.where(
+            seen > 0,
+            samples[starts + seen - 1, field],
+            np.where(created >= start, 0, samples[starts, field])
+        )
+        gains = latest - baseline
+
+        # Partial selection of the top `limit`, then a full sort of just those
+        candidates = np.flatnonzero(gains > 0)
+        if len(candidates) > limit:
+            candidates = candidates[np.argpartition(-gains[candidates], limit - 1)[:limit]]
+        ranked = sorted(candidates.tolist(), key=lambda index: (-gains[index], post_ids[index]))
+        return [
+            {"postId": post_ids[index], "gained": int(gains[index]), "perHour": int(gains[index]) / window_hours}
+            for index in ranked
+        ]
\ No newline at end of file
@@ -0,0 +1,63 @@
+import csv
+import io
+import zlib
+import orjson
+from datetime import datetime
+from typing import AsyncIterator, List, Optional
+from app.config import settings
+from app.services.executor import BlockingExecutor
+from app.services.storage_service import POST_COLUMNS, StorageService
+
+# Media type of each export format
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv"
+}
+
+CREATED_TIME = POST_COLUMNS.index("created_time")
+POST_ID = POST_COLUMNS.index("id")
+
+class ExportService:
+    """Streams stored posts and articles as NDJSON or CSV, one storage chunk at a time"""
+
+    def __init__(self, storage: StorageService, io_executor: BlockingExecutor, chunk_size: Optional[int] = None):
+        self.storage = storage
+        self.io = io_executor
+        self.chunk_size = chunk_size or settings.EXPORT_CHUNK_SIZE
+
+    async def stream(self, fmt: str, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                     post_type: Optional[str] = None, compress: bool = False) -> AsyncIterator[bytes]:
+        """Yield the encoded export; memory stays bounded by the chunk size however long the history is"""
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {fmt}")
+        # wbits=31 writes a gzip container rather than a raw zlib stream
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+
+        def encode(data: bytes) -> bytes:
+            return compressor.compress(data) if compressor else data
+
+        def next_chunk(after: Optional[tuple]):
+            # Query, encoding and compression all run in the I/O pool
+            rows = self.storage.export_posts(after, self.chunk_size, start, end, post_type)
+            last = (rows[-1][CREATED_TIME], rows[-1][POST_ID]) if rows else None
+            return last, len(rows), encode(self._encode_rows(fmt, rows))
+
+        if fmt == "csv":
+            yield encode(self._encode_rows(fmt, [POST_COLUMNS]))
+        after = None
+        while True:
+            after, count, data = await self.io.run(next_chunk, after)
+            if data:
+                yield data
+            if count < self.chunk_size:
+                break
+        if compressor:
+            yield compressor.flush()
+
+    def _encode_rows(self, fmt: str, rows: List[tuple]) -> bytes:
+        """Encode rows as NDJSON lines or CSV records"""
+        if fmt == "ndjson":
+            return b"".join(orjson.dumps(dict(zip(POST_COLUMNS, row))) + b"\n" for row in rows)
+        buffer = io.StringIO()
+        csv.writer(buffer).writerows(rows)
+        return buffer.getvalue().encode()
\ No newline at end of file
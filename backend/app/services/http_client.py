@@ -0,0 +1,104 @@
+import asyncio
+import hashlib
+import time
+from typing import Dict, Optional
+import aiohttp
+from app.config import settings
+from app.services.metrics import UPSTREAM_LATENCY
+from app.services.upstream_scheduler import LinkedInAPIError, UpstreamScheduler
+
+class LinkedInHttpClient:
+    """Long-lived aiohttp session shared by every LinkedIn call in the app"""
+
+    def __init__(self, pool_size: Optional[int] = None, keepalive_timeout: Optional[float] = None,
+                 request_timeout: Optional[float] = None, scheduler: Optional[UpstreamScheduler] = None):
+        self.scheduler = scheduler or UpstreamScheduler()
+        self.pool_size = pool_size or settings.LINKEDIN_HTTP_POOL_SIZE
+        self.keepalive_timeout = keepalive_timeout or settings.LINKEDIN_HTTP_KEEPALIVE
+        self.request_timeout = request_timeout or settings.LINKEDIN_HTTP_TIMEOUT
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._lock = asyncio.Lock()
+
+    async def start(self):
+        """Open the pooled session (called from the app lifespan)"""
+        async with self._lock:
+            if self._session is None or self._session.closed:
+                connector = aiohttp.TCPConnector(
+                    limit=self.pool_size,
+                    limit_per_host=self.pool_size,
+                    keepalive_timeout=self.keepalive_timeout,
+                    ttl_dns_cache=300
+                )
+                self._session = aiohttp.ClientSession(
+                    connector=connector,
+                    timeout=aiohttp.ClientTimeout(total=self.request_timeout)
+                )
+
+    async def close(self):
+        """Close the pooled session and release its connections"""
+        async with self._lock:
+            if self._session is not None and not self._session.closed:
+                await self._session.close()
+            self._session = None
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Return the open session, starting it lazily outside the lifespan (scripts, benchmarks)"""
+        if self._session is None or self._session.closed:
+            await self.start()
+        return self._session
+
+    async def get_json(self, url: str, headers: Dict, resource: str, timeout: Optional[float] = None) -> Dict:
+        """GET a LinkedIn resource through the upstream scheduler and decode the JSON body"""
+        # Rate limits are tracked per access token without keeping the token itself around
+        token_key = hashlib.sha256(headers.get("Authorization", "").encode()).hexdigest()[:16]
+        return await self.scheduler.run(token_key, lambda: self._get_json_once(url, headers, resource, timeout))
+
+    async def _get_json_once(self, url: str, headers: Dict, resource: str, timeout: Optional[float]) -> Dict:
+        session = await self._get_session()
+        call_timeout = aiohttp.ClientTimeout(total=timeout or self.request_timeout)
+        outcome = "error"
+        start = time.perf_counter()
+        try:
+            async with session.get(url, headers=headers, timeout=call_timeout) as response:
+                outcome = str(response.status)
+                if response.status != 200:
+                    raise LinkedInAPIError(
+                        response.status,
+                        f"Failed to fetch {resource}: {await response.text()}",
+                        self._retry_after(response.headers.get("Retry-After"))
+                    )
+                return await response.json()
+        finally:
+            UPSTREAM_LATENCY.observe(time.perf_counter() - start, resource=resource, outcome=outcome)
+
+    async def get_bytes(self, url: str, resource: str, max_size: int, timeout: Optional[float] = None) -> bytes:
+        """GET a binary resource such as an image from LinkedIn's media CDN, up to max_size bytes.
+
+        Media URLs are pre-signed rather than API calls, so they bypass the API rate limits and retries.
+        """
+        session = await self._get_session()
+        call_timeout = aiohttp.ClientTimeout(total=timeout or self.request_timeout)
+        outcome = "error"
+        start = time.perf_counter()
+        try:
+            async with session.get(url, timeout=call_timeout) as response:
+                outcome = str(response.status)
+                if response.status != 200:
+                    raise LinkedInAPIError(response.status, f"Failed to fetch {resource}: HTTP {response.status}")
+                chunks, size = [], 0
+                async for chunk in response.content.iter_chunked(64 * 1024):
+                    size += len(chunk)
+                    if size > max_size:
+                        raise ValueError(f"{resource} is larger than {max_size} bytes")
+                    chunks.append(chunk)
+                return b"".join(chunks)
+        finally:
+            UPSTREAM_LATENCY.observe(time.perf_counter() - start, resource=resource, outcome=outcome)
+
+    @staticmethod
+    def _retry_after(value: Optional[str]) -> Optional[float]:
+        """Parse a Retry-After header given in seconds"""
+        try:
+            return float(value) if value else None
+        except ValueError:
+            return None
\ No newline at end of file
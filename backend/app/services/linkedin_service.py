@@ -1,111 +1,343 @@
 import os
-from linkedin import linkedin
+import time
+import asyncio
+import logging
+from functools import cached_property
+from urllib.parse import quote
+from app.config import settings
 from app.models.linkedin_data import ProfileData, PostData
 from datetime import datetime, timedelta
 from app.services.storage_service import StorageService
-import aiohttp
-from typing import Dict, List, Optional
+from app.services.http_client import LinkedInHttpClient
+from app.services.cache_service import credential_key
+from app.services.executor import BlockingExecutor
+from app.services.media_cache import MEDIA_ERRORS, MediaCache
+from app.services.upstream_scheduler import LinkedInAPIError
+from typing import AbstractSet, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# PostData count fields, in the order _engagement_counts returns them
+COUNT_FIELDS = ("likes_count", "comments_count", "shares_count")
+
+# Profile response field -> the /me projection field it is built from; email and profilePicture
+# come from their own sub-requests
+PROFILE_FIELDS = {
+    "id": "id",
+    "firstName": "localizedFirstName",
+    "lastName": "localizedLastName",
+    "headline": "headline",
+    "location": "location",
+    "industry": "industry",
+    "summary": "summary",
+    "email": None,
+    "profilePicture": None,
+    "experiences": "positions",
+    "education": "educations",
+    "skills": "skills",
+    "websites": "websites"
+}
 
 class LinkedInService:
-    def __init__(self):
+    def __init__(self, http: Optional[LinkedInHttpClient] = None, storage: Optional[StorageService] = None,
+                 io_executor: Optional[BlockingExecutor] = None, legacy_executor: Optional[BlockingExecutor] = None,
+                 media: Optional[MediaCache] = None):
         self.client_id = os.getenv("LINKEDIN_CLIENT_ID")
         self.client_secret = os.getenv("LINKEDIN_CLIENT_SECRET")
         self.access_token = os.getenv("LINKEDIN_ACCESS_TOKEN")
-        self.storage = StorageService()
-        
-        self.authentication = linkedin.LinkedInAuthentication(
-            self.client_id,
-            self.client_secret,
-            "http://localhost:8000/callback",
-            ['r_liteprofile', 'r_emailaddress', 'w_member_social']
-        )
-        
-        self.application = linkedin.LinkedInApplication(token=self.access_token)
+        self.storage = storage or StorageService()
         
         # Cache duration (24 hours)
         self.cache_duration = timedelta(hours=24)
 
-        self.base_url = "https://api.linkedin.com/v2"
+        self.base_url = settings.LINKEDIN_API_BASE_URL
+        self.http = http or LinkedInHttpClient()
+        # Storage calls and the synchronous python-linkedin-v2 client run in their own bounded pools,
+        # so a slow legacy call can exhaust its pool but never the storage pool or the event loop
+        self.io = io_executor or BlockingExecutor(settings.IO_THREADS, "io")
+        self.legacy = legacy_executor or BlockingExecutor(settings.LINKEDIN_LEGACY_THREADS, "linkedin-legacy")
+        # Profile pictures are served through this cache when set, instead of linking LinkedIn's full-size image
+        self.media = media
+        # Per sub-request timeout; a slow projection fails fast instead of holding the whole profile
+        self.call_timeout = settings.LINKEDIN_HTTP_TIMEOUT
+        self.sync_page_size = settings.LINKEDIN_SYNC_PAGE_SIZE
+        self.count_refresh_limit = settings.LINKEDIN_COUNT_REFRESH_LIMIT
         self.scopes = [
             "r_liteprofile",
             "r_emailaddress",
             "w_member_social"
         ]
 
-    def _is_cache_valid(self, data_type: str) -> bool:
+    @cached_property
+    def authentication(self):
+        """OAuth helper from python-linkedin-v2, only built when the login flow needs it"""
+        from linkedin import linkedin
+        return linkedin.LinkedInAuthentication(
+            self.client_id,
+            self.client_secret,
+            "http://localhost:8000/callback",
+            ['r_liteprofile', 'r_emailaddress', 'w_member_social']
+        )
+
+    @cached_property
+    def application(self):
+        """python-linkedin-v2 client, only built when a legacy call needs it"""
+        from linkedin import linkedin
+        return linkedin.LinkedInApplication(token=self.access_token)
+
+    async def _is_cache_valid(self, data_type: str) -> bool:
         """Check if cached data is still valid"""
-        last_updated = self.storage.get_last_updated(data_type)
+        last_updated = await self.io.run(self.storage.get_last_updated, data_type)
         if not last_updated:
             return False
         return datetime.now() - last_updated < self.cache_duration
 
-    async def get_profile(self, credentials: Dict) -> Dict:
-        """Get LinkedIn profile data"""
-        async with aiohttp.ClientSession() as session:
-            # Get basic profile
-            profile_url = f"{self.base_url}/me"
-            headers = {
-                "Authorization": f"Bearer {credentials['access_token']}",
-                "X-Restli-Protocol-Version": "2.0.0"
-            }
-            
-            async with session.get(profile_url, headers=headers) as response:
-                if response.status != 200:
-                    raise Exception(f"Failed to fetch profile: {await response.text()}")
-                basic_profile = await response.json()
-
-            # Get email address
-            email_url = f"{self.base_url}/emailAddress?q=members&projection=(elements*(handle~))"
-            async with session.get(email_url, headers=headers) as response:
-                if response.status != 200:
-                    raise Exception(f"Failed to fetch email: {await response.text()}")
-                email_data = await response.json()
-                email = email_data.get("elements", [{}])[0].get("handle~", {}).get("emailAddress", "")
-
-            # Get profile picture
-            picture_url = f"{self.base_url}/me?projection=(profilePicture(displayImage~:playableStreams))"
-            async with session.get(picture_url, headers=headers) as response:
-                if response.status != 200:
-                    raise Exception(f"Failed to fetch profile picture: {await response.text()}")
-                picture_data = await response.json()
-                picture_elements = picture_data.get("profilePicture", {}).get("displayImage~", {}).get("elements", [])
-                profile_picture = picture_elements[-1].get("identifiers", [{}])[0].get("identifier", "") if picture_elements else ""
-
-            # Get full profile
-            full_profile_url = f"{self.base_url}/me?projection=(id,localizedFirstName,localizedLastName,headline,location,industry,summary,positions,educations,skills,websites)"
-            async with session.get(full_profile_url, headers=headers) as response:
-                if response.status != 200:
-                    raise Exception(f"Failed to fetch full profile: {await response.text()}")
-                full_profile = await response.json()
-
-            # Format the response
-            return {
-                "id": basic_profile.get("id", ""),
-                "firstName": basic_profile.get("localizedFirstName", ""),
-                "lastName": basic_profile.get("localizedLastName", ""),
-                "headline": full_profile.get("headline", ""),
-                "location": full_profile.get("location", {}).get("name", ""),
-                "industry": full_profile.get("industry", ""),
-                "summary": full_profile.get("summary", ""),
-                "email": email,
-                "profilePicture": profile_picture,
-                "experiences": self._format_positions(full_profile.get("positions", {}).get("elements", [])),
-                "education": self._format_education(full_profile.get("educations", {}).get("elements", [])),
-                "skills": self._format_skills(full_profile.get("skills", {}).get("elements", [])),
-                "websites": self._format_websites(full_profile.get("websites", {}).get("elements", []))
-            }
-
-    async def get_posts(self, credentials: Dict) -> List[Dict]:
-        """Get LinkedIn posts"""
-        # Note: This requires additional permissions and API access
-        # For now, return an empty list
-        return []
-
-    async def get_articles(self, credentials: Dict) -> List[Dict]:
-        """Get LinkedIn articles"""
-        # Note: This requires additional permissions and API access
-        # For now, return an empty list
-        return []
+    def _auth_headers(self, credentials: Dict) -> Dict:
+        """Build the request headers for a credential set"""
+        return {
+            "Authorization": f"Bearer {credentials['access_token']}",
+            "X-Restli-Protocol-Version": "2.0.0"
+        }
+
+    async def _gather(self, *calls):
+        """Run upstream calls concurrently; if one fails, cancel the rest instead of leaving them queued"""
+        tasks = [asyncio.ensure_future(call) for call in calls]
+        try:
+            return await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+
+    async def get_profile(self, credentials: Dict, fields: Optional[AbstractSet[str]] = None) -> Dict:
+        """Get LinkedIn profile data, limited to `fields` (see PROFILE_FIELDS; every field when None).
+
+        Only the sub-requests and /me projection fields the requested fields need are fetched.
+        With a media cache, profilePicture is a media URL for a resized copy instead of LinkedIn's own.
+        """
+        fields = PROFILE_FIELDS.keys() if fields is None else fields
+        headers = self._auth_headers(credentials)
+        projection = [PROFILE_FIELDS[field] for field in PROFILE_FIELDS if field in fields and PROFILE_FIELDS[field]]
+
+        # The sub-resources are independent, so fetch them concurrently over the shared pool
+        calls = {}
+        if projection:
+            calls["me"] = self.http.get_json(
+                f"{self.base_url}/me?projection=({','.join(projection)})", headers, "profile",
+                timeout=self.call_timeout
+            )
+        if "email" in fields:
+            calls["email"] = self.http.get_json(
+                f"{self.base_url}/emailAddress?q=members&projection=(elements*(handle~))",
+                headers, "email", timeout=self.call_timeout
+            )
+        if "profilePicture" in fields:
+            calls["picture"] = self.http.get_json(
+                f"{self.base_url}/me?projection=(profilePicture(displayImage~:playableStreams))",
+                headers, "profile picture", timeout=self.call_timeout
+            )
+        responses = dict(zip(calls, await self._gather(*calls.values())))
+        me = responses.get("me", {})
+
+        # Only the requested fields are formatted
+        formatters = {
+            "id": lambda: me.get("id", ""),
+            "firstName": lambda: me.get("localizedFirstName", ""),
+            "lastName": lambda: me.get("localizedLastName", ""),
+            "headline": lambda: me.get("headline", ""),
+            "location": lambda: me.get("location", {}).get("name", ""),
+            "industry": lambda: me.get("industry", ""),
+            "summary": lambda: me.get("summary", ""),
+            "email": lambda: self._format_email(responses["email"]),
+            "profilePicture": lambda: self._format_picture(responses["picture"]),
+            "experiences": lambda: self._format_positions(me.get("positions", {}).get("elements", [])),
+            "education": lambda: self._format_education(me.get("educations", {}).get("elements", [])),
+            "skills": lambda: self._format_skills(me.get("skills", {}).get("elements", [])),
+            "websites": lambda: self._format_websites(me.get("websites", {}).get("elements", []))
+        }
+        profile = {field: formatters[field]() for field in PROFILE_FIELDS if field in fields}
+        if profile.get("profilePicture") and self.media is not None:
+            profile["profilePicture"] = await self._proxy_picture(profile["profilePicture"])
+        return profile
+
+    def _format_email(self, email_data: Dict) -> str:
+        """Primary email address from the emailAddress response"""
+        return email_data.get("elements", [{}])[0].get("handle~", {}).get("emailAddress", "")
+
+    def _format_picture(self, picture_data: Dict) -> str:
+        """URL of the largest profile picture rendition (the last displayImage~ element)"""
+        elements = picture_data.get("profilePicture", {}).get("displayImage~", {}).get("elements", [])
+        return elements[-1].get("identifiers", [{}])[0].get("identifier", "") if elements else ""
+
+    async def _proxy_picture(self, url: str) -> str:
+        """Media URL of the picture at the width the dashboard shows it; the LinkedIn URL if it cannot be cached"""
+        try:
+            return await self.media.proxy_path(url, settings.PROFILE_PICTURE_WIDTH)
+        except MEDIA_ERRORS as e:
+            logger.warning("Could not cache the profile picture, linking LinkedIn's copy: %r", e)
+            return url
+
+    async def get_posts(self, cursor: Optional[str] = None, limit: int = 50,
+                        fields: Optional[AbstractSet[str]] = None) -> Dict:
+        """Get a page of stored LinkedIn posts, newest first, limited to `fields` (every column when None)"""
+        return await self.io.run(self.storage.get_posts_page, 'post', cursor, limit, fields)
+
+    async def get_articles(self, cursor: Optional[str] = None, limit: int = 50,
+                           fields: Optional[AbstractSet[str]] = None) -> Dict:
+        """Get a page of stored LinkedIn articles, newest first, limited to `fields` (every column when None)"""
+        return await self.io.run(self.storage.get_posts_page, 'article', cursor, limit, fields)
+
+    async def get_data_state(self) -> Tuple[int, Optional[datetime]]:
+        """Stored post data version and when it last changed"""
+        return await self.io.run(self.storage.get_data_state)
+
+    async def search_posts(self, query: str, post_type: Optional[str] = None, start: Optional[datetime] = None,
+                           end: Optional[datetime] = None, cursor: Optional[str] = None, limit: int = 50) -> Dict:
+        """Full-text search over stored posts and articles"""
+        return await self.io.run(self.storage.search_posts, query, post_type, start, end, cursor, limit)
+
+    async def sync_posts(self, credentials: Dict) -> int:
+        """Fetch posts created or changed since the last sync and upsert them"""
+        return await self._sync(credentials, 'posts')
+
+    async def sync_articles(self, credentials: Dict) -> int:
+        """Fetch articles created or changed since the last sync and upsert them"""
+        return await self._sync(credentials, 'articles')
+
+    async def _sync(self, credentials: Dict, data_type: str) -> int:
+        """Page through upstream newest-first until reaching the stored high-water mark, then refresh recent counts"""
+        account = credential_key(credentials)
+        state = await self.io.run(self.storage.get_sync_state, account, data_type)
+        headers = self._auth_headers(credentials)
+
+        author = state.get("author")
+        if not author:
+            me = await self.http.get_json(f"{self.base_url}/me", headers, "profile", timeout=self.call_timeout)
+            author = f"urn:li:person:{me['id']}"
+
+        high_water_mark = state.get("high_water_mark", 0)
+        newest = high_water_mark
+        changed = 0
+        fetched = set()
+        start = 0
+        while True:
+            page = await self.http.get_json(
+                self._feed_url(data_type, author, start), headers, data_type, timeout=self.call_timeout
+            )
+            elements = page.get("elements", [])
+            fresh = [element for element in elements if self._modified_time(element) > high_water_mark]
+            if fresh:
+                fetched.update(element["id"] for element in fresh)
+                items = await self._format_feed_items(fresh, headers, data_type)
+                save = self.storage.save_posts if data_type == 'posts' else self.storage.save_articles
+                await self.io.run(save, items)
+                changed += len(fresh)
+                newest = max(newest, max(self._modified_time(element) for element in fresh))
+            # Upstream is sorted by last modification, so an already-seen item means we have caught up
+            if len(fresh) < len(elements) or len(elements) < self.sync_page_size:
+                break
+            start += self.sync_page_size
+
+        changed += await self._refresh_counts(headers, data_type, fetched)
+        if not changed:
+            await self.io.run(self.storage.mark_updated, data_type)
+        await self.io.run(self.storage.set_sync_state, account, data_type, {"author": author, "high_water_mark": newest})
+        return changed
+
+    async def _refresh_counts(self, headers: Dict, data_type: str, fetched: AbstractSet[str]) -> int:
+        """Re-read the engagement counts of recently created items and upsert the ones that changed.
+
+        Gaining likes, comments or shares does not move an item's lastModified, so the incremental pass
+        never sees it again. Bounded by LINKEDIN_COUNT_REFRESH_LIMIT/_DAYS; items the incremental pass just
+        fetched are skipped. Every item re-read is recorded in its engagement history. Best effort: a failure
+        keeps the stored counts until the next sync.
+        """
+        if self.count_refresh_limit <= 0:
+            return 0
+        since = datetime.now() - timedelta(days=settings.LINKEDIN_COUNT_REFRESH_DAYS)
+        post_type = 'post' if data_type == 'posts' else 'article'
+        rows = await self.io.run(self.storage.get_recent_posts, post_type, since, self.count_refresh_limit)
+        rows = [row for row in rows if row["id"] not in fetched]
+        if not rows:
+            return 0
+        try:
+            social_actions = await self._social_actions([row["id"] for row in rows], headers)
+        except LinkedInAPIError as e:
+            logger.warning("Could not refresh %s engagement counts: %r", data_type, e)
+            return 0
+        observed_at = int(time.time())
+        updated, unchanged = [], []
+        for row, actions in zip(rows, social_actions):
+            counts = dict(zip(COUNT_FIELDS, self._engagement_counts(actions)))
+            if any(row[field] != value for field, value in counts.items()):
+                updated.append(self._trusted_post({**row, **counts}))
+            else:
+                unchanged.append((row["id"], observed_at, *(value or 0 for value in counts.values())))
+        if updated:
+            # Upserting moves the rollups, the data version and the engagement history along with the counts
+            save = self.storage.save_posts if data_type == 'posts' else self.storage.save_articles
+            await self.io.run(save, updated)
+        if unchanged:
+            # Still an observation: items stored before histories were kept get their first sample
+            await self.io.run(self.storage.record_engagement, unchanged)
+        return len(updated)
+
+    def _feed_url(self, data_type: str, author: str, start: int) -> str:
+        """Build the paged upstream URL for posts or articles by an author"""
+        resource = "ugcPosts" if data_type == 'posts' else "originalArticles"
+        return (
+            f"{self.base_url}/{resource}?q=authors&authors=List({quote(author, safe='')})"
+            f"&sortBy=LAST_MODIFIED&start={start}&count={self.sync_page_size}"
+        )
+
+    def _modified_time(self, element: Dict) -> int:
+        """Last modification time of an upstream item in epoch milliseconds"""
+        return element.get("lastModified", {}).get("time") or element.get("created", {}).get("time", 0)
+
+    async def _format_feed_items(self, elements: List[Dict], headers: Dict, data_type: str) -> List[PostData]:
+        """Convert upstream items to PostData, fetching engagement counts concurrently"""
+        social_actions = await self._social_actions([element["id"] for element in elements], headers)
+        post_type = 'post' if data_type == 'posts' else 'article'
+        return [
+            self._format_feed_item(element, actions, post_type)
+            for element, actions in zip(elements, social_actions)
+        ]
+
+    async def _social_actions(self, ids: List[str], headers: Dict) -> List[Dict]:
+        """Fetch the socialActions summary of each item concurrently"""
+        return await self._gather(*[
+            self.http.get_json(
+                f"{self.base_url}/socialActions/{quote(item_id, safe='')}",
+                headers, "social actions", timeout=self.call_timeout
+            )
+            for item_id in ids
+        ])
+
+    def _engagement_counts(self, actions: Dict) -> Tuple[Optional[int], Optional[int], Optional[int]]:
+        """Likes, comments and shares from a socialActions summary"""
+        return (
+            actions.get("likesSummary", {}).get("totalLikes"),
+            actions.get("commentsSummary", {}).get("aggregatedTotalComments"),
+            actions.get("sharesSummary", {}).get("totalShares")
+        )
+
+    def _format_feed_item(self, element: Dict, actions: Dict, post_type: str) -> PostData:
+        """Format a ugcPost/originalArticle element"""
+        share = element.get("specificContent", {}).get("com.linkedin.ugc.ShareContent", {})
+        text = share.get("shareCommentary", {}).get("text") or element.get("title", "")
+        created_ms = element.get("created", {}).get("time") or self._modified_time(element)
+        likes, comments, shares = self._engagement_counts(actions)
+        return PostData(
+            id=element["id"],
+            text=text,
+            created_time=datetime.fromtimestamp(created_ms / 1000),
+            likes_count=likes,
+            comments_count=comments,
+            shares_count=shares,
+            url=element.get("permalink") or f"https://www.linkedin.com/feed/update/{element['id']}",
+            type=post_type
+        )
 
     def _format_positions(self, positions: List[Dict]) -> List[Dict]:
         """Format position data"""
@@ -150,13 +382,14 @@ class LinkedInService:
         Fetch the authenticated user's profile data
         """
         # Check cache first
-        if self._is_cache_valid('profile'):
-            cached_data = self.storage.get_profile()
+        if await self._is_cache_valid('profile'):
+            cached_data = await self.io.run(self.storage.get_profile)
             if cached_data:
-                return ProfileData(**cached_data)
+                # We validated this profile before storing it; don't pay for validation again
+                return ProfileData.model_construct(**cached_data)
 
         # Fetch fresh data
-        profile = self.application.get_profile()
+        profile = await self.legacy.run(lambda: self.application.get_profile())
         profile_data = ProfileData(
             id=profile['id'],
             firstName=profile['firstName'],
@@ -170,65 +403,36 @@ class LinkedInService:
         )
         
         # Save to cache
-        self.storage.save_profile(profile_data)
+        await self.io.run(self.storage.save_profile, profile_data)
         return profile_data
 
-    async def get_posts_data(self) -> list[PostData]:
+    def _default_credentials(self) -> Dict:
+        """Credentials from the environment, used by the non-request data helpers"""
+        return {
+            "client_id": self.client_id,
+            "client_secret": self.client_secret,
+            "access_token": self.access_token
+        }
+
+    async def get_posts_data(self) -> List[PostData]:
         """
         Fetch the authenticated user's posts
         """
-        # Check cache first
-        if self._is_cache_valid('posts'):
-            cached_data = self.storage.get_posts()
-            if cached_data:
-                return [PostData(**post) for post in cached_data]
+        # Only pull what changed upstream since the last sync
+        if not await self._is_cache_valid('posts'):
+            await self.sync_posts(self._default_credentials())
+        return [self._trusted_post(post) for post in await self.io.run(self.storage.get_posts)]
 
-        # Fetch fresh data
-        posts = self.application.get_posts()
-        posts_data = [
-            PostData(
-                id=post['id'],
-                text=post['text'],
-                created_time=datetime.fromisoformat(post['created_time']),
-                likes_count=post.get('likes_count'),
-                comments_count=post.get('comments_count'),
-                shares_count=post.get('shares_count'),
-                url=post.get('url'),
-                type='post'
-            )
-            for post in posts
-        ]
-        
-        # Save to cache
-        self.storage.save_posts(posts_data)
-        return posts_data
-
-    async def get_articles_data(self) -> list[PostData]:
+    async def get_articles_data(self) -> List[PostData]:
         """
         Fetch the authenticated user's articles
         """
-        # Check cache first
-        if self._is_cache_valid('articles'):
-            cached_data = self.storage.get_articles()
-            if cached_data:
-                return [PostData(**article) for article in cached_data]
+        # Only pull what changed upstream since the last sync
+        if not await self._is_cache_valid('articles'):
+            await self.sync_articles(self._default_credentials())
+        return [self._trusted_post(article) for article in await self.io.run(self.storage.get_articles)]
 
-        # Fetch fresh data
-        articles = self.application.get_articles()
-        articles_data = [
-            PostData(
-                id=article['id'],
-                text=article['text'],
-                created_time=datetime.fromisoformat(article['created_time']),
-                likes_count=article.get('likes_count'),
-                comments_count=article.get('comments_count'),
-                shares_count=article.get('shares_count'),
-                url=article.get('url'),
-                type='article'
-            )
-            for article in articles
-        ]
-        
-        # Save to cache
-        self.storage.save_articles(articles_data)
-        return articles_data 
\ No newline at end of file
+    @staticmethod
+    def _trusted_post(row: Dict) -> PostData:
+        """Build a PostData from a stored row without re-validating data we wrote ourselves"""
+        return PostData.model_construct(**{**row, "created_time": datetime.fromisoformat(row["created_time"])})
\ No newline at end of file
@@ -0,0 +1,334 @@
+import asyncio
+import hashlib
+import importlib.util
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+import aiohttp
+from app.services.executor import BlockingExecutor
+from app.services.http_client import LinkedInHttpClient
+from app.services.upstream_scheduler import LinkedInAPIError
+
+# Where the linkedin router serves cached images (see app/api/linkedin.py)
+MEDIA_PATH = "/api/linkedin/media"
+
+# Leading bytes of each image format served -> file extension; WebP is RIFF....WEBP
+SIGNATURES = ((b"\xff\xd8\xff", "jpg"), (b"\x89PNG\r\n\x1a\n", "png"), (b"GIF87a", "gif"), (b"GIF89a", "gif"))
+PIL_FORMATS = {"jpg": "JPEG", "png": "PNG", "gif": "GIF", "webp": "WEBP"}
+
+# <digest>.<ext> in media URLs and for originals on disk, <digest>.w<width>.<ext> for resized copies
+MEDIA_NAME = re.compile(r"^([0-9a-f]{64})\.(jpg|png|gif|webp)$")
+FILE_NAME = re.compile(r"^[0-9a-f]{64}(\.w\d+)?\.(jpg|png|gif|webp)$")
+
+# Recency is persisted as the file's mtime, refreshed at most this often (seconds) per file
+TOUCH_INTERVAL = 3600
+# Source URLs are pre-signed and expire; rows older than this are dropped (seconds)
+SOURCE_RETENTION = 30 * 24 * 3600
+MAX_REMEMBERED_SOURCES = 4096
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    url TEXT PRIMARY KEY,
+    digest TEXT NOT NULL,
+    ext TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_sources_digest ON sources (digest, fetched_at);
+"""
+
+class MediaNotFound(Exception):
+    """The image is not cached and its source can no longer be fetched"""
+
+# Failures that make the profile fall back to the LinkedIn URL instead of a proxy URL
+MEDIA_ERRORS = (LinkedInAPIError, MediaNotFound, ValueError, OSError, aiohttp.ClientError, asyncio.TimeoutError)
+
+def thumbnails_available() -> bool:
+    """Pillow is optional; without it every width is served the original image"""
+    return importlib.util.find_spec("PIL") is not None
+
+def image_extension(data: bytes) -> Optional[str]:
+    """File extension for the image format data is in, or None if it is not a supported image"""
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP":
+        return "webp"
+    for signature, ext in SIGNATURES:
+        if data.startswith(signature):
+            return ext
+    return None
+
+def parse_media_name(name: str) -> Optional[Tuple[str, str]]:
+    """Digest and extension from a media URL's file name, or None if it is not one"""
+    match = MEDIA_NAME.match(name)
+    return (match.group(1), match.group(2)) if match else None
+
+def resize_image(source: str, target: str, width: int, ext: str):
+    """Write source scaled down (never up) to width to target, in the same format"""
+    from PIL import Image
+    with Image.open(source) as image:
+        if image.width > width:
+            height = max(1, round(image.height * width / image.width))
+            image = image.resize((width, height), Image.Resampling.LANCZOS)
+        options = {"quality": 85} if ext in ("jpg", "webp") else {}
+        image.save(target, PIL_FORMATS[ext], optimize=True, **options)
+
+class MediaCache:
+    """Content-addressed on-disk image cache, bounded in bytes with least-recently-used eviction.
+
+    Originals are stored as <root>/<digest[:2]>/<digest>.<ext>, named by the SHA-256 of their
+    bytes, and each resized width as <digest>.w<width>.<ext> beside them, so a media URL names
+    exactly one image forever. The source URL of every digest is kept in a small SQLite index
+    so an evicted original can be downloaded again. Files are written atomically, so workers
+    can share the directory; each one tracks recency for the files it has seen.
+    """
+
+    def __init__(self, root: str, http: LinkedInHttpClient, io_executor: BlockingExecutor,
+                 executor: BlockingExecutor, max_bytes: int, max_source_bytes: int):
+        self.root = root
+        self.db_file = os.path.join(root, "index.db")
+        self.http = http
+        self.io = io_executor
+        # Decoding and resizing are CPU-bound; their own pool keeps them from delaying storage I/O
+        self.executor = executor
+        self.max_bytes = max_bytes
+        self.max_source_bytes = max_source_bytes
+        self._local = threading.local()
+        # File name relative to root -> size, least recently used first
+        self._files: "OrderedDict[str, int]" = OrderedDict()
+        self._bytes = 0
+        self._sources: Dict[str, Tuple[str, str]] = {}
+        self._pending: Dict[str, asyncio.Future] = {}
+        self._loading: Optional[asyncio.Future] = None
+        self._stats = {"hits": 0, "misses": 0, "downloads": 0, "resized": 0, "evictions": 0}
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return this thread's index connection"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_file, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.root, name)
+
+    @staticmethod
+    def _name(digest: str, ext: str, width: Optional[int]) -> str:
+        suffix = f".w{width}" if width is not None else ""
+        return f"{digest[:2]}/{digest}{suffix}.{ext}"
+
+    def _scan(self) -> List[Tuple[float, str, int]]:
+        """Create the index and list the cached files as (mtime, name, size), oldest first"""
+        os.makedirs(self.root, exist_ok=True)
+        self._connect().executescript(SCHEMA)
+        entries = []
+        for directory in os.scandir(self.root):
+            if not directory.is_dir() or len(directory.name) != 2:
+                continue
+            for entry in os.scandir(directory.path):
+                stat_result = entry.stat()
+                if FILE_NAME.match(entry.name):
+                    entries.append((stat_result.st_mtime, f"{directory.name}/{entry.name}", stat_result.st_size))
+                elif entry.name.endswith(".tmp") and time.time() - stat_result.st_mtime > TOUCH_INTERVAL:
+                    # Left behind by a worker that died mid-write
+                    os.remove(entry.path)
+        entries.sort()
+        return entries
+
+    async def _load(self):
+        for _, name, size in await self.io.run(self._scan):
+            self._files[name] = size
+            self._bytes += size
+
+    async def _ready(self):
+        """Scan the cache directory once, on first use"""
+        if self._loading is None:
+            self._loading = asyncio.ensure_future(self._load())
+        try:
+            await asyncio.shield(self._loading)
+        except Exception:
+            self._loading = None
+            raise
+
+    async def _single_flight(self, key: str, make: Callable[[], Awaitable]):
+        """Run make() once for concurrent callers with the same key; a cancelled caller does not cancel it"""
+        task = self._pending.get(key)
+        if task is None:
+            task = asyncio.ensure_future(make())
+            self._pending[key] = task
+
+            def done(task: asyncio.Future):
+                self._pending.pop(key, None)
+                if not task.cancelled():
+                    task.exception()
+
+            task.add_done_callback(done)
+        return await asyncio.shield(task)
+
+    def _stat(self, name: str) -> Optional[os.stat_result]:
+        """Stat a cached file (None if it is gone), refreshing its mtime so recency survives restarts"""
+        path = self._path(name)
+        try:
+            stat_result = os.stat(path)
+            if time.time() - stat_result.st_mtime > TOUCH_INTERVAL:
+                os.utime(path)
+                stat_result = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return stat_result
+
+    def _write(self, name: str, data: bytes) -> os.stat_result:
+        path = self._path(name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        return os.stat(path)
+
+    def _resize(self, source: str, name: str, width: int, ext: str) -> os.stat_result:
+        path = self._path(name)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        resize_image(self._path(source), tmp, width, ext)
+        os.replace(tmp, path)
+        return os.stat(path)
+
+    def _remove(self, names: List[str]):
+        for name in names:
+            try:
+                os.remove(self._path(name))
+            except FileNotFoundError:
+                pass
+
+    async def _add(self, name: str, size: int):
+        """Record a file as most recently used and evict the least recently used ones over the byte budget"""
+        self._bytes += size - self._files.pop(name, 0)
+        self._files[name] = size
+        victims = []
+        while self._bytes > self.max_bytes and len(self._files) > 1:
+            victim, victim_size = self._files.popitem(last=False)
+            self._bytes -= victim_size
+            victims.append(victim)
+        if victims:
+            self._stats["evictions"] += len(victims)
+            await self.io.run(self._remove, victims)
+
+    def _lookup_url(self, url: str) -> Optional[Tuple[str, str]]:
+        row = self._connect().execute("SELECT digest, ext FROM sources WHERE url = ?", (url,)).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def _lookup_digest(self, digest: str) -> Optional[str]:
+        row = self._connect().execute(
+            "SELECT url FROM sources WHERE digest = ? ORDER BY fetched_at DESC LIMIT 1", (digest,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def _save_source(self, url: str, digest: str, ext: str):
+        now = time.time()
+        conn = self._connect()
+        conn.execute("INSERT OR REPLACE INTO sources (url, digest, ext, fetched_at) VALUES (?, ?, ?, ?)",
+                     (url, digest, ext, now))
+        conn.execute("DELETE FROM sources WHERE fetched_at < ?", (now - SOURCE_RETENTION,))
+
+    async def _download(self, url: str) -> bytes:
+        self._stats["downloads"] += 1
+        return await self.http.get_bytes(url, "media", self.max_source_bytes)
+
+    async def register(self, url: str) -> Tuple[str, str]:
+        """Digest and extension of the image at url, downloading and storing it the first time it is seen"""
+        source = self._sources.get(url)
+        if source is None:
+            source = await self._single_flight(url, lambda: self._register(url))
+            if len(self._sources) >= MAX_REMEMBERED_SOURCES:
+                self._sources.clear()
+            self._sources[url] = source
+        return source
+
+    async def _register(self, url: str) -> Tuple[str, str]:
+        await self._ready()
+        source = await self.io.run(self._lookup_url, url)
+        if source is None:
+            data = await self._download(url)
+            ext = image_extension(data)
+            if ext is None:
+                raise ValueError("Unsupported image format")
+            digest = hashlib.sha256(data).hexdigest()
+            name = self._name(digest, ext, None)
+            stat_result = await self.io.run(self._write, name, data)
+            await self._add(name, stat_result.st_size)
+            await self.io.run(self._save_source, url, digest, ext)
+            source = (digest, ext)
+        return source
+
+    async def proxy_path(self, url: str, width: int) -> str:
+        """Media URL path for the image at url resized to width"""
+        digest, ext = await self.register(url)
+        return f"{MEDIA_PATH}/{digest}.{ext}?w={width}"
+
+    async def open(self, digest: str, ext: str, width: Optional[int] = None) -> Tuple[str, os.stat_result]:
+        """Path and stat of the cached image at width (the original when None), generated on first request"""
+        await self._ready()
+        if not thumbnails_available():
+            width = None
+        name = self._name(digest, ext, width)
+        if name in self._files:
+            stat_result = await self.io.run(self._stat, name)
+            if stat_result is not None:
+                self._files.move_to_end(name)
+                self._stats["hits"] += 1
+                return self._path(name), stat_result
+            # Evicted by another worker
+            self._bytes -= self._files.pop(name)
+        self._stats["misses"] += 1
+        stat_result = await self._single_flight(name, lambda: self._materialize(digest, ext, width))
+        return self._path(name), stat_result
+
+    async def _materialize(self, digest: str, ext: str, width: Optional[int]) -> os.stat_result:
+        """Put the image at width on disk, from the original (downloaded again if evicted) when missing"""
+        name = self._name(digest, ext, width)
+        stat_result = await self.io.run(self._stat, name)
+        if stat_result is None:
+            if width is None:
+                stat_result = await self.io.run(self._write, name, await self._download_source(digest, ext))
+            else:
+                original = self._name(digest, ext, None)
+                for attempt in range(2):
+                    await self._single_flight(original, lambda: self._materialize(digest, ext, None))
+                    try:
+                        stat_result = await self.executor.run(self._resize, original, name, width, ext)
+                        break
+                    except FileNotFoundError:
+                        # The original was evicted (here or by another worker) before it was read; fetch it again
+                        if attempt:
+                            raise
+                self._stats["resized"] += 1
+        await self._add(name, stat_result.st_size)
+        return stat_result
+
+    async def _download_source(self, digest: str, ext: str) -> bytes:
+        url = await self.io.run(self._lookup_digest, digest)
+        if url is None:
+            raise MediaNotFound(digest)
+        try:
+            data = await self._download(url)
+        except LinkedInAPIError as e:
+            # An expired or deleted source
+            if e.status in (403, 404, 410):
+                raise MediaNotFound(digest) from e
+            raise
+        if hashlib.sha256(data).hexdigest() != digest or image_extension(data) != ext:
+            raise MediaNotFound(digest)
+        return data
+
+    def stats(self) -> Dict:
+        return {
+            **self._stats,
+            "files": len(self._files),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "thumbnails": thumbnails_available()
+        }
\ No newline at end of file
@@ -0,0 +1,76 @@
+import sys
+import threading
+from collections import Counter
+from typing import Dict, Optional
+
+class SamplingProfiler:
+    """Low-overhead sampling profiler that can be switched on and off in a running process.
+
+    A background thread records every other thread's stack at a fixed interval; the result is
+    collapsed-stack text ("frame;frame;frame count" per line) ready for flamegraph tools.
+    """
+
+    def __init__(self, max_stacks: int = 10000):
+        self.max_stacks = max_stacks
+        self.interval = 0.01
+        self._samples: Counter = Counter()
+        self._dropped = 0
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, interval: float = 0.01):
+        """Start sampling, discarding any earlier profile"""
+        with self._lock:
+            if self.running:
+                return
+            self.interval = interval
+            self._samples = Counter()
+            self._dropped = 0
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="sampling-profiler", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> str:
+        """Stop sampling and return the collapsed stacks"""
+        with self._lock:
+            if self._thread is not None:
+                self._stop.set()
+                self._thread.join()
+                self._thread = None
+        return self.collapsed()
+
+    def collapsed(self) -> str:
+        """Collapsed stacks collected so far, most frequent first"""
+        return "".join(f"{stack} {count}\n" for stack, count in self._samples.most_common())
+
+    def stats(self) -> Dict:
+        return {
+            "running": self.running,
+            "interval": self.interval,
+            "samples": sum(self._samples.values()),
+            "stacks": len(self._samples),
+            "dropped": self._dropped
+        }
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({code.co_filename}:{frame.f_lineno})")
+                    frame = frame.f_back
+                key = ";".join(reversed(stack))
+                # Bound memory: once full, only stacks already seen keep counting
+                if key in self._samples or len(self._samples) < self.max_stacks:
+                    self._samples[key] += 1
+                else:
+                    self._dropped += 1
\ No newline at end of file
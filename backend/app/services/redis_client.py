@@ -0,0 +1,132 @@
+import asyncio
+from typing import Any, AsyncIterator, List, Optional, Tuple
+from urllib.parse import urlparse
+
+class RedisError(Exception):
+    """Error reply from a Redis-protocol server"""
+
+def _encode_command(args: Tuple[Any, ...]) -> bytes:
+    """Encode a command as a RESP array of bulk strings"""
+    parts = [b"*%d\r\n" % len(args)]
+    for arg in args:
+        data = arg if isinstance(arg, bytes) else str(arg).encode()
+        parts.append(b"$%d\r\n%s\r\n" % (len(data), data))
+    return b"".join(parts)
+
+async def _read_reply(reader: asyncio.StreamReader) -> Any:
+    """Read one RESP2 reply; error replies raise RedisError once fully read, so the connection stays usable"""
+    line = await reader.readuntil(b"\r\n")
+    kind, payload = line[:1], line[1:-2]
+    if kind == b"+":
+        return payload.decode()
+    if kind == b"-":
+        raise RedisError(payload.decode())
+    if kind == b":":
+        return int(payload)
+    if kind == b"$":
+        length = int(payload)
+        if length < 0:
+            return None
+        return (await reader.readexactly(length + 2))[:-2]
+    if kind == b"*":
+        length = int(payload)
+        if length < 0:
+            return None
+        return [await _read_reply(reader) for _ in range(length)]
+    raise RedisError(f"Unexpected reply: {line!r}")
+
+class RedisClient:
+    """Minimal asyncio client for Redis-protocol servers: pooled commands plus pub/sub.
+
+    Only what the shared cache needs; URLs look like redis://[:password@]host[:port][/db].
+    """
+
+    def __init__(self, url: str, pool_size: int = 10, timeout: float = 0.5):
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.timeout = timeout
+        self._idle: List[Tuple[asyncio.StreamReader, asyncio.StreamWriter]] = []
+        self._slots = asyncio.Semaphore(pool_size)
+
+    async def _open(self) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            if self.password:
+                await self._call(reader, writer, ("AUTH", self.password))
+            if self.db:
+                await self._call(reader, writer, ("SELECT", self.db))
+        except BaseException:
+            writer.close()
+            raise
+        return reader, writer
+
+    @staticmethod
+    async def _call(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, args: Tuple[Any, ...]) -> Any:
+        writer.write(_encode_command(args))
+        await writer.drain()
+        return await _read_reply(reader)
+
+    async def execute(self, *args) -> Any:
+        """Run one command on a pooled connection, failing after the client timeout"""
+        async with self._slots:
+            connection = self._idle.pop() if self._idle else None
+            try:
+                if connection is None:
+                    connection = await asyncio.wait_for(self._open(), self.timeout)
+                result = await asyncio.wait_for(self._call(*connection, args), self.timeout)
+            except RedisError:
+                self._idle.append(connection)
+                raise
+            except BaseException:
+                # The reply may be half read; never reuse this connection
+                if connection is not None:
+                    connection[1].close()
+                raise
+            self._idle.append(connection)
+            return result
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.execute("GET", key)
+
+    async def set(self, key: str, value: bytes, px: Optional[int] = None, nx: bool = False) -> bool:
+        """SET with an optional expiry in milliseconds; with nx, only if the key does not exist"""
+        args: List[Any] = ["SET", key, value]
+        if px is not None:
+            args += ["PX", px]
+        if nx:
+            args.append("NX")
+        return await self.execute(*args) is not None
+
+    async def delete(self, *keys: str) -> int:
+        return await self.execute("DEL", *keys)
+
+    async def incr(self, key: str) -> int:
+        return await self.execute("INCR", key)
+
+    async def publish(self, channel: str, message: bytes) -> int:
+        return await self.execute("PUBLISH", channel, message)
+
+    async def eval(self, script: str, keys: List[str], args: List[Any]) -> Any:
+        return await self.execute("EVAL", script, len(keys), *keys, *args)
+
+    async def subscribe(self, *channels: str) -> AsyncIterator[Tuple[str, bytes]]:
+        """Yield (channel, message) pairs from a dedicated connection until the caller stops iterating"""
+        reader, writer = await asyncio.wait_for(self._open(), self.timeout)
+        try:
+            writer.write(_encode_command(("SUBSCRIBE", *channels)))
+            await writer.drain()
+            while True:
+                reply = await _read_reply(reader)
+                # Subscription confirmations are ["subscribe", channel, count]
+                if isinstance(reply, list) and reply[0] == b"message":
+                    yield reply[1].decode(), reply[2]
+        finally:
+            writer.close()
+
+    async def close(self):
+        """Close idle pooled connections"""
+        while self._idle:
+            self._idle.pop()[1].close()
\ No newline at end of file
@@ -0,0 +1,135 @@
+import asyncio
+import logging
+import random
+import time
+from typing import Awaitable, Callable, Dict, Optional
+from app.config import settings
+from app.services.cache_service import credential_key
+from app.services.config_service import ConfigService
+from app.services.linkedin_service import LinkedInService
+from app.services.shared_cache import TieredCache
+from app.services.upstream_scheduler import BACKGROUND, LinkedInAPIError, UpstreamScheduler, upstream_priority
+
+RESOURCES = ("profile", "posts", "articles")
+
+logger = logging.getLogger(__name__)
+
+class RefreshScheduler:
+    """Background loop that re-fetches the configured account's data before its cache entry expires.
+
+    Managed accounts are fetched on demand through /batch and not refreshed here: warming every one
+    would reopen each database past ACCOUNT_CACHE_SIZE on every round.
+    """
+
+    def __init__(self, linkedin_service: LinkedInService, config_service: ConfigService,
+                 response_cache: TieredCache, scheduler: UpstreamScheduler):
+        self.linkedin_service = linkedin_service
+        self.config_service = config_service
+        self.response_cache = response_cache
+        self.scheduler = scheduler
+        self.storage = linkedin_service.storage
+        self.io = linkedin_service.io
+        self.interval = response_cache.ttl * settings.LINKEDIN_REFRESH_AHEAD
+        self.jitter = settings.LINKEDIN_REFRESH_JITTER
+        self.poll = settings.LINKEDIN_REFRESH_POLL
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {"refreshes": 0, "failures": 0, "deferred": 0, "skipped": 0}
+
+    async def start(self):
+        """Start the refresh loop (called from the app lifespan)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        """Stop the refresh loop"""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def _next_run(self, now: float) -> float:
+        """Next run time with jitter so accounts do not all refresh at once"""
+        return now + self.interval * (1 + random.uniform(-self.jitter, self.jitter))
+
+    def _jobs(self, credentials: Dict) -> Dict[str, Callable[[], Awaitable]]:
+        account = credential_key(credentials)
+        return {
+            f"{account}:profile": lambda: self._refresh_profile(account, credentials),
+            f"{account}:posts": lambda: self._sync(
+                account, "posts", lambda: self.linkedin_service.sync_posts(credentials)
+            ),
+            f"{account}:articles": lambda: self._sync(
+                account, "articles", lambda: self.linkedin_service.sync_articles(credentials)
+            )
+        }
+
+    async def _refresh_profile(self, account: str, credentials: Dict):
+        profile = await self.linkedin_service.get_profile(credentials)
+        await self.response_cache.set((account, "profile"), profile, shared=True)
+
+    async def _sync(self, account: str, data_type: str, sync: Callable[[], Awaitable[int]]):
+        changed = await sync()
+        await self.response_cache.set((account, data_type), changed)
+        if changed:
+            # Pages and analytics built from the old data are out of date on every node
+            await self.response_cache.invalidate_resources(account, data_type, "analytics")
+
+    async def _run(self):
+        # Everything this task sends upstream queues behind interactive requests
+        upstream_priority.set(BACKGROUND)
+        while True:
+            try:
+                await self._tick()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Background refresh failed")
+            await asyncio.sleep(self.poll)
+
+    async def _tick(self):
+        credentials = await self.io.run(self.config_service.get_credentials)
+        if not credentials:
+            return
+        jobs = self._jobs(credentials)
+        now = time.time()
+        for job in jobs:
+            # New jobs start at a random point in the interval to spread the first round
+            await self.io.run(self.storage.schedule_refresh, job, now + random.uniform(0, self.interval))
+
+        schedule = await self.io.run(self.storage.get_refresh_schedule)
+        for job, run in jobs.items():
+            if schedule.get(job, float("inf")) > now:
+                continue
+            if self.scheduler.breaker.state == "open":
+                # Upstream is unhealthy; leave due jobs for a later tick rather than spend the budget
+                self._stats["deferred"] += 1
+                return
+            if not await self.io.run(self.storage.claim_refresh, job, now, self._next_run(now)):
+                continue
+            await self._run_job(job, run)
+
+    async def _run_job(self, job: str, run: Callable[[], Awaitable]):
+        """Run a job unless another node has run it this interval or is refreshing the same account"""
+        account = job.partition(":")[0]
+        # The claim lasts the shortest jittered interval, so it is free again by this job's next run
+        claim_ttl = self.interval * (1 - self.jitter)
+        async with self.response_cache.lock(f"refresh:{account}") as acquired:
+            if not acquired or not await self.response_cache.claim(f"refresh:{job}", claim_ttl):
+                self._stats["skipped"] += 1
+                return
+            try:
+                await run()
+                self._stats["refreshes"] += 1
+            except LinkedInAPIError as e:
+                self._stats["failures"] += 1
+                logger.warning("Background refresh of %s failed: %s", job, e)
+
+    async def stats(self) -> Dict:
+        """Refresh counters and the persisted schedule"""
+        schedule = await self.io.run(self.storage.get_refresh_schedule)
+        now = time.time()
+        return {
+            **self._stats,
+            "running": self._task is not None and not self._task.done(),
+            "schedule": {job: round(next_run - now, 1) for job, next_run in schedule.items()}
+        }
\ No newline at end of file
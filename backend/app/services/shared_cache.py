@@ -0,0 +1,342 @@
+import asyncio
+import hashlib
+import logging
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Hashable, NamedTuple, Optional, Tuple
+import orjson
+from pydantic import BaseModel
+from app.config import settings
+from app.services.cache_service import AsyncTTLCache
+from app.services.metrics import CACHE_EVENTS
+from app.services.redis_client import RedisClient, RedisError
+
+# Part of every entry key; bump it when the stored layout changes so releases never read each other's entries
+KEY_FORMAT = "v2"
+
+# Deletes a lock only while it still holds our token, so a lock that expired and was taken over is left alone
+RELEASE_LOCK = 'if redis.call("get", KEYS[1]) == ARGV[1] then return redis.call("del", KEYS[1]) else return 0 end'
+
+# Failures of the shared tier; the cache carries on with the in-process tier alone
+L2_ERRORS = (OSError, EOFError, asyncio.TimeoutError, RedisError)
+
+# How often a node waiting on another node's fill looks for the entry
+FILL_POLL = 0.05
+
+logger = logging.getLogger(__name__)
+
+class SharedEntry(NamedTuple):
+    """A value cached in both tiers; the wrapper tells it apart from this node's own sync gates in L1"""
+    value: Any
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    raise TypeError(f"Cannot store {type(value).__name__} in the shared cache")
+
+def _encode(data: Any) -> bytes:
+    """JSON as stored in the shared tier; models are stored as the JSON they are served as"""
+    return orjson.dumps(data, default=_jsonable, option=orjson.OPT_NON_STR_KEYS)
+
+class SharedCache:
+    """The shared L2 tier, kept in a Redis-protocol server.
+
+    Entries live under {prefix}:{KEY_FORMAT}:{account}:{resource}:{generation}:{digest}. Moving an account's
+    resource to a new generation makes all of its entries unreachable at once (they expire on their own), and
+    the new generation is announced on the invalidation channel so every node drops its in-process copies.
+    """
+
+    def __init__(self, client: RedisClient, prefix: str = "linkedin", ttl: Optional[float] = None):
+        self.client = client
+        self.prefix = prefix
+        # Entries expire with the in-process TTL so a cold fill still re-syncs with LinkedIn that often
+        self.ttl = ttl if ttl is not None else settings.LINKEDIN_CACHE_TTL
+        self.channel = f"{prefix}:invalidate"
+
+    def entry_key(self, key: Tuple, generation: int) -> str:
+        digest = hashlib.sha256(repr(key[2:]).encode()).hexdigest()[:24]
+        return f"{self.prefix}:{KEY_FORMAT}:{key[0]}:{key[1]}:{generation}:{digest}"
+
+    async def generation(self, account: str, resource: str) -> int:
+        return int(await self.client.get(f"{self.prefix}:generation:{account}:{resource}") or 0)
+
+    async def bump(self, account: str, resource: str, origin: str) -> int:
+        """Move an account's resource to a new generation and tell every node"""
+        generation = await self.client.incr(f"{self.prefix}:generation:{account}:{resource}")
+        await self.client.publish(self.channel, orjson.dumps(
+            {"account": account, "resource": resource, "generation": generation, "origin": origin}
+        ))
+        return generation
+
+    def invalidations(self) -> AsyncIterator[Tuple[str, bytes]]:
+        return self.client.subscribe(self.channel)
+
+    async def get(self, key: Tuple, generation: int) -> Optional[SharedEntry]:
+        data = await self.client.get(self.entry_key(key, generation))
+        return SharedEntry(*orjson.loads(data)) if data is not None else None
+
+    async def set(self, key: Tuple, generation: int, entry: SharedEntry):
+        await self.client.set(self.entry_key(key, generation), _encode(list(entry)), px=int(self.ttl * 1000))
+
+    async def claim(self, name: str, ttl: float) -> bool:
+        """Take a named claim that nobody else can take until it expires"""
+        return await self.client.set(f"{self.prefix}:claim:{name}", b"1", px=int(ttl * 1000), nx=True)
+
+    async def acquire(self, name: str, ttl: float) -> Optional[str]:
+        """Take a named lock; returns the token needed to release it, or None if another holder has it"""
+        token = uuid.uuid4().hex
+        if await self.client.set(f"{self.prefix}:lock:{name}", token.encode(), px=int(ttl * 1000), nx=True):
+            return token
+        return None
+
+    async def locked(self, name: str) -> bool:
+        return bool(await self.client.execute("EXISTS", f"{self.prefix}:lock:{name}"))
+
+    async def release(self, name: str, token: str):
+        await self.client.eval(RELEASE_LOCK, [f"{self.prefix}:lock:{name}"], [token])
+
+class TieredCache:
+    """In-process L1 (AsyncTTLCache) in front of an optional shared L2 (SharedCache).
+
+    Keys are tuples starting with (account, resource). Lookups with shared=True go L1, then L2, then fetch,
+    and fill both tiers; other lookups, such as the gates that keep this node's SQLite in sync, stay in L1.
+    Without an L2, or while it is unreachable, this behaves like the L1 alone.
+    """
+
+    def __init__(self, l1: AsyncTTLCache, l2: Optional[SharedCache] = None, lock_ttl: Optional[float] = None,
+                 generation_ttl: Optional[float] = None):
+        self.l1 = l1
+        self.l2 = l2
+        self.ttl = l1.ttl
+        # Also the longest a node waits for another node's fill before fetching itself
+        self.lock_ttl = lock_ttl if lock_ttl is not None else settings.CACHE_LOCK_TTL
+        # Generations are re-read this often in case an invalidation message was missed
+        self.generation_ttl = generation_ttl if generation_ttl is not None else settings.CACHE_GENERATION_TTL
+        # Tells this node's own invalidation messages apart from other nodes'
+        self.node_id = uuid.uuid4().hex
+        # (account, resource) -> (generation, monotonic time it was read)
+        self._generations: Dict[Tuple[str, str], Tuple[int, float]] = {}
+        # (account, resource) -> when another node announced a change this node has not caught up with yet
+        self._catching_up: Dict[Tuple[str, str], float] = {}
+        self._listener: Optional[asyncio.Task] = None
+        self._warned_at = float("-inf")
+        self._stats = {
+            "l2_hits": 0,
+            "l2_misses": 0,
+            "l2_errors": 0,
+            "fill_waits": 0,
+            "invalidations_sent": 0,
+            "invalidations_received": 0
+        }
+
+    async def start(self):
+        """Start listening for other nodes' invalidations (called from the app lifespan)"""
+        if self.l2 is not None and (self._listener is None or self._listener.done()):
+            self._listener = asyncio.ensure_future(self._listen())
+
+    async def stop(self):
+        if self._listener is not None:
+            self._listener.cancel()
+            await asyncio.gather(self._listener, return_exceptions=True)
+            self._listener = None
+        if self.l2 is not None:
+            await self.l2.client.close()
+
+    async def _listen(self):
+        delay = 0.5
+        while True:
+            try:
+                async for _, message in self.l2.invalidations():
+                    delay = 0.5
+                    self._apply_invalidation(orjson.loads(message))
+            except L2_ERRORS as e:
+                self._l2_failed(e)
+            # Anything published while disconnected was missed; re-read every generation on its next use
+            self._generations = {
+                scope: (generation, float("-inf")) for scope, (generation, _) in self._generations.items()
+            }
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 30)
+
+    def _apply_invalidation(self, message: Dict):
+        if message["origin"] == self.node_id:
+            return
+        self._record("invalidations_received")
+        scope = (message["account"], message["resource"])
+        known = self._generations.get(scope)
+        if known is None or known[0] < message["generation"]:
+            self._generations[scope] = (message["generation"], time.monotonic())
+        self._catching_up[scope] = time.monotonic()
+        # Sync gates go too: this node's storage has to catch up before it fills entries of the new generation
+        self.l1.invalidate_where(lambda key, value: key[:2] == scope)
+
+    async def _generation(self, scope: Tuple[str, str]) -> int:
+        known = self._generations.get(scope)
+        if known is not None and time.monotonic() - known[1] < self.generation_ttl:
+            return known[0]
+        generation = await self.l2.generation(*scope)
+        if known is not None and generation > known[0]:
+            # An invalidation message never arrived
+            self.l1.invalidate_where(lambda key, value: key[:2] == scope)
+        self._generations[scope] = (generation, time.monotonic())
+        return generation
+
+    def _record(self, event: str):
+        self._stats[event] += 1
+        CACHE_EVENTS.inc(cache="shared", event=event)
+
+    def _l2_failed(self, e: Exception):
+        self._record("l2_errors")
+        # One warning per minute is enough while the shared tier is down
+        if time.monotonic() - self._warned_at > 60:
+            self._warned_at = time.monotonic()
+            logger.warning("Shared cache unavailable, using the in-process cache alone: %r", e)
+
+    async def get_or_fetch(self, key: Tuple, fetch: Callable[[], Awaitable[Any]], shared: bool = False) -> Any:
+        """Return the cached value for key, calling fetch at most once per key at a time on this node
+        (and, for shared keys, usually on only one node)"""
+        if not shared:
+            return await self.l1.get_or_fetch(key, fetch)
+        entry = await self.l1.get_or_fetch(key, lambda: self._fetch_shared(key, fetch))
+        return entry.value
+
+    async def _fetch_shared(self, key: Tuple, fetch: Callable[[], Awaitable[Any]]) -> SharedEntry:
+        if self.l2 is None:
+            return SharedEntry(await fetch())
+        try:
+            generation = await self._generation(key[:2])
+            entry = await self.l2.get(key, generation)
+        except L2_ERRORS as e:
+            self._l2_failed(e)
+            return SharedEntry(await fetch())
+        if entry is not None:
+            self._record("l2_hits")
+            return entry
+        self._record("l2_misses")
+
+        # One node fills a missing entry while the others wait for it, instead of all calling LinkedIn
+        lock = f"fill:{self.l2.entry_key(key, generation)}"
+        async with self.lock(lock) as acquired:
+            if not acquired:
+                entry = await self._wait_for(key, lock)
+                if entry is not None:
+                    self._record("fill_waits")
+                    return entry
+            entry = SharedEntry(await fetch())
+            await self._store(key, entry)
+            return entry
+
+    async def _wait_for(self, key: Tuple, lock: str) -> Optional[SharedEntry]:
+        """Wait for the node holding the fill lock to store the entry; None if it gives up without one"""
+        while True:
+            await asyncio.sleep(FILL_POLL)
+            try:
+                # The filling node may have moved the resource on (a sync that found changes) and filed it there
+                entry = await self.l2.get(key, await self._generation(key[:2]))
+                if entry is not None or not await self.l2.locked(lock):
+                    return entry
+            except L2_ERRORS as e:
+                self._l2_failed(e)
+                return None
+
+    async def _store(self, key: Tuple, entry: SharedEntry):
+        try:
+            # The fetch may itself have moved the resource on; file the entry under the newest generation
+            await self.l2.set(key, await self._generation(key[:2]), entry)
+        except L2_ERRORS as e:
+            self._l2_failed(e)
+        except TypeError:
+            logger.exception("Value for %s cannot be shared", key[:2])
+
+    async def set(self, key: Tuple, value: Any, shared: bool = False):
+        """Store a value fetched outside get_or_fetch (by the background refresher).
+
+        A shared value that differs from the cached one moves its resource to a new generation.
+        """
+        if not shared:
+            self.l1.set(key, value)
+            return
+        previous = self.l1.peek(key)
+        if previous is None and self.l2 is not None:
+            try:
+                previous = await self.l2.get(key, await self._generation(key[:2]))
+            except L2_ERRORS as e:
+                self._l2_failed(e)
+        if previous is not None and _encode(previous.value) != _encode(value):
+            await self.invalidate_resources(key[0], key[1])
+        entry = SharedEntry(value)
+        self.l1.set(key, entry)
+        if self.l2 is not None:
+            await self._store(key, entry)
+
+    async def invalidate_resources(self, account: str, *resources: str):
+        """Drop an account's cached resources here and, through new generations, on every other node.
+
+        A change found while catching up with one another node announced (within a TTL) is taken to be
+        that same change and is not announced again, so nodes do not keep invalidating each other.
+        """
+        for resource in resources:
+            scope = (account, resource)
+            caught_up = time.monotonic() - self._catching_up.pop(scope, float("-inf")) < self.ttl
+            if self.l2 is not None and not caught_up:
+                try:
+                    self._generations[scope] = (await self.l2.bump(account, resource, self.node_id), time.monotonic())
+                    self._record("invalidations_sent")
+                except L2_ERRORS as e:
+                    self._l2_failed(e)
+            # This node's sync gates are current; only the shared entries are out of date
+            self.l1.invalidate_where(lambda key, value: key[:2] == scope and isinstance(value, SharedEntry))
+
+    async def claim(self, name: str, ttl: float) -> bool:
+        """Take a claim across all nodes; always granted without a reachable L2"""
+        if self.l2 is None:
+            return True
+        try:
+            return await self.l2.claim(name, ttl)
+        except L2_ERRORS as e:
+            self._l2_failed(e)
+            return True
+
+    @asynccontextmanager
+    async def lock(self, name: str, ttl: Optional[float] = None) -> AsyncIterator[bool]:
+        """Hold a lock across all nodes; yields False if another node holds it, True otherwise
+        (including when there is no reachable L2, where this node alone decides)"""
+        token, acquired = None, True
+        if self.l2 is not None:
+            try:
+                token = await self.l2.acquire(name, ttl or self.lock_ttl)
+                acquired = token is not None
+            except L2_ERRORS as e:
+                self._l2_failed(e)
+        try:
+            yield acquired
+        finally:
+            if token is not None:
+                try:
+                    await self.l2.release(name, token)
+                except L2_ERRORS as e:
+                    # It expires on its own
+                    self._l2_failed(e)
+
+    def peek(self, key: Hashable) -> Any:
+        """The value this node's L1 holds for key while it is fresh, or None, without a lookup or fetch"""
+        value = self.l1.peek(key, fresh=True)
+        return value.value if isinstance(value, SharedEntry) else value
+
+    def find(self, predicate: Callable[[Hashable], bool]) -> Optional[Hashable]:
+        """A fresh key in this node's L1 that matches"""
+        return self.l1.find(predicate)
+
+    def invalidate(self, key: Optional[Hashable] = None):
+        """Drop one key, or every entry, from this node's L1"""
+        self.l1.invalidate(key)
+
+    def stats(self) -> Dict:
+        """L1 counters and sizing, plus shared-tier counters"""
+        return {
+            **self.l1.stats(),
+            **self._stats,
+            "shared": self.l2 is not None,
+            "listening": self._listener is not None and not self._listener.done()
+        }
\ No newline at end of file
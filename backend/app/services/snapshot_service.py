@@ -0,0 +1,133 @@
+import importlib.util
+import os
+import tempfile
+from datetime import datetime
+from typing import TYPE_CHECKING, List, Optional, Sequence
+
+if TYPE_CHECKING:
+    import pandas as pd
+    import pyarrow as pa
+
+# Columns kept in the snapshot; text and url stay in SQLite
+SNAPSHOT_COLUMNS = ("id", "created_time", "type", "likes_count", "comments_count", "shares_count")
+
+def snapshot_available() -> bool:
+    """pyarrow is optional; without it StorageService keeps no snapshot"""
+    return importlib.util.find_spec("pyarrow") is not None
+
+def month_of(created_time: str) -> str:
+    """Partition key (YYYY-MM) of an ISO-8601 created_time"""
+    return created_time[:7]
+
+def next_month(month: str) -> str:
+    year, month_number = int(month[:4]), int(month[5:7])
+    return f"{year + month_number // 12:04d}-{month_number % 12 + 1:02d}"
+
+class PostSnapshot:
+    """Month-partitioned Arrow IPC copy of the posts table, read through memory maps.
+
+    Each month is one uncompressed Arrow IPC file, so reading a column is a zero-copy view of
+    the mapped file and only the months overlapping a date range are opened at all.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, month: str) -> str:
+        return os.path.join(self.root, f"month={month}.arrow")
+
+    def months(self) -> List[str]:
+        """Months that currently have a partition, oldest first"""
+        return sorted(
+            name[len("month="):-len(".arrow")] for name in os.listdir(self.root)
+            if name.startswith("month=") and name.endswith(".arrow")
+        )
+
+    def _schema(self) -> "pa.Schema":
+        import pyarrow as pa
+        return pa.schema([
+            ("id", pa.string()),
+            ("created_time", pa.timestamp("us")),
+            ("type", pa.string()),
+            ("likes_count", pa.int64()),
+            ("comments_count", pa.int64()),
+            ("shares_count", pa.int64())
+        ])
+
+    def write_month(self, month: str, rows: Sequence[tuple]):
+        """Replace one month's partition with rows in SNAPSHOT_COLUMNS order; no rows removes it"""
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        path = self._path(month)
+        if not rows:
+            if os.path.exists(path):
+                os.unlink(path)
+            return
+        schema = self._schema()
+        ids, created_times, types, likes, comments, shares = zip(*rows)
+        table = pa.Table.from_arrays([
+            pa.array(ids, pa.string()),
+            # created_time is stored as ISO-8601 text in SQLite
+            pc.cast(pa.array(created_times, pa.string()), pa.timestamp("us")),
+            pa.array(types, pa.string()),
+            pa.array(likes, pa.int64()),
+            pa.array(comments, pa.int64()),
+            pa.array(shares, pa.int64())
+        ], schema=schema)
+        # Write beside the target and rename so readers never map a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix=".month.")
+        try:
+            with os.fdopen(fd, "wb") as f, pa.ipc.new_file(f, schema) as writer:
+                writer.write_table(table)
+            os.replace(tmp_path, path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+
+    def read(self, columns: Optional[List[str]] = None, start: Optional[datetime] = None,
+             end: Optional[datetime] = None, post_type: Optional[str] = None) -> "pa.Table":
+        """Memory-map the partitions overlapping [start, end) and return the requested columns"""
+        import pyarrow as pa
+        import pyarrow.compute as pc
+
+        columns = list(columns or SNAPSHOT_COLUMNS)
+        unknown = set(columns) - set(SNAPSHOT_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown snapshot columns: {sorted(unknown)}")
+        first = start.strftime("%Y-%m") if start else None
+        last = end.strftime("%Y-%m") if end else None
+        # Filter columns are read too, then dropped after filtering
+        needed = list(columns)
+        if (start or end) and "created_time" not in needed:
+            needed.append("created_time")
+        if post_type and "type" not in needed:
+            needed.append("type")
+
+        tables = []
+        for month in self.months():
+            if (first and month < first) or (last and month > last):
+                continue
+            reader = pa.ipc.open_file(pa.memory_map(self._path(month)))
+            tables.append(reader.read_all().select(needed))
+        if not tables:
+            return self._schema().empty_table().select(columns)
+
+        table = pa.concat_tables(tables)
+        mask = None
+        for condition in (
+            pc.greater_equal(table["created_time"], pa.scalar(start, pa.timestamp("us"))) if start else None,
+            pc.less(table["created_time"], pa.scalar(end, pa.timestamp("us"))) if end else None,
+            pc.equal(table["type"], post_type) if post_type else None
+        ):
+            if condition is not None:
+                mask = condition if mask is None else pc.and_(mask, condition)
+        if mask is not None:
+            table = table.filter(mask)
+        return table.select(columns)
+
+    def read_frame(self, columns: Optional[List[str]] = None, start: Optional[datetime] = None,
+                   end: Optional[datetime] = None, post_type: Optional[str] = None) -> "pd.DataFrame":
+        """Snapshot columns as a pandas DataFrame"""
+        return self.read(columns, start, end, post_type).to_pandas()
\ No newline at end of file
@@ -1,26 +1,377 @@
+import base64
 import json
+import logging
 import os
-from datetime import datetime
-from typing import List, Dict, Any
+import re
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, AbstractSet, List, Dict, Any, Optional, Tuple
+import orjson
+from app.config import settings
 from app.models.linkedin_data import ProfileData, PostData
+from app.services.engagement_history import decode_samples, encode_samples, thin_samples
+from app.services.metrics import STORAGE_LATENCY, timed
+from app.services.snapshot_service import SNAPSHOT_COLUMNS, PostSnapshot, month_of, next_month, snapshot_available
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS posts (
+    id TEXT PRIMARY KEY,
+    type TEXT NOT NULL,
+    text TEXT NOT NULL,
+    created_time TEXT NOT NULL,
+    likes_count INTEGER,
+    comments_count INTEGER,
+    shares_count INTEGER,
+    url TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_posts_created_time ON posts (created_time);
+CREATE INDEX IF NOT EXISTS idx_posts_type ON posts (type, created_time);
+-- Same expression and order as top_posts, so the top N are read off the index instead of sorting every post
+CREATE INDEX IF NOT EXISTS idx_posts_engagement ON posts (
+    (COALESCE(likes_count, 0) + COALESCE(comments_count, 0) + COALESCE(shares_count, 0)) DESC, created_time DESC
+);
+CREATE TABLE IF NOT EXISTS metadata (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS refresh_schedule (
+    job TEXT PRIMARY KEY,
+    next_run REAL NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5(
+    text,
+    content = 'posts',
+    content_rowid = 'rowid',
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS posts_fts_insert AFTER INSERT ON posts BEGIN
+    INSERT INTO posts_fts (rowid, text) VALUES (new.rowid, new.text);
+END;
+CREATE TRIGGER IF NOT EXISTS posts_fts_delete AFTER DELETE ON posts BEGIN
+    INSERT INTO posts_fts (posts_fts, rowid, text) VALUES ('delete', old.rowid, old.text);
+END;
+CREATE TRIGGER IF NOT EXISTS posts_fts_update AFTER UPDATE OF text ON posts WHEN old.text IS NOT new.text BEGIN
+    INSERT INTO posts_fts (posts_fts, rowid, text) VALUES ('delete', old.rowid, old.text);
+    INSERT INTO posts_fts (rowid, text) VALUES (new.rowid, new.text);
+END;
+CREATE TABLE IF NOT EXISTS snapshot_dirty (
+    month TEXT PRIMARY KEY
+);
+CREATE TABLE IF NOT EXISTS engagement_history (
+    post_id TEXT PRIMARY KEY,
+    samples INTEGER NOT NULL,
+    first_time INTEGER NOT NULL,
+    last_time INTEGER NOT NULL,
+    last_likes INTEGER NOT NULL,
+    last_comments INTEGER NOT NULL,
+    last_shares INTEGER NOT NULL,
+    deltas BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_engagement_last_time ON engagement_history (last_time);
+CREATE TABLE IF NOT EXISTS daily_rollups (
+    day TEXT NOT NULL,
+    type TEXT NOT NULL,
+    posts INTEGER NOT NULL DEFAULT 0,
+    likes INTEGER NOT NULL DEFAULT 0,
+    comments INTEGER NOT NULL DEFAULT 0,
+    shares INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, type)
+);
+"""
+
+ROLLUP_COLUMNS = ("posts", "likes", "comments", "shares")
+
+APPLY_ROLLUP_DELTA = """
+INSERT INTO daily_rollups (day, type, posts, likes, comments, shares)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT(day, type) DO UPDATE SET
+    posts = posts + excluded.posts,
+    likes = likes + excluded.likes,
+    comments = comments + excluded.comments,
+    shares = shares + excluded.shares
+"""
+
+# Rollups recomputed from raw posts; created_time is ISO-8601 so its first 10 characters are the day
+RAW_ROLLUPS = """
+SELECT substr(created_time, 1, 10) AS day, type, COUNT(*) AS posts,
+       SUM(COALESCE(likes_count, 0)) AS likes,
+       SUM(COALESCE(comments_count, 0)) AS comments,
+       SUM(COALESCE(shares_count, 0)) AS shares
+FROM posts
+GROUP BY day, type
+"""
+
+# Append one encoded sample; || yields text, so cast back to keep the bytes a BLOB
+APPEND_ENGAGEMENT = """
+UPDATE engagement_history SET
+    deltas = CAST(deltas || ? AS BLOB),
+    samples = samples + 1,
+    last_time = ?,
+    last_likes = ?,
+    last_comments = ?,
+    last_shares = ?
+WHERE post_id = ?
+"""
+
+POST_COLUMNS = ("id", "type", "text", "created_time", "likes_count", "comments_count", "shares_count", "url")
+
+UPSERT_POST = f"""
+INSERT INTO posts ({", ".join(POST_COLUMNS)})
+VALUES ({", ".join("?" for _ in POST_COLUMNS)})
+ON CONFLICT(id) DO UPDATE SET
+    type = excluded.type,
+    text = excluded.text,
+    created_time = excluded.created_time,
+    likes_count = excluded.likes_count,
+    comments_count = excluded.comments_count,
+    shares_count = excluded.shares_count,
+    url = excluded.url
+"""
+
+def normalize_timestamp(value: Any) -> str:
+    """The ISO-8601 form every stored created_time uses: a "T" separator and naive local time.
+
+    Ranges, keyset cursors, rollups and the snapshot all compare created_time as text, so legacy
+    values written with str() ("2024-03-01 10:00:00") or with a UTC offset must not be kept as-is.
+    """
+    return local_datetime(value).isoformat()
+
+def local_datetime(value: Any) -> datetime:
+    """Parse a timestamp and convert it to naive local time, the zone stored created_times are in"""
+    if not isinstance(value, datetime):
+        value = datetime.fromisoformat(str(value))
+    if value.tzinfo is not None:
+        # Same convention as datetime.fromtimestamp() for posts fetched from LinkedIn
+        value = value.astimezone().replace(tzinfo=None)
+    return value
 
 class StorageService:
-    def __init__(self):
-        self.data_dir = "data"
+    def __init__(self, data_dir: str = "data"):
+        self.data_dir = data_dir
+        self.db_file = os.path.join(self.data_dir, "linkedin.db")
+        # Legacy JSON files, only read once to migrate them into the database
         self.profile_file = os.path.join(self.data_dir, "profile.json")
         self.posts_file = os.path.join(self.data_dir, "posts.json")
         self.articles_file = os.path.join(self.data_dir, "articles.json")
+        self._local = threading.local()
+        # Every thread's connection, so close() can release them all; reopened after a close
+        self._connections: List[sqlite3.Connection] = []
+        self._connections_lock = threading.Lock()
+        self._generation = 0
+        # Columnar copy of the posts table, kept only when enabled and pyarrow is installed; written by a
+        # thread of its own so saves never wait on it
+        self.snapshot: Optional[PostSnapshot] = None
+        self._snapshot_lock = threading.Lock()
+        self._snapshot_queue_lock = threading.Lock()
+        self._snapshot_pool: Optional[ThreadPoolExecutor] = None
+        self._snapshot_queued = False
         self._ensure_data_directory()
+        self._init_schema()
+        self._migrate_json_files()
+        self._normalize_timestamps()
+        self._ensure_rollups()
+        self._ensure_search_index()
+        if settings.SNAPSHOT_ENABLED and snapshot_available():
+            self.snapshot = PostSnapshot(os.path.join(self.data_dir, "snapshot"))
+            self._ensure_snapshot()
 
     def _ensure_data_directory(self):
         """Create data directory if it doesn't exist"""
         if not os.path.exists(self.data_dir):
             os.makedirs(self.data_dir)
 
-    def _save_to_json(self, data: Any, file_path: str):
-        """Save data to JSON file"""
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, default=str)
+    def _connect(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it in WAL mode on first use"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.generation != self._generation:
+            # Only ever used by this thread; check_same_thread=False lets close() run elsewhere
+            conn = sqlite3.connect(self.db_file, timeout=30, isolation_level=None, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA busy_timeout=30000")
+            with self._connections_lock:
+                self._connections.append(conn)
+                self._local.conn, self._local.generation = conn, self._generation
+        return conn
+
+    def close(self):
+        """Close every thread's connection; only call once no other thread is using this storage"""
+        # Let a queued snapshot flush finish with its connection first
+        pool, self._snapshot_pool = self._snapshot_pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
+        with self._connections_lock:
+            connections, self._connections = self._connections, []
+            self._generation += 1
+        for conn in connections:
+            conn.close()
+
+    def _init_schema(self):
+        """Create tables and indexes if they don't exist"""
+        self._connect().executescript(SCHEMA)
+
+    def _migrate_json_files(self):
+        """Import the legacy posts/articles/profile JSON files on first start"""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if self._get_meta("json_migrated", conn) is None:
+                for file_path, key in ((self.posts_file, "posts"), (self.articles_file, "articles")):
+                    data = self._load_from_json(file_path)
+                    if not data:
+                        continue
+                    default_type = "post" if key == "posts" else "article"
+                    conn.executemany(UPSERT_POST, [
+                        self._row_from_dict(item, default_type) for item in data.get(key, [])
+                    ])
+                    if data.get("last_updated"):
+                        self._set_meta(f"last_updated:{key}", data["last_updated"], conn)
+                profile = self._load_from_json(self.profile_file)
+                if profile:
+                    self._set_meta("profile", orjson.dumps(profile, default=str).decode(), conn)
+                    if profile.get("last_updated"):
+                        self._set_meta("last_updated:profile", profile["last_updated"], conn)
+                self._set_meta("json_migrated", datetime.now().isoformat(), conn)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _normalize_timestamps(self):
+        """Rewrite created_time values migrated verbatim from legacy JSON, once per database"""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if self._get_meta("timestamps_normalized", conn) is None:
+                # Anything but YYYY-MM-DDTHH:MM:SS[.ffffff]
+                rows = conn.execute(
+                    "SELECT id, created_time FROM posts WHERE created_time NOT GLOB "
+                    "'[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]T[0-9][0-9]:[0-9][0-9]:[0-9][0-9]' "
+                    "AND created_time NOT GLOB "
+                    "'[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]T[0-9][0-9]:[0-9][0-9]:[0-9][0-9].[0-9][0-9][0-9][0-9][0-9][0-9]'"
+                ).fetchall()
+                fixed, months = [], set()
+                for post_id, created_time in rows:
+                    try:
+                        normalized = normalize_timestamp(created_time)
+                    except ValueError:
+                        continue
+                    fixed.append((normalized, post_id))
+                    months |= {month_of(created_time), month_of(normalized)}
+                conn.executemany("UPDATE posts SET created_time = ? WHERE id = ?", fixed)
+                if fixed:
+                    # Days and months may have moved; rebuild what is derived from them
+                    self._rebuild_rollups(conn)
+                    self._bump_data_version(conn)
+                    conn.executemany("INSERT OR IGNORE INTO snapshot_dirty (month) VALUES (?)",
+                                     [(month,) for month in months])
+                self._set_meta("timestamps_normalized", datetime.now().isoformat(), conn)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _ensure_rollups(self):
+        """Build the rollup tables once for databases created before they existed"""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if self._get_meta("rollups_built", conn) is None:
+                self._rebuild_rollups(conn)
+                self._set_meta("rollups_built", datetime.now().isoformat(), conn)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _ensure_search_index(self):
+        """Index posts stored before the full-text index existed; triggers keep it current afterwards"""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if self._get_meta("search_index_built", conn) is None:
+                conn.execute("INSERT INTO posts_fts (posts_fts) VALUES ('rebuild')")
+                self._set_meta("search_index_built", datetime.now().isoformat(), conn)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _ensure_snapshot(self):
+        """Write every month once for a new snapshot, then catch up on months changed since"""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if self._get_meta("snapshot_built", conn) is None:
+                conn.execute(
+                    "INSERT OR IGNORE INTO snapshot_dirty (month) "
+                    "SELECT DISTINCT substr(created_time, 1, 7) FROM posts"
+                )
+                self._set_meta("snapshot_built", datetime.now().isoformat(), conn)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        self._schedule_snapshot_flush()
+
+    def _schedule_snapshot_flush(self):
+        """Flush dirty months on the snapshot thread; saves made while a flush is queued share it"""
+        with self._snapshot_queue_lock:
+            if self._snapshot_queued:
+                return
+            self._snapshot_queued = True
+            if self._snapshot_pool is None:
+                self._snapshot_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="snapshot")
+            self._snapshot_pool.submit(self._background_flush)
+
+    def _background_flush(self):
+        with self._snapshot_queue_lock:
+            # Saves from here on mark months this flush may not see, so they queue the next one
+            self._snapshot_queued = False
+        try:
+            self._flush_snapshot()
+        except Exception:
+            logger.exception("Snapshot flush failed; dirty months are kept for the next one")
+
+    @timed(STORAGE_LATENCY)
+    def flush_snapshot(self):
+        """Bring the snapshot up to date with every save made so far, in the calling thread"""
+        if self.snapshot is None:
+            raise RuntimeError("The columnar snapshot is disabled or requires pyarrow")
+        self._flush_snapshot()
+
+    def _flush_snapshot(self):
+        """Rewrite the snapshot partition of every month marked dirty by an upsert.
+
+        The snapshot is only a faster copy of the posts table, so a month that cannot be written is
+        logged and left marked for the next flush rather than failing anything else.
+        """
+        conn = self._connect()
+        with self._snapshot_lock:
+            for (month,) in conn.execute("SELECT month FROM snapshot_dirty").fetchall():
+                # Clear the mark before reading, so a concurrent upsert re-marks the month
+                conn.execute("DELETE FROM snapshot_dirty WHERE month = ?", (month,))
+                try:
+                    rows = conn.execute(
+                        f"SELECT {', '.join(SNAPSHOT_COLUMNS)} FROM posts "
+                        "WHERE created_time >= ? AND created_time < ? ORDER BY created_time, id",
+                        (month, next_month(month))
+                    ).fetchall()
+                    # The Arrow cast only takes naive ISO-8601; anything stored before normalization is converted
+                    self.snapshot.write_month(month, [(row[0], normalize_timestamp(row[1]), *row[2:]) for row in rows])
+                except Exception:
+                    conn.execute("INSERT OR IGNORE INTO snapshot_dirty (month) VALUES (?)", (month,))
+                    logger.exception("Could not write the %s snapshot partition; retrying on the next flush", month)
 
     def _load_from_json(self, file_path: str) -> Any:
         """Load data from JSON file"""
@@ -29,46 +380,587 @@ class StorageService:
         with open(file_path, 'r', encoding='utf-8') as f:
             return json.load(f)
 
+    def _row_from_dict(self, item: Dict, default_type: str) -> tuple:
+        """Convert a stored post dict into an upsert row"""
+        return (
+            str(item["id"]),
+            item.get("type") or default_type,
+            item.get("text", ""),
+            normalize_timestamp(item["created_time"]),
+            item.get("likes_count"),
+            item.get("comments_count"),
+            item.get("shares_count"),
+            item.get("url")
+        )
+
+    def _row_from_post(self, post: PostData) -> tuple:
+        """Convert a PostData into an upsert row"""
+        return (
+            post.id,
+            post.type,
+            post.text,
+            normalize_timestamp(post.created_time),
+            post.likes_count,
+            post.comments_count,
+            post.shares_count,
+            post.url
+        )
+
+    def _get_meta(self, key: str, conn: Optional[sqlite3.Connection] = None) -> Optional[str]:
+        """Read a metadata value"""
+        conn = conn or self._connect()
+        row = conn.execute("SELECT value FROM metadata WHERE key = ?", (key,)).fetchone()
+        return row["value"] if row else None
+
+    def _set_meta(self, key: str, value: str, conn: Optional[sqlite3.Connection] = None):
+        """Write a metadata value"""
+        conn = conn or self._connect()
+        conn.execute(
+            "INSERT INTO metadata (key, value) VALUES (?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+            (key, value)
+        )
+
+    def _bump_data_version(self, conn: sqlite3.Connection):
+        """Increment the post data version so derived results (analytics, HTTP validators) can be invalidated"""
+        conn.execute(
+            "INSERT INTO metadata (key, value) VALUES ('data_version', '1') "
+            "ON CONFLICT(key) DO UPDATE SET value = CAST(value AS INTEGER) + 1"
+        )
+        self._set_meta("data_modified", datetime.now().isoformat(), conn)
+
+    @timed(STORAGE_LATENCY)
+    def get_data_version(self) -> int:
+        """Get the post data version, incremented on every write that changes posts"""
+        return int(self._get_meta("data_version") or 0)
+
+    @timed(STORAGE_LATENCY)
+    def get_data_state(self) -> Tuple[int, Optional[datetime]]:
+        """Get the post data version and when it last changed, for HTTP validators"""
+        conn = self._connect()
+        rows = dict(conn.execute(
+            "SELECT key, value FROM metadata WHERE key IN ('data_version', 'data_modified')"
+        ).fetchall())
+        modified = rows.get("data_modified")
+        return int(rows.get("data_version") or 0), datetime.fromisoformat(modified) if modified else None
+
+    @timed(STORAGE_LATENCY)
+    def query_posts(self, columns: List[str], start: Optional[datetime] = None, end: Optional[datetime] = None,
+                    post_type: Optional[str] = None) -> "sqlite3.Cursor":
+        """Select the given post columns filtered by created_time range and type"""
+        unknown = set(columns) - set(POST_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown post columns: {sorted(unknown)}")
+        where, params = self._post_filters(start, end, post_type)
+        # Plain tuples are much cheaper than sqlite3.Row for bulk reads
+        cursor = self._connect().cursor()
+        cursor.row_factory = None
+        return cursor.execute(f"SELECT {', '.join(columns)} FROM posts WHERE {where}", params)
+
+    @timed(STORAGE_LATENCY)
+    def read_snapshot(self, columns: Optional[List[str]] = None, start: Optional[datetime] = None,
+                      end: Optional[datetime] = None, post_type: Optional[str] = None) -> "pd.DataFrame":
+        """Load snapshot columns for a date range and type, mapping only the month partitions needed.
+
+        Flushed in the background, so it can trail the latest saves; call flush_snapshot first to catch up.
+        """
+        if self.snapshot is None:
+            raise RuntimeError("The columnar snapshot is disabled or requires pyarrow")
+        return self.snapshot.read_frame(columns, start, end, post_type)
+
+    @timed(STORAGE_LATENCY)
+    def export_posts(self, after: Optional[tuple] = None, limit: int = 1000, start: Optional[datetime] = None,
+                     end: Optional[datetime] = None, post_type: Optional[str] = None) -> List[tuple]:
+        """One chunk of full post rows in (created_time, id) order, resuming after an earlier row's key.
+
+        Each chunk is a separate keyset query, so an export never holds a cursor (or its rows) between
+        chunks and any I/O thread can serve the next one.
+        """
+        where, params = self._post_filters(start, end, post_type)
+        if after:
+            where += " AND (created_time, id) > (?, ?)"
+            params.extend(after)
+        cursor = self._connect().cursor()
+        cursor.row_factory = None
+        return cursor.execute(
+            f"SELECT {', '.join(POST_COLUMNS)} FROM posts WHERE {where} ORDER BY created_time, id LIMIT ?",
+            params + [limit]
+        ).fetchall()
+
+    def _post_filters(self, start: Optional[datetime], end: Optional[datetime],
+                      post_type: Optional[str]) -> tuple:
+        """WHERE clause and parameters for the created_time range and type filters"""
+        where = "1 = 1"
+        params: List[Any] = []
+        if post_type:
+            where += " AND type = ?"
+            params.append(post_type)
+        if start:
+            where += " AND created_time >= ?"
+            params.append(normalize_timestamp(start))
+        if end:
+            where += " AND created_time < ?"
+            params.append(normalize_timestamp(end))
+        return where, params
+
+    @timed(STORAGE_LATENCY)
+    def query_rollups(self, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                      post_type: Optional[str] = None) -> "sqlite3.Cursor":
+        """Select one row per day (day, posts, articles, likes, comments, shares) of posts created in [start, end).
+
+        Whole days are read from the rollups. Where the range starts or ends mid-day, the part of that
+        day inside the range is summed from its posts, filtered to the exact timestamp as top_posts is.
+        """
+        rollups = f"SELECT day, type, {', '.join(ROLLUP_COLUMNS)} FROM daily_rollups WHERE posts > 0"
+        params: List[Any] = []
+        if post_type:
+            rollups += " AND type = ?"
+            params.append(post_type)
+        # Day boundaries are local days, like the stored created_times; aware bounds are converted first
+        start = local_datetime(start) if start else None
+        end = local_datetime(end) if end else None
+        # Rollups cover the whole days [first_day, last_day); edges are the partial days around them
+        edges = []
+        if start:
+            first_day = start.replace(hour=0, minute=0, second=0, microsecond=0)
+            if first_day != start:
+                first_day += timedelta(days=1)
+                edges.append((start, min(first_day, end) if end else first_day))
+            rollups += " AND day >= ?"
+            params.append(first_day.date().isoformat())
+        if end:
+            last_day = end.replace(hour=0, minute=0, second=0, microsecond=0)
+            # A range within a single day is already covered by its first edge
+            if last_day != end and not (start and start > last_day):
+                edges.append((last_day, end))
+            rollups += " AND day < ?"
+            params.append(last_day.date().isoformat())
+        for edge_start, edge_end in edges:
+            where, edge_params = self._post_filters(edge_start, edge_end, post_type)
+            rollups += (" UNION ALL SELECT substr(created_time, 1, 10), type, 1, COALESCE(likes_count, 0), "
+                        f"COALESCE(comments_count, 0), COALESCE(shares_count, 0) FROM posts WHERE {where}")
+            params += edge_params
+        # Summed across types here, so only one row per day crosses into Python
+        query = ("SELECT day, SUM(CASE WHEN type = 'post' THEN posts ELSE 0 END), "
+                 "SUM(CASE WHEN type = 'article' THEN posts ELSE 0 END), SUM(likes), SUM(comments), SUM(shares) "
+                 f"FROM ({rollups})")
+        cursor = self._connect().cursor()
+        cursor.row_factory = None
+        return cursor.execute(query + " GROUP BY day ORDER BY day", params)
+
+    @timed(STORAGE_LATENCY)
+    def top_posts(self, limit: int, start: Optional[datetime] = None, end: Optional[datetime] = None,
+                  post_type: Optional[str] = None) -> List[Dict]:
+        """Get the posts with the highest total engagement"""
+        query = f"SELECT {', '.join(POST_COLUMNS)} FROM posts WHERE 1 = 1"
+        params: List[Any] = []
+        if post_type:
+            # Unary + keeps SQLite off idx_posts_type, which would sort every post of the type; walking
+            # idx_posts_engagement stops after the first `limit` matches
+            query += " AND +type = ?"
+            params.append(post_type)
+        if start:
+            query += " AND created_time >= ?"
+            params.append(normalize_timestamp(start))
+        if end:
+            query += " AND created_time < ?"
+            params.append(normalize_timestamp(end))
+        query += (" ORDER BY COALESCE(likes_count, 0) + COALESCE(comments_count, 0) + COALESCE(shares_count, 0) DESC,"
+                  " created_time DESC LIMIT ?")
+        params.append(limit)
+        return [dict(row) for row in self._connect().execute(query, params).fetchall()]
+
+    @timed(STORAGE_LATENCY)
+    def check_rollups(self, repair: bool = False) -> Dict:
+        """Diff the rollup tables against a rebuild from raw posts, optionally repairing them"""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE" if repair else "BEGIN")
+        try:
+            stored = {
+                (row[0], row[1]): tuple(row[2:])
+                for row in conn.execute(f"SELECT day, type, {', '.join(ROLLUP_COLUMNS)} FROM daily_rollups WHERE posts != 0 "
+                                        "OR likes != 0 OR comments != 0 OR shares != 0")
+            }
+            expected = {
+                (row[0], row[1]): tuple(row[2:])
+                for row in conn.execute(f"SELECT day, type, {', '.join(ROLLUP_COLUMNS)} FROM ({RAW_ROLLUPS})")
+            }
+            mismatches = [
+                {
+                    "day": day,
+                    "type": post_type,
+                    "stored": dict(zip(ROLLUP_COLUMNS, stored.get((day, post_type), (0, 0, 0, 0)))),
+                    "expected": dict(zip(ROLLUP_COLUMNS, expected.get((day, post_type), (0, 0, 0, 0))))
+                }
+                for day, post_type in sorted(set(stored) | set(expected))
+                if stored.get((day, post_type)) != expected.get((day, post_type))
+            ]
+            if repair and mismatches:
+                self._rebuild_rollups(conn)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return {
+            "consistent": not mismatches,
+            "buckets": len(expected),
+            "mismatches": mismatches,
+            "repaired": bool(repair and mismatches)
+        }
+
+    def _rollup_deltas(self, posts: List[PostData], conn: sqlite3.Connection) -> Dict[tuple, List[int]]:
+        """Per (day, type) changes caused by upserting posts, relative to what is stored now"""
+        previous: Dict[str, tuple] = {}
+        ids = [post.id for post in posts]
+        # Stay below SQLite's bound-parameter limit
+        for offset in range(0, len(ids), 500):
+            chunk = ids[offset:offset + 500]
+            rows = conn.execute(
+                "SELECT id, substr(created_time, 1, 10), type, COALESCE(likes_count, 0), "
+                "COALESCE(comments_count, 0), COALESCE(shares_count, 0) "
+                f"FROM posts WHERE id IN ({', '.join('?' for _ in chunk)})",
+                chunk
+            ).fetchall()
+            for row in rows:
+                previous[row[0]] = ((row[1], row[2]), (1, row[3], row[4], row[5]))
+
+        deltas: Dict[tuple, List[int]] = defaultdict(lambda: [0, 0, 0, 0])
+        for post in posts:
+            old = previous.get(post.id)
+            if old:
+                bucket = deltas[old[0]]
+                for i, value in enumerate(old[1]):
+                    bucket[i] -= value
+            key = (normalize_timestamp(post.created_time)[:10], post.type)
+            values = (1, post.likes_count or 0, post.comments_count or 0, post.shares_count or 0)
+            bucket = deltas[key]
+            for i, value in enumerate(values):
+                bucket[i] += value
+            # A post repeated within one batch replaces its own earlier version
+            previous[post.id] = (key, values)
+        return {key: delta for key, delta in deltas.items() if any(delta)}
+
+    def _rebuild_rollups(self, conn: sqlite3.Connection):
+        """Recompute every rollup bucket from raw posts"""
+        conn.execute("DELETE FROM daily_rollups")
+        conn.execute(
+            f"INSERT INTO daily_rollups (day, type, {', '.join(ROLLUP_COLUMNS)}) "
+            f"SELECT day, type, {', '.join(ROLLUP_COLUMNS)} FROM ({RAW_ROLLUPS})"
+        )
+
+    def _upsert_posts(self, posts: List[PostData], data_type: str):
+        """Upsert posts by id, apply rollup deltas, record engagement and stamp last_updated in one transaction"""
+        now = int(time.time())
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            deltas = self._rollup_deltas(posts, conn)
+            conn.executemany(UPSERT_POST, [self._row_from_post(post) for post in posts])
+            conn.executemany(APPLY_ROLLUP_DELTA, [(day, post_type, *delta) for (day, post_type), delta in deltas.items()])
+            # Months whose snapshot partition is now out of date, including any a post moved out of
+            months = {month_of(day) for day, _ in deltas} | {month_of(normalize_timestamp(post.created_time)) for post in posts}
+            conn.executemany("INSERT OR IGNORE INTO snapshot_dirty (month) VALUES (?)", [(month,) for month in months])
+            self._set_meta(f"last_updated:{data_type}", datetime.now().isoformat(), conn)
+            self._record_engagement([
+                (post.id, now, post.likes_count or 0, post.comments_count or 0, post.shares_count or 0)
+                for post in posts
+            ], conn)
+            if posts:
+                self._bump_data_version(conn)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        if self.snapshot:
+            self._schedule_snapshot_flush()
+
+    def _record_engagement(self, observations: List[Tuple[str, int, int, int, int]], conn: sqlite3.Connection):
+        """Append (post_id, time, likes, comments, shares) samples to each post's history.
+
+        A sample is only added when a count changed, since histories are read as step functions.
+        """
+        previous: Dict[str, tuple] = {}
+        ids = list(dict.fromkeys(observation[0] for observation in observations))
+        for offset in range(0, len(ids), 500):
+            chunk = ids[offset:offset + 500]
+            rows = conn.execute(
+                "SELECT post_id, samples, last_time, last_likes, last_comments, last_shares "
+                f"FROM engagement_history WHERE post_id IN ({', '.join('?' for _ in chunk)})",
+                chunk
+            ).fetchall()
+            for row in rows:
+                previous[row[0]] = (row[1], tuple(row[2:]))
+
+        inserts, appends, full = [], [], []
+        for post_id, timestamp, *counts in observations:
+            state = previous.get(post_id)
+            sample = (timestamp, *counts)
+            if state is None:
+                inserts.append((post_id, 1, timestamp, timestamp, *counts,
+                                encode_samples([sample], (timestamp, 0, 0, 0))))
+                previous[post_id] = (1, sample)
+                continue
+            samples, last = state
+            if tuple(counts) == last[1:]:
+                continue
+            # Never step back in time, so the history stays sorted
+            sample = (max(timestamp, last[0]), *counts)
+            if samples >= settings.ENGAGEMENT_HISTORY_MAX_SAMPLES:
+                full.append((post_id, sample))
+            else:
+                appends.append((encode_samples([sample], last), *sample, post_id))
+            previous[post_id] = (samples + 1, sample)
+
+        conn.executemany(
+            "INSERT INTO engagement_history (post_id, samples, first_time, last_time, last_likes, last_comments, "
+            "last_shares, deltas) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            inserts
+        )
+        conn.executemany(APPEND_ENGAGEMENT, appends)
+        for post_id, sample in full:
+            self._thin_engagement(post_id, sample, conn)
+
+    def _thin_engagement(self, post_id: str, sample: tuple, conn: sqlite3.Connection):
+        """Add a sample to a full history after halving its resolution, so each post's history stays bounded"""
+        import numpy as np
+
+        first_time, deltas = conn.execute(
+            "SELECT first_time, deltas FROM engagement_history WHERE post_id = ?", (post_id,)
+        ).fetchone()
+        samples = np.concatenate((thin_samples(decode_samples(deltas, first_time)), [sample]))
+        conn.execute(
+            "UPDATE engagement_history SET deltas = ?, samples = ?, last_time = ?, last_likes = ?, "
+            "last_comments = ?, last_shares = ? WHERE post_id = ?",
+            (encode_samples(samples.tolist(), (first_time, 0, 0, 0)), len(samples), *sample, post_id)
+        )
+
+    @timed(STORAGE_LATENCY)
+    def record_engagement(self, observations: List[Tuple[str, int, int, int, int]]):
+        """Record (post_id, epoch seconds, likes, comments, shares) observations without upserting posts"""
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._record_engagement(observations, conn)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    @timed(STORAGE_LATENCY)
+    def get_engagement_history(self, post_id: str) -> Optional[Tuple[str, int, bytes]]:
+        """Get a post's created_time, first sample time and encoded engagement history"""
+        row = self._connect().execute(
+            "SELECT posts.created_time, first_time, deltas FROM engagement_history "
+            "JOIN posts ON posts.id = engagement_history.post_id WHERE post_id = ?",
+            (post_id,)
+        ).fetchone()
+        return tuple(row) if row else None
+
+    @timed(STORAGE_LATENCY)
+    def engagement_changed_since(self, since: int, post_type: Optional[str] = None) -> "sqlite3.Cursor":
+        """Select (post_id, created_time, first_time, samples, deltas) of every post whose counts changed since an epoch time"""
+        query = (
+            "SELECT post_id, posts.created_time, first_time, samples, deltas FROM engagement_history "
+            "JOIN posts ON posts.id = engagement_history.post_id WHERE last_time >= ?"
+        )
+        params: List[Any] = [since]
+        if post_type:
+            query += " AND posts.type = ?"
+            params.append(post_type)
+        cursor = self._connect().cursor()
+        cursor.row_factory = None
+        return cursor.execute(query, params)
+
+    def _select_posts(self, post_type: str) -> List[Dict]:
+        """Load all stored items of one type, newest first"""
+        rows = self._connect().execute(
+            f"SELECT {', '.join(POST_COLUMNS)} FROM posts WHERE type = ? ORDER BY created_time DESC",
+            (post_type,)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    @timed(STORAGE_LATENCY)
+    def mark_updated(self, data_type: str):
+        """Stamp last_updated for a data type without writing any rows"""
+        self._set_meta(f"last_updated:{data_type}", datetime.now().isoformat())
+
+    @timed(STORAGE_LATENCY)
     def save_profile(self, profile: ProfileData):
-        """Save profile data to JSON"""
+        """Save profile data"""
         profile_dict = profile.dict()
         profile_dict['last_updated'] = datetime.now().isoformat()
-        self._save_to_json(profile_dict, self.profile_file)
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            self._set_meta("profile", orjson.dumps(profile_dict, default=str).decode(), conn)
+            self._set_meta("last_updated:profile", profile_dict['last_updated'], conn)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
 
+    @timed(STORAGE_LATENCY)
     def save_posts(self, posts: List[PostData]):
-        """Save posts data to JSON"""
-        posts_dict = {
-            'posts': [post.dict() for post in posts],
-            'last_updated': datetime.now().isoformat()
-        }
-        self._save_to_json(posts_dict, self.posts_file)
+        """Upsert posts by id"""
+        self._upsert_posts(posts, "posts")
 
+    @timed(STORAGE_LATENCY)
     def save_articles(self, articles: List[PostData]):
-        """Save articles data to JSON"""
-        articles_dict = {
-            'articles': [article.dict() for article in articles],
-            'last_updated': datetime.now().isoformat()
-        }
-        self._save_to_json(articles_dict, self.articles_file)
+        """Upsert articles by id"""
+        self._upsert_posts(articles, "articles")
 
+    @timed(STORAGE_LATENCY)
     def get_profile(self) -> Dict:
-        """Get profile data from JSON"""
-        return self._load_from_json(self.profile_file)
+        """Get stored profile data"""
+        data = self._get_meta("profile")
+        return json.loads(data) if data else None
 
+    @timed(STORAGE_LATENCY)
     def get_posts(self) -> List[Dict]:
-        """Get posts data from JSON"""
-        data = self._load_from_json(self.posts_file)
-        return data.get('posts', []) if data else []
+        """Get stored posts, newest first"""
+        return self._select_posts("post")
 
+    @timed(STORAGE_LATENCY)
     def get_articles(self) -> List[Dict]:
-        """Get articles data from JSON"""
-        data = self._load_from_json(self.articles_file)
-        return data.get('articles', []) if data else []
+        """Get stored articles, newest first"""
+        return self._select_posts("article")
+
+    @timed(STORAGE_LATENCY)
+    def get_recent_posts(self, post_type: str, since: datetime, limit: int) -> List[Dict]:
+        """Get up to limit stored items of one type created at or after since, newest first"""
+        rows = self._connect().execute(
+            f"SELECT {', '.join(POST_COLUMNS)} FROM posts WHERE type = ? AND created_time >= ? "
+            "ORDER BY created_time DESC, id DESC LIMIT ?",
+            (post_type, normalize_timestamp(since), limit)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    @timed(STORAGE_LATENCY)
+    def get_posts_page(self, post_type: str, cursor: Optional[str] = None, limit: int = 50,
+                       fields: Optional[AbstractSet[str]] = None) -> Dict:
+        """Get one keyset-paginated page of stored items, newest first, with only the given columns"""
+        if fields is not None and not fields <= set(POST_COLUMNS):
+            raise ValueError(f"Unknown post columns: {sorted(set(fields) - set(POST_COLUMNS))}")
+        # The cursor is built from the last row's created_time and id, so those are always read
+        columns = [column for column in POST_COLUMNS
+                   if fields is None or column in fields or column in ("id", "created_time")]
+        query = f"SELECT {', '.join(columns)} FROM posts WHERE type = ?"
+        params: List[Any] = [post_type]
+        if cursor:
+            created_time, post_id = self._decode_cursor(cursor)
+            query += " AND (created_time < ? OR (created_time = ? AND id < ?))"
+            params += [created_time, created_time, post_id]
+        query += " ORDER BY created_time DESC, id DESC LIMIT ?"
+        # Fetch one extra row to know whether another page exists
+        params.append(limit + 1)
+        rows = [dict(row) for row in self._connect().execute(query, params).fetchall()]
+        items = rows[:limit]
+        next_cursor = None
+        if len(rows) > limit:
+            next_cursor = self._encode_cursor(items[-1]["created_time"], items[-1]["id"])
+        if fields is not None and len(columns) > len(fields):
+            items = [{column: item[column] for column in columns if column in fields} for item in items]
+        return {"items": items, "next_cursor": next_cursor}
+
+    @timed(STORAGE_LATENCY)
+    def search_posts(self, query: str, post_type: Optional[str] = None, start: Optional[datetime] = None,
+                     end: Optional[datetime] = None, cursor: Optional[str] = None, limit: int = 50) -> Dict:
+        """Get one page of stored items matching a full-text query, best BM25 match first"""
+        where, params = self._post_filters(start, end, post_type)
+        params.insert(0, self._match_expression(query))
+        page = ""
+        if cursor:
+            score, post_id = self._decode_cursor(cursor)
+            page = "WHERE (score, id) > (?, ?)"
+            params += [float(score), post_id]
+        # bm25() is lower for better matches, so ascending order puts the best first
+        sql = (
+            f"SELECT * FROM (SELECT {', '.join('posts.' + column for column in POST_COLUMNS)}, bm25(posts_fts) AS score "
+            f"FROM posts_fts JOIN posts ON posts.rowid = posts_fts.rowid "
+            f"WHERE posts_fts MATCH ? AND {where}) {page} ORDER BY score, id LIMIT ?"
+        )
+        params.append(limit + 1)
+        try:
+            rows = [dict(row) for row in self._connect().execute(sql, params).fetchall()]
+        except sqlite3.OperationalError as e:
+            if "fts5" not in str(e):
+                raise
+            raise ValueError(f"Invalid search query: {query}") from e
+        items = rows[:limit]
+        next_cursor = None
+        if len(rows) > limit:
+            next_cursor = self._encode_cursor(items[-1]["score"], items[-1]["id"])
+        return {"items": items, "next_cursor": next_cursor}
+
+    def _match_expression(self, query: str) -> str:
+        """Turn a search box query into an FTS5 expression.
+
+        Quoted text is a phrase, a trailing * makes a prefix search and OR/NOT are kept as
+        operators; every other term is quoted so punctuation can't break the FTS5 syntax.
+        """
+        terms = []
+        for phrase, word in re.findall(r'"([^"]*)"|(\S+)', query):
+            if phrase.strip():
+                terms.append('"' + phrase.strip() + '"')
+            elif word in ("OR", "NOT"):
+                terms.append(word)
+            elif word:
+                prefix = word.endswith("*")
+                word = word.rstrip("*").replace('"', "")
+                if word:
+                    terms.append('"' + word + '"' + ("*" if prefix else ""))
+        if not terms:
+            raise ValueError("Empty search query")
+        return " ".join(terms)
+
+    def _encode_cursor(self, created_time: str, post_id: str) -> str:
+        """Encode a keyset position as an opaque cursor"""
+        return base64.urlsafe_b64encode(json.dumps([created_time, post_id]).encode()).decode()
+
+    def _decode_cursor(self, cursor: str) -> tuple:
+        """Decode an opaque cursor, raising ValueError when it is malformed"""
+        try:
+            created_time, post_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            return str(created_time), str(post_id)
+        except Exception as e:
+            raise ValueError(f"Invalid cursor: {cursor}") from e
+
+    @timed(STORAGE_LATENCY)
+    def get_sync_state(self, account: str, data_type: str) -> Dict:
+        """Get the incremental sync state (high-water mark, author URN) for an account"""
+        value = self._get_meta(f"sync:{account}:{data_type}")
+        return json.loads(value) if value else {}
+
+    @timed(STORAGE_LATENCY)
+    def set_sync_state(self, account: str, data_type: str, state: Dict):
+        """Persist the incremental sync state for an account"""
+        self._set_meta(f"sync:{account}:{data_type}", orjson.dumps(state).decode())
+
+    @timed(STORAGE_LATENCY)
+    def get_refresh_schedule(self) -> Dict[str, float]:
+        """Get the persisted next-run time (epoch seconds) of every background refresh job"""
+        rows = self._connect().execute("SELECT job, next_run FROM refresh_schedule").fetchall()
+        return {row["job"]: row["next_run"] for row in rows}
+
+    @timed(STORAGE_LATENCY)
+    def schedule_refresh(self, job: str, next_run: float):
+        """Add a refresh job if it is not scheduled yet"""
+        self._connect().execute(
+            "INSERT INTO refresh_schedule (job, next_run) VALUES (?, ?) ON CONFLICT(job) DO NOTHING",
+            (job, next_run)
+        )
+
+    @timed(STORAGE_LATENCY)
+    def claim_refresh(self, job: str, now: float, next_run: float) -> bool:
+        """Atomically move a due job to its next run; only one worker/process wins the claim"""
+        cursor = self._connect().execute(
+            "UPDATE refresh_schedule SET next_run = ? WHERE job = ? AND next_run <= ?",
+            (next_run, job, now)
+        )
+        return cursor.rowcount == 1
 
+    @timed(STORAGE_LATENCY)
     def get_last_updated(self, data_type: str) -> datetime:
         """Get last update timestamp for specific data type"""
-        file_path = getattr(self, f"{data_type}_file")
-        data = self._load_from_json(file_path)
-        if data and 'last_updated' in data:
-            return datetime.fromisoformat(data['last_updated'])
-        return None 
\ No newline at end of file
+        value = self._get_meta(f"last_updated:{data_type}")
+        return datetime.fromisoformat(value) if value else None
\ No newline at end of file
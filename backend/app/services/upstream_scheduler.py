@@ -0,0 +1,273 @@
+import asyncio
+import contextvars
+import heapq
+import itertools
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import aiohttp
+from app.config import settings
+
+# Lower value wins; request handlers run as INTERACTIVE, refresh jobs as BACKGROUND
+INTERACTIVE = 0
+BACKGROUND = 1
+
+upstream_priority: contextvars.ContextVar = contextvars.ContextVar("upstream_priority", default=INTERACTIVE)
+
+class LinkedInAPIError(Exception):
+    """Non-success response from LinkedIn"""
+
+    def __init__(self, status: int, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+    @property
+    def retryable(self) -> bool:
+        return self.status == 429 or self.status >= 500
+
+    @property
+    def app_throttled(self) -> bool:
+        """A 429 for the application's quota, which every token shares, rather than one member's"""
+        return self.status == 429 and "APPLICATION" in str(self)
+
+class UpstreamUnavailable(LinkedInAPIError):
+    """LinkedIn is considered unhealthy and calls are being short-circuited"""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(503, message, retry_after)
+
+class TokenBucket:
+    """Token bucket refilled continuously at `rate` tokens per second up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now: float) -> float:
+        """Seconds until one token is available"""
+        self._refill(now)
+        pause = max(0.0, self.paused_until - now)
+        if self.tokens >= 1:
+            return pause
+        return max(pause, (1 - self.tokens) / self.rate)
+
+    def consume(self, now: float):
+        self._refill(now)
+        self.tokens -= 1
+
+    def pause(self, seconds: float):
+        """Stop handing out tokens for a while, e.g. after a Retry-After"""
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+class CircuitBreaker:
+    """Opens after consecutive upstream failures and lets one probe through after a cooldown"""
+
+    def __init__(self, threshold: int, cooldown: float):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.probing = False
+        # Set when the in-flight probe ends, so calls arriving meanwhile wait for its outcome
+        self._probe_done: Optional[asyncio.Event] = None
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            return "half_open"
+        return "open"
+
+    def allow(self) -> bool:
+        state = self.state
+        if state == "closed":
+            return True
+        if state == "half_open" and not self.probing:
+            self.probing = True
+            return True
+        return False
+
+    def retry_after(self) -> float:
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.cooldown - (time.monotonic() - self.opened_at))
+
+    async def wait_for_probe(self):
+        """Wait until the in-flight half-open probe succeeds, fails or is released"""
+        if self._probe_done is None:
+            self._probe_done = asyncio.Event()
+        await self._probe_done.wait()
+
+    def _end_probe(self):
+        self.probing = False
+        if self._probe_done is not None:
+            self._probe_done.set()
+            self._probe_done = None
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._end_probe()
+
+    def release_probe(self):
+        """Give back the half-open probe slot without an outcome (the probe was cancelled or never reached LinkedIn)"""
+        self._end_probe()
+
+    def record_failure(self):
+        self.failures += 1
+        if self.probing or self.failures >= self.threshold:
+            self.opened_at = time.monotonic()
+        self._end_probe()
+
+class UpstreamScheduler:
+    """Single gate for every LinkedIn call: rate limits, priorities, retries and circuit breaking"""
+
+    def __init__(self, app_rate: Optional[float] = None, app_burst: Optional[float] = None,
+                 token_rate: Optional[float] = None, token_burst: Optional[float] = None,
+                 max_retries: Optional[int] = None, backoff_base: Optional[float] = None,
+                 backoff_max: Optional[float] = None, breaker_threshold: Optional[int] = None,
+                 breaker_cooldown: Optional[float] = None):
+        self.app_bucket = TokenBucket(app_rate or settings.LINKEDIN_APP_RATE, app_burst or settings.LINKEDIN_APP_BURST)
+        self.token_rate = token_rate or settings.LINKEDIN_TOKEN_RATE
+        self.token_burst = token_burst or settings.LINKEDIN_TOKEN_BURST
+        self.max_retries = max_retries if max_retries is not None else settings.LINKEDIN_MAX_RETRIES
+        self.backoff_base = backoff_base or settings.LINKEDIN_BACKOFF_BASE
+        self.backoff_max = backoff_max or settings.LINKEDIN_BACKOFF_MAX
+        self.breaker = CircuitBreaker(
+            breaker_threshold or settings.LINKEDIN_BREAKER_THRESHOLD,
+            breaker_cooldown or settings.LINKEDIN_BREAKER_COOLDOWN
+        )
+        self._token_buckets: Dict[str, TokenBucket] = {}
+        self._waiters: List[tuple] = []
+        self._sequence = itertools.count()
+        self._dispatcher: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stats = {"requests": 0, "retries": 0, "throttled": 0, "failures": 0, "short_circuited": 0}
+
+    def _bucket_for(self, token_key: str) -> TokenBucket:
+        bucket = self._token_buckets.get(token_key)
+        if bucket is None:
+            bucket = self._token_buckets[token_key] = TokenBucket(self.token_rate, self.token_burst)
+        return bucket
+
+    async def _acquire(self, token_key: str, priority: int):
+        """Wait for a permit from both the app bucket and the token's bucket, in priority order"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), token_key, future))
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        self._wakeup.set()
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.ensure_future(self._dispatch())
+        await future
+
+    async def _dispatch(self):
+        while self._waiters:
+            self._wakeup.clear()
+            now = time.monotonic()
+            self._waiters = [entry for entry in self._waiters if not entry[3].done()]
+            heapq.heapify(self._waiters)
+            if not self._waiters:
+                break
+
+            wait = self.app_bucket.wait_time(now)
+            chosen = None
+            if wait <= 0:
+                # Highest priority waiter whose own token bucket has capacity; a throttled token
+                # must not hold up other accounts
+                wait = float("inf")
+                for entry in sorted(self._waiters):
+                    token_wait = self._bucket_for(entry[2]).wait_time(now)
+                    if token_wait <= 0:
+                        chosen = entry
+                        break
+                    wait = min(wait, token_wait)
+
+            if chosen is None:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            self._waiters.remove(chosen)
+            heapq.heapify(self._waiters)
+            self.app_bucket.consume(now)
+            self._bucket_for(chosen[2]).consume(now)
+            chosen[3].set_result(None)
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        """Full-jitter exponential backoff, never shorter than the server's Retry-After"""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        retry_after = getattr(error, "retry_after", None)
+        if retry_after:
+            delay = max(delay, retry_after)
+        return delay
+
+    async def run(self, token_key: str, call: Callable[[], Awaitable[Any]], priority: Optional[int] = None) -> Any:
+        """Run an upstream call through rate limiting, retries and the circuit breaker"""
+        priority = upstream_priority.get() if priority is None else priority
+        attempt = 0
+        while True:
+            probe = self.breaker.state == "half_open"
+            if not self.breaker.allow():
+                if probe:
+                    # Another call is probing; its outcome decides whether this one goes ahead
+                    await self.breaker.wait_for_probe()
+                    continue
+                self._stats["short_circuited"] += 1
+                raise UpstreamUnavailable("LinkedIn API is unavailable, try again later", self.breaker.retry_after())
+
+            try:
+                await self._acquire(token_key, priority)
+                self._stats["requests"] += 1
+                result = await call()
+            except (LinkedInAPIError, aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if isinstance(e, LinkedInAPIError) and not e.retryable:
+                    # The upstream answered; a 4xx other than 429 says nothing about its health
+                    self.breaker.record_success()
+                    raise
+                if isinstance(e, LinkedInAPIError) and e.status == 429:
+                    # Throttling is LinkedIn enforcing a quota, not failing; it must not open the breaker
+                    self.breaker.record_success()
+                    self._stats["throttled"] += 1
+                    if e.retry_after:
+                        bucket = self.app_bucket if e.app_throttled else self._bucket_for(token_key)
+                        bucket.pause(e.retry_after)
+                else:
+                    self._stats["failures"] += 1
+                    self.breaker.record_failure()
+                if attempt >= self.max_retries:
+                    if isinstance(e, LinkedInAPIError):
+                        raise
+                    raise LinkedInAPIError(502, f"LinkedIn request failed: {e!r}") from e
+                self._stats["retries"] += 1
+                await asyncio.sleep(self._backoff(attempt, e))
+                attempt += 1
+                continue
+            except BaseException:
+                # Cancelled (e.g. a sibling sub-request failed) or failed outside the upstream call: the probe
+                # says nothing about LinkedIn's health, so free the slot for the next call instead of holding it
+                if probe:
+                    self.breaker.release_probe()
+                raise
+            self.breaker.record_success()
+            return result
+
+    def stats(self) -> Dict:
+        """Request, retry and breaker counters"""
+        return {
+            **self._stats,
+            "queued": sum(1 for entry in self._waiters if not entry[3].done()),
+            "circuit": self.breaker.state
+        }
\ No newline at end of file
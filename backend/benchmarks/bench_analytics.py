@@ -0,0 +1,85 @@
+"""Check that analytics stay within their latency budget as post history grows.
+
+Run from the backend directory (uses a throwaway data directory):
+
+    python -m benchmarks.bench_analytics --posts 100000 --max-ms 50
+
+Times an uncached compute for every granularity over the whole history, the last year
+and ranges starting and ending mid-day, plus a cached lookup, and checks the totals
+against a scan of the raw posts in the same range.
+Exits non-zero if any uncached compute takes longer than --max-ms.
+"""
+import argparse
+import asyncio
+import sys
+import tempfile
+import time
+from datetime import timedelta
+
+from benchmarks.datasets import START, fill_storage
+
+def measure(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def scan_totals(storage, start=None, end=None) -> dict:
+    """Totals straight from the posts table, for checking the rollup-backed result"""
+    totals = {"totalPosts": 0, "totalArticles": 0, "totalLikes": 0, "totalComments": 0, "totalShares": 0}
+    for post_type, likes, comments, shares in storage.query_posts(
+            ["type", "likes_count", "comments_count", "shares_count"], start, end):
+        totals["totalPosts" if post_type == "post" else "totalArticles"] += 1
+        totals["totalLikes"] += likes or 0
+        totals["totalComments"] += comments or 0
+        totals["totalShares"] += shares or 0
+    return totals
+
+def main(posts: int, max_ms: float) -> int:
+    from app.services.analytics_service import GRANULARITIES, AnalyticsService
+    from app.services.executor import BlockingExecutor
+
+    storage = fill_storage(tempfile.mkdtemp(prefix="bench_analytics_"), posts)
+    io = BlockingExecutor(1, "io")
+    analytics = AnalyticsService(storage, io_executor=io)
+    # Posts are an hour apart from START, a midnight; ranges end on the last whole day
+    last = START + timedelta(days=posts // 24)
+    ranges = {
+        "all": (None, None),
+        "last year": (last - timedelta(days=365), last),
+        # Starts and ends mid-day: the edge days must only count posts inside the range
+        "mid-day": (last - timedelta(days=200, hours=-7, minutes=-30), last - timedelta(days=3, hours=11)),
+        "within a day": (last - timedelta(hours=17), last - timedelta(hours=5))
+    }
+
+    print(f"posts: {posts}, budget: {max_ms:.0f}ms")
+    slowest = 0.0
+    for label, (start, end) in ranges.items():
+        result = analytics.compute(start, end)
+        expected = scan_totals(storage, start, end)
+        assert {key: result[key] for key in expected} == expected, (label, expected)
+        assert sum(bucket["likes"] for bucket in result["engagementOverTime"]) == expected["totalLikes"], label
+        for granularity in GRANULARITIES:
+            elapsed = measure(lambda: analytics.compute(start, end, granularity))
+            slowest = max(slowest, elapsed)
+            print(f"{label:12s} {granularity:6s} compute {elapsed * 1e3:6.2f}ms")
+
+    async def cached() -> float:
+        await analytics.get_analytics("bench")
+        started = time.perf_counter()
+        await analytics.get_analytics("bench")
+        return time.perf_counter() - started
+
+    print(f"cached lookup {asyncio.run(cached()) * 1e3:6.2f}ms")
+    io.shutdown()
+    print(f"slowest uncached compute: {slowest * 1e3:.2f}ms (limit {max_ms:.0f}ms)")
+    return 0 if slowest * 1e3 <= max_ms else 1
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--posts", type=int, default=100000)
+    parser.add_argument("--max-ms", type=float, default=50)
+    args = parser.parse_args()
+    sys.exit(main(args.posts, args.max_ms))
\ No newline at end of file
@@ -0,0 +1,51 @@
+"""Measure the per-request cost of reading credentials with and without the ConfigService cache.
+
+Run from the backend directory (uses a throwaway config directory):
+
+    python -m benchmarks.bench_config --iterations 5000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+def measure(fn, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations
+
+def main(iterations: int):
+    workdir = tempfile.mkdtemp(prefix="bench_config_")
+    os.chdir(workdir)
+
+    from app.services.config_service import ConfigService
+
+    service = ConfigService()
+    service.save_credentials({
+        "client_id": "client",
+        "client_secret": "secret",
+        "access_token": "token" * 40
+    })
+
+    def uncached_status():
+        # What /api/config/status cost before: two full read + decrypt + parse passes
+        service._read_config()
+        service._read_config()
+
+    def cached_status():
+        service.get_credentials()
+        service.get_last_updated()
+
+    before = measure(uncached_status, iterations)
+    after = measure(cached_status, iterations)
+    print(f"iterations: {iterations}")
+    print(f"uncached /status: {before * 1e6:8.1f}us per request")
+    print(f"cached /status:   {after * 1e6:8.1f}us per request")
+    print(f"removed overhead: {(before - after) * 1e6:8.1f}us per request ({before / after:.1f}x)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=5000)
+    args = parser.parse_args()
+    main(args.iterations)
\ No newline at end of file
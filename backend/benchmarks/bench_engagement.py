@@ -0,0 +1,94 @@
+"""Measure the size and query cost of the delta-encoded engagement histories.
+
+Run from the backend directory (uses a throwaway data directory):
+
+    python -m benchmarks.bench_engagement --posts 10000 --refreshes 96
+
+Simulates a refresh every 15 minutes for a day for posts of various ages, records every
+changed count, then reports the stored bytes per sample against a dict per sample
+and a plain int64 array, and times velocity, time-to-N-likes and trending queries. The
+trending result is checked against a brute-force answer from the simulated counts.
+"""
+import argparse
+import random
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+INTERVAL = 15 * 60
+
+def main(posts: int, refreshes: int):
+    import numpy as np
+    from app.models.linkedin_data import PostData
+    from app.services.engagement_history import decode_samples
+    from app.services.engagement_service import EngagementService
+    from app.services.storage_service import StorageService
+
+    rng = random.Random(0)
+    storage = StorageService(tempfile.mkdtemp(prefix="bench_engagement_"))
+    # Saving the posts records their first (zero) sample; the simulated refreshes follow it
+    storage.save_posts([
+        PostData(id=f"urn:li:share:{i}", text=f"Post {i}", created_time=datetime.now() - timedelta(hours=i % 72),
+                 likes_count=0, comments_count=0, shares_count=0, url=None, type="post")
+        for i in range(posts)
+    ])
+    first = int(time.time()) + INTERVAL
+    now = first + (refreshes - 1) * INTERVAL
+
+    # A few posts take off; most gain slowly or not at all
+    rates = [rng.choice((0, 0, 0.2, 0.5, 1, 2)) * (20 if rng.random() < 0.01 else 1) for _ in range(posts)]
+    counts = np.zeros((posts, 3), dtype=np.int64)
+    truth = np.zeros((refreshes, posts), dtype=np.int64)
+    write_time = 0.0
+    for refresh in range(refreshes):
+        timestamp = first + refresh * INTERVAL
+        for i, rate in enumerate(rates):
+            if rate:
+                counts[i, 0] += np.random.poisson(rate)
+                counts[i, 1] += np.random.poisson(rate / 10)
+        truth[refresh] = counts[:, 0]
+        started = time.perf_counter()
+        storage.record_engagement([(f"urn:li:share:{i}", timestamp, *counts[i].tolist()) for i in range(posts)])
+        write_time += time.perf_counter() - started
+
+    conn = storage._connect()
+    samples, stored = conn.execute("SELECT SUM(samples), SUM(length(deltas)) FROM engagement_history").fetchone()
+    print(f"{posts} posts, {refreshes} refreshes: {samples} samples recorded "
+          f"({write_time / (posts * refreshes) * 1e6:.1f}us per observation)")
+
+    # What the busiest post's history would cost as a dict per sample
+    post_id = f"urn:li:share:{int(np.argmax(counts[:, 0]))}"
+    row = storage.get_engagement_history(post_id)
+    decoded = decode_samples(row[2], row[1])
+    tracemalloc.start()
+    as_dicts = [{"time": int(t), "likes": int(l), "comments": int(c), "shares": int(s)} for t, l, c, s in decoded]
+    dict_bytes = tracemalloc.get_traced_memory()[0] / max(len(as_dicts), 1)
+    tracemalloc.stop()
+    print(f"bytes per sample: delta-encoded {stored / samples:5.1f} (largest history {len(row[2])}B for "
+          f"{len(decoded)} samples), int64 array {decoded.itemsize * 4:5.1f}, dict per sample {dict_bytes:5.0f}")
+
+    service = EngagementService(storage)
+    for label, query in (
+        ("velocity (1 post)", lambda: service.compute_velocity(post_id, 6, now)),
+        ("time to 100 likes", lambda: service.compute_time_to_likes(post_id, 100)),
+        ("trending top 10 / 6h", lambda: service.compute_trending(6, 10, "likes", None, now)),
+        ("trending top 10 / 24h", lambda: service.compute_trending(24, 10, "likes", None, now)),
+    ):
+        started = time.perf_counter()
+        result = query()
+        if label == "trending top 10 / 6h":
+            trending = result
+        print(f"{label:22s} {(time.perf_counter() - started) * 1e3:8.2f}ms")
+
+    # Brute force over the simulated counts: gain since the refresh at the start of the 6h window
+    expected = sorted((truth[-1] - truth[refreshes - 1 - 6 * 3600 // INTERVAL]).tolist(), reverse=True)[:10]
+    assert [item["gained"] for item in trending] == expected, (trending, expected)
+    print("trending matches brute force")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--posts", type=int, default=10000)
+    parser.add_argument("--refreshes", type=int, default=96)
+    args = parser.parse_args()
+    main(args.posts, args.refreshes)
\ No newline at end of file
@@ -0,0 +1,95 @@
+"""Show that a slow legacy LinkedIn call no longer stalls unrelated requests.
+
+Run from the backend directory (uses a throwaway data directory):
+
+    python -m benchmarks.bench_event_loop --upstream-delay 1.0 --probes 40
+
+A fake python-linkedin-v2 application sleeps in get_profile() while /api/config/status
+is polled on the same event loop. "inline" runs blocking work directly on the loop
+(the old behaviour); "pooled" uses the app's dedicated thread pools.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from datetime import timedelta
+
+class SlowApplication:
+    """Stand-in for linkedin.LinkedInApplication with a slow, blocking get_profile()"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    def get_profile(self):
+        time.sleep(self.delay)
+        return {"id": "bench", "firstName": "Bench", "lastName": "User"}
+
+class InlineExecutor:
+    """Runs blocking work directly on the event loop, as the services did before"""
+
+    async def run(self, fn, *args, **kwargs):
+        return fn(*args, **kwargs)
+
+    def shutdown(self):
+        pass
+
+async def probe(client, count: int, interval: float) -> list:
+    latencies = []
+    for _ in range(count):
+        start = time.perf_counter()
+        response = await client.get("/api/config/status")
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(interval)
+    return latencies
+
+async def run_mode(mode: str, delay: float, slow_calls: int, probes: int) -> list:
+    import httpx
+    from main import app
+
+    async with app.router.lifespan_context(app):
+        container = app.state.container
+        if mode == "inline":
+            container.__dict__["io_executor"] = InlineExecutor()
+            container.__dict__["legacy_executor"] = InlineExecutor()
+        service = container.linkedin_service
+        service.__dict__["application"] = SlowApplication(delay)
+        service.cache_duration = timedelta(0)  # every call goes upstream
+
+        async def slow():
+            for _ in range(slow_calls):
+                await service.get_profile_data()
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            await probe(client, 3, 0)  # warm up
+            interval = delay * slow_calls / probes
+            slow_task = asyncio.ensure_future(slow())
+            latencies = await probe(client, probes, interval)
+            await slow_task
+    return latencies
+
+def report(mode: str, latencies: list):
+    ordered = sorted(latencies)
+    p95 = ordered[int(len(ordered) * 0.95) - 1]
+    print(f"{mode:7s} p50 {statistics.median(ordered) * 1e3:8.1f}ms  "
+          f"p95 {p95 * 1e3:8.1f}ms  max {ordered[-1] * 1e3:8.1f}ms")
+
+def main(delay: float, slow_calls: int, probes: int):
+    os.chdir(tempfile.mkdtemp(prefix="bench_event_loop_"))
+    os.environ["LINKEDIN_REFRESH_ENABLED"] = "false"
+    os.environ.setdefault("LINKEDIN_ACCESS_TOKEN", "benchmark-token")
+
+    print(f"slow legacy get_profile(): {delay:.2f}s x {slow_calls}, {probes} /api/config/status probes")
+    for mode in ("inline", "pooled"):
+        report(mode, asyncio.run(run_mode(mode, delay, slow_calls, probes)))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--upstream-delay", type=float, default=0.5)
+    parser.add_argument("--slow-calls", type=int, default=3)
+    parser.add_argument("--probes", type=int, default=30)
+    args = parser.parse_args()
+    main(args.upstream_delay, args.slow_calls, args.probes)
\ No newline at end of file
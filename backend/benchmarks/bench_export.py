@@ -0,0 +1,94 @@
+"""Check that streaming exports run in flat memory as post history grows.
+
+Run from the backend directory (uses throwaway data directories):
+
+    python -m benchmarks.bench_export --sizes 1000,10000,100000,1000000 --max-growth-mb 16
+
+Each dataset is written in one subprocess and exported in a fresh one, so the
+reported peak RSS covers only the export. Exits non-zero if the peak grows by more
+than --max-growth-mb between the smallest and largest dataset.
+"""
+import argparse
+import asyncio
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+def peak_rss_mb() -> float:
+    # ru_maxrss is reported in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def fill(data_dir: str, size: int):
+    from app.services.storage_service import POST_COLUMNS, StorageService
+
+    storage = StorageService(data_dir)
+    conn = storage._connect()
+    start = datetime(2015, 1, 1)
+    insert = f"INSERT INTO posts ({', '.join(POST_COLUMNS)}) VALUES ({', '.join('?' for _ in POST_COLUMNS)})"
+    for offset in range(0, size, 10000):
+        rows = [
+            (f"urn:li:share:{i}", "post" if i % 5 else "article", f"Post number {i} " * 8,
+             (start + timedelta(minutes=i)).isoformat(), i % 300, i % 40, i % 12, f"https://www.linkedin.com/feed/{i}")
+            for i in range(offset, min(offset + 10000, size))
+        ]
+        conn.execute("BEGIN")
+        conn.executemany(insert, rows)
+        conn.execute("COMMIT")
+
+async def export(data_dir: str) -> dict:
+    from app.services.executor import BlockingExecutor
+    from app.services.export_service import ExportService
+    from app.services.storage_service import StorageService
+
+    exporter = ExportService(StorageService(data_dir), BlockingExecutor(1, "io"))
+    baseline = peak_rss_mb()
+    result = {}
+    for fmt, compress in (("ndjson", False), ("csv", False), ("ndjson", True)):
+        started = time.perf_counter()
+        first_byte, size = None, 0
+        async for chunk in exporter.stream(fmt, compress=compress):
+            first_byte = first_byte or time.perf_counter() - started
+            size += len(chunk)
+        label = fmt + (".gz" if compress else "")
+        result[label] = {"seconds": time.perf_counter() - started, "ttfb": first_byte, "bytes": size}
+    result["baseline_mb"] = baseline
+    result["peak_mb"] = peak_rss_mb()
+    return result
+
+def run(*args) -> str:
+    return subprocess.run([sys.executable, "-m", "benchmarks.bench_export", *args],
+                          check=True, capture_output=True, text=True).stdout
+
+def main(sizes: list, max_growth_mb: float) -> int:
+    results = {}
+    for size in sizes:
+        data_dir = tempfile.mkdtemp(prefix="bench_export_")
+        run("--fill", data_dir, "--size", str(size))
+        results[size] = json.loads(run("--export", data_dir))
+        stats = results[size]
+        print(f"{size:>9} rows: peak {stats['peak_mb']:7.1f}MB (export +{stats['peak_mb'] - stats['baseline_mb']:5.1f}MB)  "
+              + "  ".join(f"{label} {stats[label]['seconds']:6.2f}s ttfb {stats[label]['ttfb'] * 1e3:5.1f}ms"
+                          for label in ("ndjson", "csv", "ndjson.gz")))
+
+    growth = results[sizes[-1]]["peak_mb"] - results[sizes[0]]["peak_mb"]
+    print(f"peak RSS growth {sizes[0]} -> {sizes[-1]} rows: {growth:.1f}MB (limit {max_growth_mb:.1f}MB)")
+    return 0 if growth <= max_growth_mb else 1
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1000,10000,100000,1000000")
+    parser.add_argument("--max-growth-mb", type=float, default=16)
+    parser.add_argument("--fill", help=argparse.SUPPRESS)
+    parser.add_argument("--size", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--export", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.fill:
+        fill(args.fill, args.size)
+    elif args.export:
+        print(json.dumps(asyncio.run(export(args.export))))
+    else:
+        sys.exit(main([int(size) for size in args.sizes.split(",")], args.max_growth_mb))
\ No newline at end of file
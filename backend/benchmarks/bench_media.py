@@ -0,0 +1,84 @@
+"""Measure the profile picture proxy against linking LinkedIn's full-size image.
+
+Run from the backend directory (uses a throwaway cache directory):
+
+    python -m benchmarks.bench_media --concurrency 50 --iterations 200
+
+Compares the bytes a dashboard view downloads for the picture, checks that a cold width
+requested concurrently is downloaded and resized once, times warm lookups, and checks that
+the cache stays within its byte budget and is picked up again by a new instance.
+Resized widths need Pillow; without it every width is the original image.
+"""
+import argparse
+import asyncio
+import statistics
+import tempfile
+import time
+
+from benchmarks.fake_linkedin import FakeLinkedIn
+
+async def main(concurrency: int, iterations: int):
+    fake = FakeLinkedIn(latency=0.02)
+    base_url = await fake.start()
+
+    from app.config import settings
+    from app.services.executor import BlockingExecutor
+    from app.services.http_client import LinkedInHttpClient
+    from app.services.media_cache import MediaCache, thumbnails_available
+
+    root = tempfile.mkdtemp(prefix="bench_media_")
+    client = LinkedInHttpClient()
+    io, media = BlockingExecutor(settings.IO_THREADS, "io"), BlockingExecutor(settings.MEDIA_THREADS, "media")
+
+    def make_cache(max_bytes: int) -> MediaCache:
+        return MediaCache(root, client, io, media, max_bytes, settings.MEDIA_MAX_SOURCE_BYTES)
+
+    try:
+        source = base_url.removesuffix("/v2") + "/media/800.png"
+        width = settings.PROFILE_PICTURE_WIDTH
+        cache = make_cache(settings.MEDIA_CACHE_MAX_BYTES)
+
+        digest, ext = await cache.register(source)
+        results = await asyncio.gather(*[cache.open(digest, ext, width) for _ in range(concurrency)])
+        original = len(await client.get_bytes(source, "media", settings.MEDIA_MAX_SOURCE_BYTES))
+        thumbnail = results[0][1].st_size
+        stats = cache.stats()
+        assert stats["downloads"] == 1 and stats["resized"] == (1 if thumbnails_available() else 0), stats
+        print(f"thumbnails: {'Pillow' if thumbnails_available() else 'unavailable, serving originals'}")
+        print(f"cold w={width} x{concurrency} concurrent: {stats['downloads']} download, {stats['resized']} resize")
+        print(f"picture bytes per dashboard view: {original} linked from LinkedIn, {thumbnail} through the proxy "
+              f"(w={width}), 0 on repeat views (immutable)")
+
+        samples = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            await cache.open(digest, ext, width)
+            samples.append(time.perf_counter() - started)
+        print(f"warm lookup: p50={statistics.median(samples) * 1e6:.0f}us")
+
+        # A budget below the full set of widths: least recently used files are evicted
+        budget = original + thumbnail * 2
+        small = make_cache(budget)
+        for requested in [None] + settings.MEDIA_WIDTHS:
+            await small.open(digest, ext, requested)
+        stats = small.stats()
+        assert stats["bytes"] <= budget or stats["files"] == 1, stats
+        print(f"budget {budget} bytes after every width: {stats['files']} files, {stats['bytes']} bytes, "
+              f"{stats['evictions']} evicted")
+
+        reopened = make_cache(budget)
+        await reopened.open(digest, ext, settings.MEDIA_WIDTHS[-1])
+        assert reopened.stats()["hits"] == 1 and reopened.stats()["downloads"] == 0, reopened.stats()
+        print(f"new instance on the same directory: {reopened.stats()['files']} files found, served without a download")
+    finally:
+        await client.close()
+        io.shutdown()
+        media.shutdown()
+        await fake.stop()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.concurrency, args.iterations))
\ No newline at end of file
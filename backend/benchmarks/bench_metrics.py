@@ -0,0 +1,73 @@
+"""Measure the per-request and per-call overhead of the metrics instrumentation.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_metrics --requests 5000
+"""
+import argparse
+import asyncio
+import time
+
+def measure(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+async def request_loop(app, requests: int) -> float:
+    """Seconds per request for a trivial route served through app"""
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        pass
+
+    scope = {"type": "http", "method": "GET", "path": "/ping", "raw_path": b"/ping", "query_string": b"",
+             "headers": [], "root_path": "", "scheme": "http", "server": ("bench", 80), "http_version": "1.1"}
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(requests):
+            await app(dict(scope), receive, send)
+        best = min(best, (time.perf_counter() - start) / requests)
+    return best
+
+def main(requests: int, calls: int):
+    from fastapi import FastAPI
+    from app.middleware import MetricsMiddleware
+    from app.services.metrics import STORAGE_LATENCY, timed
+
+    def build(instrumented: bool) -> FastAPI:
+        app = FastAPI()
+
+        @app.get("/ping")
+        def ping():
+            return {"ok": True}
+
+        if instrumented:
+            app.add_middleware(MetricsMiddleware)
+        return app
+
+    bare = asyncio.run(request_loop(build(False), requests))
+    instrumented = asyncio.run(request_loop(build(True), requests))
+    print(f"request  bare {bare * 1e6:7.1f}us  with middleware {instrumented * 1e6:7.1f}us  "
+          f"(+{(instrumented - bare) * 1e6:.1f}us)")
+
+    def noop():
+        pass
+
+    timed_noop = timed(STORAGE_LATENCY)(noop)
+    plain = measure(lambda: [noop() for _ in range(calls)]) / calls
+    wrapped = measure(lambda: [timed_noop() for _ in range(calls)]) / calls
+    print(f"call     bare {plain * 1e9:7.0f}ns  with timer      {wrapped * 1e9:7.0f}ns  "
+          f"(+{(wrapped - plain) * 1e9:.0f}ns)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--calls", type=int, default=200000)
+    args = parser.parse_args()
+    main(args.requests, args.calls)
\ No newline at end of file
@@ -0,0 +1,96 @@
+"""Compare serial, per-request-session profile fetching with the pooled concurrent path.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_profile --latency 0.05 --iterations 50 --fields firstName,lastName,headline
+
+The pooled path is measured for the full profile and for a fields= projection, with the
+upstream requests each one makes.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+import aiohttp
+
+from benchmarks.fake_linkedin import FakeLinkedIn
+
+async def serial_get_profile(base_url: str, credentials: dict) -> dict:
+    """The pre-pooling implementation: new session, four sequential round trips"""
+    headers = {
+        "Authorization": f"Bearer {credentials['access_token']}",
+        "X-Restli-Protocol-Version": "2.0.0"
+    }
+    urls = [
+        f"{base_url}/me",
+        f"{base_url}/emailAddress?q=members&projection=(elements*(handle~))",
+        f"{base_url}/me?projection=(profilePicture(displayImage~:playableStreams))",
+        f"{base_url}/me?projection=(id,localizedFirstName,localizedLastName,headline,location,industry,summary,positions,educations,skills,websites)"
+    ]
+    results = []
+    async with aiohttp.ClientSession() as session:
+        for url in urls:
+            async with session.get(url, headers=headers) as response:
+                results.append(await response.json())
+    return results[0]
+
+def summarize(name: str, samples: list):
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"{name:<10} p50={statistics.median(samples) * 1000:7.1f}ms "
+          f"p95={p95 * 1000:7.1f}ms mean={statistics.mean(samples) * 1000:7.1f}ms")
+
+async def main(latency: float, iterations: int, fields: frozenset):
+    fake = FakeLinkedIn(latency=latency)
+    base_url = await fake.start()
+    os.environ["LINKEDIN_API_BASE_URL"] = base_url
+    os.environ.setdefault("LINKEDIN_ACCESS_TOKEN", "benchmark-token")
+
+    from app.services.http_client import LinkedInHttpClient
+    from app.services.linkedin_service import LinkedInService
+    from app.services.upstream_scheduler import UpstreamScheduler
+
+    credentials = {"access_token": "benchmark-token"}
+    # Rate limits high enough not to interfere: this measures pooling and concurrency only
+    unthrottled = UpstreamScheduler(app_rate=1e6, app_burst=1e6, token_rate=1e6, token_burst=1e6)
+    client = LinkedInHttpClient(scheduler=unthrottled)
+    service = LinkedInService(http=client)
+    service.base_url = base_url
+
+    try:
+        before = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            await serial_get_profile(base_url, credentials)
+            before.append(time.perf_counter() - start)
+
+        await client.start()
+        after, calls = {}, {}
+        for name, requested in (("after", None), ("fields", fields)):
+            after[name] = []
+            requests = fake.requests
+            for _ in range(iterations):
+                start = time.perf_counter()
+                await service.get_profile(credentials, requested)
+                after[name].append(time.perf_counter() - start)
+            calls[name] = (fake.requests - requests) / iterations
+    finally:
+        await client.close()
+        await fake.stop()
+
+    print(f"upstream latency per call: {latency * 1000:.0f}ms, iterations: {iterations}")
+    summarize("before", before)
+    summarize("after", after["after"])
+    summarize("fields", after["fields"])
+    print(f"p50 speedup: {statistics.median(before) / statistics.median(after['after']):.2f}x")
+    print(f"upstream requests per profile: {calls['after']:.0f} for every field, "
+          f"{calls['fields']:.0f} for {','.join(sorted(fields))}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--latency", type=float, default=0.05, help="fake upstream latency in seconds")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--fields", default="firstName,lastName,headline", help="profile fields to project")
+    args = parser.parse_args()
+    asyncio.run(main(args.latency, args.iterations, frozenset(args.fields.split(","))))
\ No newline at end of file
@@ -0,0 +1,48 @@
+"""Compare full-text search through the FTS5 index with a linear scan of stored posts.
+
+Run from the backend directory (uses a throwaway data directory):
+
+    python -m benchmarks.bench_search --posts 100000
+"""
+import argparse
+import tempfile
+import time
+
+from benchmarks.datasets import fill_storage
+
+QUERIES = ("data", "python", "\"machine learning\"", "lead*", "security platform", "term4242", "kubernetes")
+
+def measure(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def linear_scan(storage, query: str, limit: int) -> list:
+    """What searching looked like without an index: load every item and filter in Python"""
+    terms = [term.strip('"').rstrip("*").lower() for term in query.split()]
+    items = storage.get_posts() + storage.get_articles()
+    matches = [item for item in items if all(term in item["text"].lower() for term in terms)]
+    matches.sort(key=lambda item: item["created_time"], reverse=True)
+    return matches[:limit]
+
+def main(posts: int, limit: int):
+    storage = fill_storage(tempfile.mkdtemp(prefix="bench_search_"), posts)
+
+    print(f"posts: {posts}, page size: {limit}")
+    for query in QUERIES:
+        scan = measure(lambda: linear_scan(storage, query, limit), repeat=2)
+        indexed = measure(lambda: storage.search_posts(query, limit=limit))
+        page = storage.search_posts(query, limit=limit)
+        more = "+" if page["next_cursor"] else ""
+        print(f"{query:22s} scan {scan * 1e3:8.1f}ms  fts5 {indexed * 1e3:7.2f}ms  "
+              f"({scan / indexed:6.0f}x)  hits {len(page['items'])}{more}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--posts", type=int, default=100000)
+    parser.add_argument("--limit", type=int, default=50)
+    args = parser.parse_args()
+    main(args.posts, args.limit)
\ No newline at end of file
@@ -0,0 +1,65 @@
+"""Measure the per-post cost of turning stored posts into a JSON response body.
+
+Run from the backend directory (uses a throwaway data directory):
+
+    python -m benchmarks.bench_serialization --sizes 10000,100000
+
+"validated" is the old cache-hit path (PostData(**row) for every row, then FastAPI's
+jsonable_encoder and the stdlib encoder); "encoded dicts" skips the models but still
+walks the result with jsonable_encoder; "trusted" is the fast path used now (rows built
+with model_construct, or plain dicts written straight to bytes by orjson).
+"""
+import argparse
+import json
+import tempfile
+import time
+
+from benchmarks.datasets import fill_storage
+
+def measure(fn, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def stdlib_render(content) -> bytes:
+    """What starlette's JSONResponse.render does"""
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode()
+
+def main(sizes: list):
+    from fastapi.encoders import jsonable_encoder
+    from app.api.responses import dumps
+    from app.models.linkedin_data import PostData
+    from app.services.linkedin_service import LinkedInService
+
+    for size in sizes:
+        rows = fill_storage(tempfile.mkdtemp(prefix="bench_serialization_"), size).get_posts()
+        paths = {
+            "validated": lambda: stdlib_render(jsonable_encoder([PostData(**row) for row in rows])),
+            "constructed": lambda: stdlib_render(jsonable_encoder([LinkedInService._trusted_post(row) for row in rows])),
+            "encoded dicts": lambda: stdlib_render(jsonable_encoder({"items": rows})),
+            "trusted models": lambda: dumps([LinkedInService._trusted_post(row).model_dump() for row in rows]),
+            "trusted dicts": lambda: dumps({"items": rows}),
+        }
+        print(f"{len(rows)} posts")
+        slowest = None
+        for name, path in paths.items():
+            seconds = measure(path)
+            slowest = slowest or seconds
+            print(f"  {name:15s} {seconds * 1e6 / len(rows):7.2f}us/post  ({slowest / seconds:5.1f}x)")
+
+        # The old JSON files were written with indent=2 and default=str
+        pretty = json.dumps({"posts": rows}, indent=2, default=str).encode()
+        compact = dumps({"posts": rows})
+        print(f"  storage encoding: indent=2 {len(pretty) / len(rows):6.0f}B/post "
+              f"{measure(lambda: json.dumps({'posts': rows}, indent=2, default=str)) * 1e6 / len(rows):6.2f}us/post, "
+              f"orjson {len(compact) / len(rows):6.0f}B/post "
+              f"{measure(lambda: dumps({'posts': rows})) * 1e6 / len(rows):6.2f}us/post")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=lambda value: [int(size) for size in value.split(",")], default=[10000, 100000])
+    args = parser.parse_args()
+    main(args.sizes)
\ No newline at end of file
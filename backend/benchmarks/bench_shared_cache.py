@@ -0,0 +1,106 @@
+"""Measure the two-tier response cache against a local stand-in Redis server.
+
+Run from the backend directory (uses throwaway working directories):
+
+    python -m benchmarks.bench_shared_cache --nodes 4 --rounds 20
+
+Several app servers (one uvicorn subprocess and data directory each) are run against
+one FakeLinkedIn, with and without the shared tier, and the upstream requests for the
+same request mix are compared. Finally new posts are published upstream and the time
+until every node serves each one is measured. The tier's behaviour itself (single-flight
+fills, invalidation, locks, L2 outages) is checked by tests/test_shared_cache.py.
+"""
+import argparse
+import asyncio
+import tempfile
+import time
+from typing import List
+import aiohttp
+
+from benchmarks.fake_linkedin import FakeLinkedIn
+from benchmarks.fake_redis import FakeRedis
+from benchmarks.load_test import Server
+
+CREDENTIALS = {"client_id": "bench", "client_secret": "bench", "access_token": "bench-token"}
+PATHS = ["/api/linkedin/profile", "/api/linkedin/posts", "/api/linkedin/articles", "/api/linkedin/analytics"]
+
+async def get(session: aiohttp.ClientSession, url: str):
+    async with session.get(url) as response:
+        response.raise_for_status()
+        return await response.json()
+
+async def run_cluster(nodes: int, rounds: int, latency: float, shared: bool) -> dict:
+    fake = FakeLinkedIn(latency=latency, posts=50)
+    upstream = await fake.start()
+    redis = FakeRedis()
+    env = {"LINKEDIN_CACHE_TTL": "2", "LINKEDIN_CACHE_STALE_TTL": "60"}
+    if shared:
+        env["CACHE_REDIS_URL"] = await redis.start()
+    servers = [Server(tempfile.mkdtemp(prefix=f"bench_shared_{i}_"), upstream, env) for i in range(nodes)]
+    try:
+        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=120)) as session:
+            for server in servers:
+                await server.wait_ready(session)
+                async with session.post(server.base_url + "/api/config/credentials", json=CREDENTIALS) as response:
+                    response.raise_for_status()
+
+            latencies: List[float] = []
+
+            async def request(server: Server, path: str):
+                started = time.perf_counter()
+                await get(session, server.base_url + path)
+                latencies.append(time.perf_counter() - started)
+
+            before = fake.requests
+            for _ in range(rounds):
+                await asyncio.gather(*[request(server, path) for server in servers for path in PATHS])
+            upstream_requests = fake.requests - before
+            latencies.sort()
+
+            # Publish posts upstream, let the cached data expire, and time until every node serves each one.
+            # Nodes that have only served from the shared tier do a full sync of their own storage the first time.
+            converged = []
+            for number in range(2):
+                post_id = f"urn:li:ugcPost:new-{number}"
+                created = {"time": 1800000000000 + number}
+                fake.posts.insert(0, {
+                    "id": post_id, "created": created, "lastModified": created,
+                    "specificContent": {"com.linkedin.ugc.ShareContent": {"shareCommentary": {"text": "New post"}}}
+                })
+                await asyncio.sleep(2)
+                started = time.perf_counter()
+                pending = set(range(nodes))
+                while pending and time.perf_counter() - started < 30:
+                    for i in sorted(pending):
+                        page = await get(session, servers[i].base_url + "/api/linkedin/posts")
+                        if page["items"] and page["items"][0]["id"] == post_id:
+                            pending.discard(i)
+                    await asyncio.sleep(0.02)
+                converged.append(None if pending else (time.perf_counter() - started) * 1e3)
+            return {
+                "upstream": upstream_requests,
+                "p50_ms": latencies[len(latencies) // 2] * 1e3,
+                "converged": converged
+            }
+    finally:
+        for server in servers:
+            server.stop()
+        await redis.stop()
+        await fake.stop()
+
+async def main(nodes: int, rounds: int, latency: float):
+    print(f"{nodes} nodes, {rounds} rounds of {len(PATHS)} routes per node, upstream latency {latency * 1e3:.0f}ms")
+    print(f"{'cache':10s} {'upstream requests':>18s} {'p50':>9s}   new post on every node (1st, 2nd)")
+    for shared in (False, True):
+        result = await run_cluster(nodes, rounds, latency, shared)
+        converged = ", ".join(f"{ms:.0f}ms" if ms is not None else "not within 30s" for ms in result["converged"])
+        label = "L1 + L2" if shared else "L1 only"
+        print(f"{label:10s} {result['upstream']:18d} {result['p50_ms']:7.2f}ms   {converged}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nodes", type=int, default=4)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.02, help="fake LinkedIn latency in seconds")
+    args = parser.parse_args()
+    asyncio.run(main(args.nodes, args.rounds, args.latency))
\ No newline at end of file
@@ -0,0 +1,64 @@
+"""Compare loading post counts into pandas from SQLite and from the Arrow snapshot.
+
+Run from the backend directory (requires pyarrow; uses a throwaway data directory):
+
+    python -m benchmarks.bench_snapshot --posts 200000
+"""
+import argparse
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+def measure(fn, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main(posts: int):
+    import pandas as pd
+    from app.models.linkedin_data import PostData
+    from app.config import settings
+    from app.services.storage_service import StorageService
+
+    # The snapshot is opt-in
+    settings.SNAPSHOT_ENABLED = True
+    storage = StorageService(tempfile.mkdtemp(prefix="bench_snapshot_"))
+    if storage.snapshot is None:
+        raise SystemExit("pyarrow is not installed; the snapshot is disabled")
+    start = datetime(2016, 1, 1)
+    for offset in range(0, posts, 10000):
+        storage.save_posts([
+            PostData(id=f"urn:li:share:{i}", text=f"Post {i}", created_time=start + timedelta(hours=i),
+                     likes_count=i % 300, comments_count=i % 40, shares_count=i % 12, url=None,
+                     type="post" if i % 5 else "article")
+            for i in range(offset, min(offset + 10000, posts))
+        ])
+    storage.flush_snapshot()
+
+    columns = ["created_time", "likes_count", "comments_count", "shares_count"]
+    last_year = (start + timedelta(hours=posts) - timedelta(days=365), None)
+
+    def from_sqlite(range_start=None, range_end=None):
+        frame = pd.DataFrame.from_records(storage.query_posts(columns, range_start, range_end).fetchall(),
+                                          columns=columns)
+        frame["created_time"] = pd.to_datetime(frame["created_time"])
+        return frame
+
+    def from_snapshot(range_start=None, range_end=None):
+        return storage.read_snapshot(columns, range_start, range_end)
+
+    print(f"posts: {posts}, partitions: {len(storage.snapshot.months())}")
+    for label, bounds in (("all history", (None, None)), ("last 12 months", last_year)):
+        sqlite_time = measure(lambda: from_sqlite(*bounds))
+        snapshot_time = measure(lambda: from_snapshot(*bounds))
+        print(f"{label:15s} sqlite {sqlite_time * 1e3:8.1f}ms  snapshot {snapshot_time * 1e3:8.1f}ms  "
+              f"({sqlite_time / snapshot_time:.1f}x)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--posts", type=int, default=200000)
+    args = parser.parse_args()
+    main(args.posts)
\ No newline at end of file
@@ -0,0 +1,63 @@
+"""Measure cold import and lifespan startup time of the FastAPI app.
+
+Each sample runs in a fresh interpreter, like a new Fargate task. Run from the backend directory:
+
+    python -m benchmarks.bench_startup --runs 10 --max-import-ms 1500
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+PROBE = r"""
+import asyncio, json, time
+start = time.perf_counter()
+import main
+imported = time.perf_counter()
+
+async def start_app():
+    async with main.app.router.lifespan_context(main.app):
+        return time.perf_counter()
+
+started = asyncio.run(start_app())
+print(json.dumps({"import": imported - start, "startup": started - imported}))
+"""
+
+def sample(backend_dir: str, workdir: str) -> dict:
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [backend_dir, os.environ.get("PYTHONPATH")])))
+    env.setdefault("LINKEDIN_REFRESH_ENABLED", "false")
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=workdir, env=env, check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def main(runs: int, max_import_ms: float, max_startup_ms: float) -> int:
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    # Start from an empty working directory so no config/ or data/ state is reused
+    workdir = tempfile.mkdtemp(prefix="bench_startup_")
+    samples = [sample(backend_dir, workdir) for _ in range(runs)]
+    import_ms = statistics.median(s["import"] for s in samples) * 1000
+    startup_ms = statistics.median(s["startup"] for s in samples) * 1000
+    print(f"runs: {runs}")
+    print(f"import  p50: {import_ms:8.1f}ms")
+    print(f"startup p50: {startup_ms:8.1f}ms")
+
+    failed = False
+    if max_import_ms and import_ms > max_import_ms:
+        print(f"FAIL: import time above {max_import_ms}ms")
+        failed = True
+    if max_startup_ms and startup_ms > max_startup_ms:
+        print(f"FAIL: startup time above {max_startup_ms}ms")
+        failed = True
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--max-import-ms", type=float, default=0, help="fail if the median import time is higher")
+    parser.add_argument("--max-startup-ms", type=float, default=0, help="fail if the median startup time is higher")
+    args = parser.parse_args()
+    sys.exit(main(args.runs, args.max_import_ms, args.max_startup_ms))
\ No newline at end of file
@@ -0,0 +1,76 @@
+"""Drive the upstream scheduler against a fake LinkedIn that injects 429s and 500s.
+
+Run from the backend directory:
+
+    python -m benchmarks.bench_throttling --throttle-rate 0.3 --requests 50
+
+The first phase shows retries absorbing throttling; the second forces a full outage
+and shows the circuit breaker opening and short-circuiting calls. The scheduler's
+behaviour itself is checked by tests/test_upstream_scheduler.py.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+from benchmarks.fake_linkedin import FakeLinkedIn
+
+async def fetch_many(service, credentials: dict, count: int) -> tuple:
+    from app.services.upstream_scheduler import LinkedInAPIError
+
+    async def one():
+        start = time.perf_counter()
+        try:
+            await service.get_profile(credentials)
+            return True, time.perf_counter() - start, None
+        except LinkedInAPIError as e:
+            return False, time.perf_counter() - start, type(e).__name__
+
+    results = await asyncio.gather(*[one() for _ in range(count)])
+    ok = [elapsed for success, elapsed, _ in results if success]
+    failures = [name for success, _, name in results if not success]
+    return ok, failures
+
+async def main(throttle_rate: float, requests: int, retry_after: float):
+    fake = FakeLinkedIn(latency=0.01, throttle_rate=throttle_rate, retry_after=retry_after)
+    base_url = await fake.start()
+    os.environ.setdefault("LINKEDIN_ACCESS_TOKEN", "benchmark-token")
+
+    from app.services.http_client import LinkedInHttpClient
+    from app.services.linkedin_service import LinkedInService
+    from app.services.upstream_scheduler import UpstreamScheduler
+
+    scheduler = UpstreamScheduler(app_rate=100, app_burst=50, token_rate=50, token_burst=50,
+                                  max_retries=4, backoff_base=0.05, backoff_max=1.0,
+                                  breaker_threshold=10, breaker_cooldown=2.0)
+    client = LinkedInHttpClient(scheduler=scheduler)
+    service = LinkedInService(http=client)
+    service.base_url = base_url
+    credentials = {"access_token": "benchmark-token"}
+
+    try:
+        ok, failures = await fetch_many(service, credentials, requests)
+        print(f"phase 1: {throttle_rate:.0%} of upstream calls throttled")
+        print(f"  profiles ok: {len(ok)}/{requests}, failed: {len(failures)}")
+        if ok:
+            print(f"  p50 latency: {statistics.median(ok) * 1000:.1f}ms")
+        print(f"  upstream 429s: {fake.throttled}, scheduler: {scheduler.stats()}")
+
+        fake.throttle_rate, fake.error_rate = 0.0, 1.0
+        ok, failures = await fetch_many(service, credentials, requests)
+        print("phase 2: upstream returns 500 for everything")
+        print(f"  profiles ok: {len(ok)}/{requests}, failures by type: "
+              f"{ {name: failures.count(name) for name in set(failures)} }")
+        print(f"  scheduler: {scheduler.stats()}")
+    finally:
+        await client.close()
+        await fake.stop()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--throttle-rate", type=float, default=0.3)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--retry-after", type=float, default=None)
+    args = parser.parse_args()
+    asyncio.run(main(args.throttle_rate, args.requests, args.retry_after))
\ No newline at end of file
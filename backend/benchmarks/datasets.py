@@ -0,0 +1,39 @@
+"""Reproducible post datasets for the benchmarks"""
+import itertools
+import random
+from datetime import datetime, timedelta
+from typing import Iterator, List
+
+TOPICS = ("data", "engineering", "machine", "learning", "hiring", "team", "product", "launch", "python",
+          "cloud", "growth", "customer", "design", "leadership", "remote", "startup", "analytics", "career",
+          "conference", "open", "source", "community", "security", "platform", "strategy", "innovation")
+
+# Topic words followed by a long tail, drawn with Zipf-like frequencies as in real text
+VOCABULARY = TOPICS + tuple(f"term{i}" for i in range(20000))
+CUM_WEIGHTS = list(itertools.accumulate(1 / (rank + 10) for rank in range(len(VOCABULARY))))
+
+START = datetime(2016, 1, 1)
+
+def generate_posts(size: int, seed: int = 0, batch_size: int = 10000, step: timedelta = timedelta(hours=1),
+                   words: int = 30) -> Iterator[List]:
+    """Yield batches of PostData; the same size and seed always produce the same posts"""
+    from app.models.linkedin_data import PostData
+
+    rng = random.Random(seed)
+    for offset in range(0, size, batch_size):
+        yield [
+            PostData(id=f"urn:li:share:{i}", text=" ".join(rng.choices(VOCABULARY, cum_weights=CUM_WEIGHTS, k=words)),
+                     created_time=START + i * step, likes_count=i % 300, comments_count=i % 40,
+                     shares_count=i % 12, url=f"https://www.linkedin.com/feed/update/urn:li:share:{i}",
+                     type="post" if i % 5 else "article")
+            for i in range(offset, min(offset + batch_size, size))
+        ]
+
+def fill_storage(data_dir: str, size: int, seed: int = 0, **kwargs):
+    """Write a generated dataset through StorageService, so rollups, search index and (when enabled) snapshot are built too"""
+    from app.services.storage_service import StorageService
+
+    storage = StorageService(data_dir)
+    for batch in generate_posts(size, seed, **kwargs):
+        storage.save_posts(batch)
+    return storage
\ No newline at end of file
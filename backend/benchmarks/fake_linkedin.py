@@ -0,0 +1,174 @@
+"""Local stand-in for the LinkedIn v2 API used by the benchmarks"""
+import asyncio
+import functools
+import random
+import struct
+import zlib
+from aiohttp import web
+
+PROFILE = {
+    "id": "fake-member",
+    "localizedFirstName": "Ada",
+    "localizedLastName": "Lovelace",
+    "headline": "Engineer",
+    "location": {"name": "London"},
+    "industry": "Computer Software",
+    "summary": "Benchmark fixture",
+    "positions": {"elements": [{"title": "Engineer", "companyName": "Analytical Engines",
+                                "startDate": {"year": 1842, "month": 1}}]},
+    "educations": {"elements": []},
+    "skills": {"elements": [{"name": "Mathematics"}]},
+    "websites": {"elements": []}
+}
+
+EMAIL = {"elements": [{"handle~": {"emailAddress": "ada@example.com"}}]}
+
+def picture(media_url: str) -> dict:
+    """profilePicture projection whose renditions are served by the fake's media route"""
+    return {
+        "profilePicture": {
+            "displayImage~": {
+                "elements": [
+                    {"identifiers": [{"identifier": f"{media_url}/100.png"}]},
+                    {"identifiers": [{"identifier": f"{media_url}/800.png"}]}
+                ]
+            }
+        }
+    }
+
+@functools.lru_cache(maxsize=None)
+def make_png(size: int) -> bytes:
+    """A size x size RGB gradient PNG, about as large as a LinkedIn photo of that size"""
+    columns = [x * 255 // size for x in range(size)]
+    rows = []
+    for y in range(size):
+        green = y * 255 // size
+        rows.append(b"\x00" + b"".join(bytes((red, green, red ^ green)) for red in columns))
+
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    header = struct.pack(">IIBBBBB", size, size, 8, 2, 0, 0, 0)
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", zlib.compress(b"".join(rows), 6))
+            + chunk(b"IEND", b""))
+
+def make_posts(count: int, start_ms: int = 1700000000000, step_ms: int = 3600000) -> list:
+    """Generate ugcPost elements, newest (highest lastModified) first"""
+    posts = []
+    for i in range(count):
+        created = start_ms + i * step_ms
+        posts.append({
+            "id": f"urn:li:ugcPost:{i}",
+            "created": {"time": created},
+            "lastModified": {"time": created},
+            "specificContent": {
+                "com.linkedin.ugc.ShareContent": {"shareCommentary": {"text": f"Benchmark post {i}"}}
+            }
+        })
+    posts.reverse()
+    return posts
+
+class FakeLinkedIn:
+    """aiohttp app serving canned LinkedIn responses with a fixed per-request latency"""
+
+    def __init__(self, latency: float = 0.05, posts: int = 0, throttle_rate: float = 0.0,
+                 error_rate: float = 0.0, retry_after: float = None, seed: int = 0):
+        self.latency = latency
+        self.posts = make_posts(posts)
+        self.articles = []
+        # Fraction of requests answered with 429 (optionally with Retry-After) or 500
+        self.throttle_rate = throttle_rate
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.requests = 0
+        # Picture downloads from the media route, which is not part of the API and not counted in requests
+        self.media_requests = 0
+        self.throttled = 0
+        self.errors = 0
+        self._runner = None
+        self.base_url = None
+
+    async def _me(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        await asyncio.sleep(self.latency)
+        projection = request.query.get("projection", "")
+        if projection.startswith("(profilePicture"):
+            return web.json_response(picture(self.base_url.removesuffix("/v2") + "/media"))
+        return web.json_response(PROFILE)
+
+    async def _email(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        await asyncio.sleep(self.latency)
+        return web.json_response(EMAIL)
+
+    def _page(self, items: list, request: web.Request) -> web.Response:
+        start = int(request.query.get("start", 0))
+        count = int(request.query.get("count", 50))
+        return web.json_response({
+            "elements": items[start:start + count],
+            "paging": {"start": start, "count": count, "total": len(items)}
+        })
+
+    async def _ugc_posts(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        await asyncio.sleep(self.latency)
+        return self._page(self.posts, request)
+
+    async def _articles(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        await asyncio.sleep(self.latency)
+        return self._page(self.articles, request)
+
+    async def _social_actions(self, request: web.Request) -> web.Response:
+        self.requests += 1
+        await asyncio.sleep(self.latency)
+        seed = sum(map(ord, request.match_info["urn"]))
+        return web.json_response({
+            "likesSummary": {"totalLikes": seed % 500},
+            "commentsSummary": {"aggregatedTotalComments": seed % 50}
+        })
+
+    async def _media(self, request: web.Request) -> web.Response:
+        self.media_requests += 1
+        await asyncio.sleep(self.latency)
+        name = request.match_info["name"]
+        if not (name.endswith(".png") and name[:-4].isdigit()):
+            raise web.HTTPNotFound()
+        return web.Response(body=make_png(int(name[:-4])), content_type="image/png")
+
+    @web.middleware
+    async def _faults(self, request: web.Request, handler):
+        roll = self.random.random()
+        if roll < self.throttle_rate:
+            self.throttled += 1
+            headers = {"Retry-After": str(self.retry_after)} if self.retry_after is not None else {}
+            return web.json_response({"message": "Throttled", "status": 429}, status=429, headers=headers)
+        if roll < self.throttle_rate + self.error_rate:
+            self.errors += 1
+            return web.json_response({"message": "Internal error", "status": 500}, status=500)
+        return await handler(request)
+
+    def app(self) -> web.Application:
+        app = web.Application(middlewares=[self._faults])
+        app.router.add_get("/v2/me", self._me)
+        app.router.add_get("/v2/emailAddress", self._email)
+        app.router.add_get("/v2/ugcPosts", self._ugc_posts)
+        app.router.add_get("/v2/originalArticles", self._articles)
+        app.router.add_get("/v2/socialActions/{urn}", self._social_actions)
+        app.router.add_get("/media/{name}", self._media)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        self._runner = web.AppRunner(self.app())
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        self.base_url = f"http://{host}:{port}/v2"
+        return self.base_url
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
\ No newline at end of file
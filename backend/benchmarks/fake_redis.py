@@ -0,0 +1,159 @@
+"""Local stand-in for a Redis server, covering the commands the shared cache uses.
+
+Speaks RESP2 over TCP: PING, AUTH, SELECT, GET, SET (EX/PX/NX/XX), DEL, INCR, EXISTS, FLUSHALL,
+PUBLISH, SUBSCRIBE, and EVAL of the shared cache's lock-release script only (there is no Lua here).
+"""
+import asyncio
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from app.services.shared_cache import RELEASE_LOCK
+
+OK = b"+OK\r\n"
+NIL = b"$-1\r\n"
+
+def bulk(value: bytes) -> bytes:
+    return b"$%d\r\n%s\r\n" % (len(value), value)
+
+def integer(value: int) -> bytes:
+    return b":%d\r\n" % value
+
+def error(message: str) -> bytes:
+    return b"-ERR %s\r\n" % message.encode()
+
+async def read_command(reader: asyncio.StreamReader) -> List[bytes]:
+    """Read one command sent as a RESP array of bulk strings"""
+    header = await reader.readuntil(b"\r\n")
+    args = []
+    for _ in range(int(header[1:-2])):
+        length = int((await reader.readuntil(b"\r\n"))[1:-2])
+        args.append((await reader.readexactly(length + 2))[:-2])
+    return args
+
+class FakeRedis:
+    """In-process asyncio server holding keys (with lazy expiry) and pub/sub channels"""
+
+    def __init__(self):
+        # key -> (value, monotonic expiry or None)
+        self.data: Dict[bytes, Tuple[bytes, Optional[float]]] = {}
+        self.channels: Dict[bytes, Set[asyncio.StreamWriter]] = {}
+        self.commands = 0
+        self._writers: Set[asyncio.StreamWriter] = set()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self.url = None
+
+    def _get(self, key: bytes) -> Optional[bytes]:
+        entry = self.data.get(key)
+        if entry is None:
+            return None
+        value, expires = entry
+        if expires is not None and expires <= time.monotonic():
+            del self.data[key]
+            return None
+        return value
+
+    def _set(self, args: List[bytes]) -> bytes:
+        key, value, options = args[0], args[1], [arg.upper() for arg in args[2:]]
+        expires = None
+        if b"PX" in options:
+            expires = time.monotonic() + int(options[options.index(b"PX") + 1]) / 1000
+        elif b"EX" in options:
+            expires = time.monotonic() + int(options[options.index(b"EX") + 1])
+        exists = self._get(key) is not None
+        if (b"NX" in options and exists) or (b"XX" in options and not exists):
+            return NIL
+        self.data[key] = (value, expires)
+        return OK
+
+    def _incr(self, key: bytes) -> bytes:
+        value = self._get(key)
+        try:
+            number = int(value or 0) + 1
+        except ValueError:
+            return error("value is not an integer or out of range")
+        expires = self.data[key][1] if key in self.data else None
+        self.data[key] = (str(number).encode(), expires)
+        return integer(number)
+
+    def _eval(self, args: List[bytes]) -> bytes:
+        if args[0].decode() != RELEASE_LOCK:
+            return error("only the lock release script is supported")
+        key, token = args[2], args[3]
+        if self._get(key) == token:
+            del self.data[key]
+            return integer(1)
+        return integer(0)
+
+    def _publish(self, channel: bytes, message: bytes) -> bytes:
+        subscribers = self.channels.get(channel, set())
+        payload = b"*3\r\n" + bulk(b"message") + bulk(channel) + bulk(message)
+        for writer in list(subscribers):
+            if writer.is_closing():
+                subscribers.discard(writer)
+            else:
+                writer.write(payload)
+        return integer(len(subscribers))
+
+    def execute(self, args: List[bytes]) -> bytes:
+        self.commands += 1
+        command, args = args[0].upper(), args[1:]
+        if command == b"PING":
+            return b"+PONG\r\n"
+        if command in (b"AUTH", b"SELECT"):
+            return OK
+        if command == b"GET":
+            value = self._get(args[0])
+            return bulk(value) if value is not None else NIL
+        if command == b"SET":
+            return self._set(args)
+        if command == b"DEL":
+            return integer(sum(self.data.pop(key, None) is not None for key in args))
+        if command == b"EXISTS":
+            return integer(sum(self._get(key) is not None for key in args))
+        if command == b"INCR":
+            return self._incr(args[0])
+        if command == b"EVAL":
+            return self._eval(args)
+        if command == b"PUBLISH":
+            return self._publish(args[0], args[1])
+        if command == b"FLUSHALL":
+            self.data.clear()
+            return OK
+        return error(f"unknown command '{command.decode()}'")
+
+    async def _client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        subscribed: List[bytes] = []
+        self._writers.add(writer)
+        try:
+            while True:
+                args = await read_command(reader)
+                if args[0].upper() == b"SUBSCRIBE":
+                    for channel in args[1:]:
+                        self.channels.setdefault(channel, set()).add(writer)
+                        subscribed.append(channel)
+                        writer.write(b"*3\r\n" + bulk(b"subscribe") + bulk(channel) + integer(len(subscribed)))
+                else:
+                    writer.write(self.execute(args))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            for channel in subscribed:
+                self.channels.get(channel, set()).discard(writer)
+            self._writers.discard(writer)
+            writer.close()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        self._server = await asyncio.start_server(self._client, host, port)
+        port = self._server.sockets[0].getsockname()[1]
+        self.url = f"redis://{host}:{port}/0"
+        return self.url
+
+    async def stop(self):
+        if self._server is not None:
+            self._server.close()
+            for writer in list(self._writers):
+                writer.close()
+            self.channels.clear()
+            await self._server.wait_closed()
+            self._server = None
\ No newline at end of file
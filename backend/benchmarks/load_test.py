@@ -0,0 +1,322 @@
+"""Load-test every read route of the API against a local fake LinkedIn and compare with stored baselines.
+
+Run from the backend directory (uses throwaway working directories):
+
+    python -m benchmarks.load_test --sizes 1000,100000,1000000
+    python -m benchmarks.load_test --sizes 1000 --update-baseline
+
+For each dataset size, posts are generated into a fresh data directory and the app is
+started under uvicorn in a subprocess, pointed at an in-process FakeLinkedIn with the
+given latency and fault rates. Each scenario is warmed up, then driven by an async
+HTTP load generator at a fixed concurrency, --repeat times, keeping each metric's best
+value. Throughput, p50/p95/p99 latency and the server's peak RSS are reported and
+compared with benchmarks/load_baseline.json; the run exits non-zero if any of them regressed past the tolerances, if any request failed,
+or if a measured size or scenario has no baseline (record one with --update-baseline).
+The committed baseline was recorded on a developer machine; CI runs the 1000-post size
+with wider tolerances (see .github/workflows/backend.yml).
+
+The OAuth routes (they redirect to LinkedIn) and routes that change configuration
+are not load-tested.
+"""
+import argparse
+import asyncio
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import timedelta
+from typing import Dict, List, Optional
+import aiohttp
+
+from benchmarks.datasets import fill_storage
+from benchmarks.fake_linkedin import FakeLinkedIn
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE = os.path.join(BACKEND_DIR, "benchmarks", "load_baseline.json")
+
+BATCH_ACCOUNTS = [f"bench-{i}" for i in range(8)]
+
+# name -> request spec; "requests" and "concurrency" override the command-line defaults
+SCENARIOS = {
+    "root": {"path": "/"},
+    "config_status": {"path": "/api/config/status"},
+    "config_accounts": {"path": "/api/config/accounts"},
+    "profile": {"path": "/api/linkedin/profile"},
+    "profile_revalidate": {"path": "/api/linkedin/profile", "revalidate": True},
+    "posts": {"path": "/api/linkedin/posts", "params": {"limit": 50}},
+    "posts_revalidate": {"path": "/api/linkedin/posts", "params": {"limit": 50}, "revalidate": True},
+    "posts_large_page": {"path": "/api/linkedin/posts", "params": {"limit": 500}},
+    "articles": {"path": "/api/linkedin/articles", "params": {"limit": 50}},
+    "search": {"path": "/api/linkedin/posts/search", "params": {"q": "machine learning", "limit": 50}},
+    "analytics": {"path": "/api/linkedin/analytics", "params": {"granularity": "month"}},
+    "rollups_check": {"path": "/api/linkedin/analytics/rollups/check", "requests": 20, "concurrency": 2},
+    "export_ndjson": {"path": "/api/linkedin/export", "params": {"format": "ndjson"}, "requests": 4, "concurrency": 2},
+    "batch": {"method": "POST", "path": "/api/linkedin/batch", "requests": 50, "concurrency": 4,
+              "json": {"accounts": BATCH_ACCOUNTS, "resources": ["profile"]}},
+    "cache_stats": {"path": "/api/linkedin/cache/stats"},
+    "upstream_stats": {"path": "/api/linkedin/upstream/stats"},
+    "metrics": {"path": "/metrics"},
+}
+
+# Metric -> whether higher is better
+METRICS = {"throughput": True, "p50_ms": False, "p95_ms": False, "p99_ms": False, "peak_rss_mb": False}
+
+def percentile(samples: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of sorted samples"""
+    if not samples:
+        return 0.0
+    return samples[min(len(samples) - 1, max(0, int(round(fraction * len(samples))) - 1))]
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+class Server:
+    """The app under uvicorn in a subprocess, so its RSS and CPU are measured apart from the load generator"""
+
+    def __init__(self, workdir: str, upstream: str, env: Dict[str, str]):
+        self.port = free_port()
+        self.base_url = f"http://127.0.0.1:{self.port}"
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(self.port),
+             "--log-level", "warning", "--no-access-log"],
+            cwd=workdir,
+            env={**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [BACKEND_DIR, os.environ.get("PYTHONPATH")])),
+                 "LINKEDIN_API_BASE_URL": upstream,
+                 "LINKEDIN_REFRESH_ENABLED": "false", "LOG_LEVEL": "WARNING", **env}
+        )
+
+    async def wait_ready(self, session: aiohttp.ClientSession, timeout: float = 120):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.process.poll() is not None:
+                raise SystemExit(f"server exited with status {self.process.returncode}")
+            try:
+                async with session.get(self.base_url + "/") as response:
+                    if response.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.2)
+        raise SystemExit("server did not start in time")
+
+    def _status_kb(self, field: str) -> Optional[int]:
+        try:
+            with open(f"/proc/{self.process.pid}/status") as status:
+                for line in status:
+                    if line.startswith(field + ":"):
+                        return int(line.split()[1])
+        except OSError:
+            pass
+        return None
+
+    def reset_peak_rss(self):
+        """Restart the peak RSS high-water mark at the current RSS (Linux only; otherwise the peak is cumulative)"""
+        try:
+            with open(f"/proc/{self.process.pid}/clear_refs", "w") as clear_refs:
+                clear_refs.write("5")
+        except OSError:
+            pass
+
+    def peak_rss_mb(self) -> Optional[float]:
+        peak = self._status_kb("VmHWM")
+        return peak / 1024 if peak is not None else None
+
+    def stop(self):
+        self.process.send_signal(signal.SIGINT)
+        try:
+            self.process.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+async def send(session: aiohttp.ClientSession, base_url: str, spec: Dict,
+               headers: Optional[Dict] = None) -> aiohttp.ClientResponse:
+    """Issue one request and read the whole body, so streamed responses are timed to their last byte"""
+    async with session.request(spec.get("method", "GET"), base_url + spec["path"], params=spec.get("params"),
+                               json=spec.get("json"), headers=headers) as response:
+        await response.read()
+        return response
+
+async def run_scenario(session: aiohttp.ClientSession, server: Server, spec: Dict, requests: int,
+                       concurrency: int, warmup: int) -> Dict:
+    """Warm up, then send `requests` requests from `concurrency` workers and summarize them"""
+    requests = spec.get("requests", requests)
+    concurrency = min(spec.get("concurrency", concurrency), requests)
+    headers = None
+    for _ in range(min(warmup, requests)):
+        await send(session, server.base_url, spec)
+    if spec.get("revalidate"):
+        response = await send(session, server.base_url, spec)
+        headers = {"If-None-Match": response.headers.get("ETag", "")}
+
+    latencies: List[float] = []
+    errors = 0
+    remaining = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for _ in remaining:
+            started = time.perf_counter()
+            try:
+                response = await send(session, server.base_url, spec, headers)
+                if response.status >= 400:
+                    errors += 1
+            except aiohttp.ClientError:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    server.reset_peak_rss()
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": errors,
+        "throughput": requests / elapsed,
+        "p50_ms": percentile(latencies, 0.50) * 1e3,
+        "p95_ms": percentile(latencies, 0.95) * 1e3,
+        "p99_ms": percentile(latencies, 0.99) * 1e3,
+        "peak_rss_mb": server.peak_rss_mb(),
+    }
+
+def best_of(runs: List[Dict]) -> Dict:
+    """Each metric's best value over repeated runs, so one noisy run (GC, a busy neighbour) does not fail the gate;
+    errors are summed, since any failure counts"""
+    best = dict(runs[0])
+    for metric, higher_is_better in METRICS.items():
+        values = [run[metric] for run in runs if run[metric] is not None]
+        if values:
+            best[metric] = max(values) if higher_is_better else min(values)
+    best["errors"] = sum(run["errors"] for run in runs)
+    best["requests"] = sum(run["requests"] for run in runs)
+    return best
+
+async def run_size(size: int, args) -> Dict[str, Dict]:
+    workdir = tempfile.mkdtemp(prefix=f"load_test_{size}_")
+    started = time.perf_counter()
+    # Spread the history over ten years whatever its size
+    fill_storage(os.path.join(workdir, "data"), size, step=timedelta(days=3650) / max(size, 1))
+    print(f"\n{size} posts (generated in {time.perf_counter() - started:.1f}s, {workdir})")
+
+    fake = FakeLinkedIn(latency=args.latency, posts=args.upstream_posts, throttle_rate=args.throttle_rate,
+                        error_rate=args.error_rate, retry_after=args.retry_after)
+    upstream = await fake.start()
+    server = Server(workdir, upstream, {})
+    connector = aiohttp.TCPConnector(limit=args.concurrency)
+    results = {}
+    try:
+        async with aiohttp.ClientSession(connector=connector, timeout=aiohttp.ClientTimeout(total=600)) as session:
+            await server.wait_ready(session)
+            credentials = {"client_id": "bench", "client_secret": "bench", "access_token": "bench-token"}
+            async with session.post(server.base_url + "/api/config/credentials", json=credentials) as response:
+                response.raise_for_status()
+            for account in BATCH_ACCOUNTS:
+                account_credentials = {**credentials, "access_token": f"{account}-token"}
+                async with session.put(f"{server.base_url}/api/config/accounts/{account}",
+                                       json=account_credentials) as response:
+                    response.raise_for_status()
+
+            print(f"{'scenario':20s} {'req/s':>9s} {'p50':>9s} {'p95':>9s} {'p99':>9s} {'peak RSS':>9s} errors")
+            for name, spec in SCENARIOS.items():
+                if args.scenarios and name not in args.scenarios:
+                    continue
+                runs = [
+                    await run_scenario(session, server, spec, args.requests, args.concurrency, args.warmup)
+                    for _ in range(args.repeat)
+                ]
+                result = results[name] = best_of(runs)
+                rss = f"{result['peak_rss_mb']:7.1f}MB" if result["peak_rss_mb"] is not None else "      n/a"
+                print(f"{name:20s} {result['throughput']:9.1f} {result['p50_ms']:7.2f}ms {result['p95_ms']:7.2f}ms "
+                      f"{result['p99_ms']:7.2f}ms {rss} {result['errors']}")
+    finally:
+        server.stop()
+        await fake.stop()
+    print(f"upstream: {fake.requests} requests, {fake.throttled} throttled, {fake.errors} errors")
+    return results
+
+def compare(results: Dict, baseline: Dict, tolerance: float, rss_tolerance: float, min_delta_ms: float) -> List[str]:
+    """Describe every failed request, missing baseline and metric worse than its baseline by more than the tolerance"""
+    regressions = []
+    for size, scenarios in results.items():
+        for name, result in scenarios.items():
+            expected = baseline.get(size, {}).get(name)
+            # Errors are never part of a healthy run, whatever the baseline says
+            if result["errors"]:
+                regressions.append(f"{size} posts / {name}: {result['errors']} of {result['requests']} requests failed")
+            if not expected:
+                regressions.append(f"{size} posts / {name}: no baseline")
+                continue
+            for metric, higher_is_better in METRICS.items():
+                value, reference = result.get(metric), expected.get(metric)
+                if value is None or reference is None:
+                    continue
+                if higher_is_better:
+                    regressed = value < reference * (1 - tolerance)
+                elif metric == "peak_rss_mb":
+                    regressed = value > reference * (1 + rss_tolerance)
+                else:
+                    # Sub-millisecond latencies are noisy; require an absolute change as well
+                    regressed = value > reference * (1 + tolerance) and value - reference > min_delta_ms
+                if regressed:
+                    regressions.append(f"{size} posts / {name}: {metric} {value:.2f} vs baseline {reference:.2f}")
+    return regressions
+
+async def main(args) -> int:
+    results = {}
+    for size in args.sizes:
+        results[str(size)] = await run_size(size, args)
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    failed = [f"{size} posts / {name}" for size, scenarios in results.items()
+              for name, result in scenarios.items() if result["errors"]]
+    if args.update_baseline and failed:
+        print(f"\nnot recording a baseline with failed requests in: {', '.join(failed)}")
+        return 1
+    if args.update_baseline:
+        baseline.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"\nbaseline written to {args.baseline}")
+        return 0
+    if not baseline:
+        print(f"\nno baseline at {args.baseline}; run with --update-baseline to record one")
+        return 1
+
+    regressions = compare(results, baseline, args.tolerance, args.rss_tolerance, args.min_delta_ms)
+    for regression in regressions:
+        print("REGRESSION", regression)
+    print(f"\n{len(regressions)} regressions against {args.baseline}")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=lambda value: [int(size) for size in value.split(",")], default=[1000, 100000])
+    parser.add_argument("--scenarios", type=lambda value: value.split(","), default=None,
+                        help="comma-separated subset of: " + ", ".join(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=500, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=3, help="runs per scenario; the best value of each metric is kept")
+    parser.add_argument("--latency", type=float, default=0.05, help="fake LinkedIn latency per request (s)")
+    parser.add_argument("--upstream-posts", type=int, default=0, help="posts the fake serves to incremental sync")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="fraction of upstream calls answered 429")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of upstream calls answered 500")
+    parser.add_argument("--retry-after", type=float, default=None)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--update-baseline", "--write-baseline", dest="update_baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed throughput/latency regression")
+    parser.add_argument("--rss-tolerance", type=float, default=0.15, help="allowed peak RSS regression")
+    parser.add_argument("--min-delta-ms", type=float, default=5.0)
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args)))
\ No newline at end of file
@@ -1,8 +1,25 @@
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from app.api import auth, config, linkedin
+from app.api import auth, config, linkedin, metrics
+from app.api.responses import ORJSONResponse
+from app.config import settings
+from app.container import ServiceContainer
+from app.middleware import MetricsMiddleware, SelectiveGZipMiddleware
 
-app = FastAPI(title="Social Media Data API", version="1.0.0")
+logging.basicConfig(level=settings.LOG_LEVEL, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # One container per worker; services are created lazily on first use
+    app.state.container = ServiceContainer()
+    await app.state.container.startup()
+    yield
+    await app.state.container.shutdown()
+
+app = FastAPI(title="Social Media Data API", version="1.0.0", lifespan=lifespan,
+              default_response_class=ORJSONResponse)
 
 # Update CORS settings
 app.add_middleware(
@@ -14,12 +31,26 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Let the frontend read validators for conditional requests
+    expose_headers=["ETag", "Last-Modified"],
+)
+
+# Compress JSON bodies; the batch stream must flush per line and exports gzip themselves
+app.add_middleware(
+    SelectiveGZipMiddleware,
+    minimum_size=settings.GZIP_MINIMUM_SIZE,
+    compresslevel=settings.GZIP_LEVEL,
+    exclude_paths=["/api/linkedin/batch", "/api/linkedin/export"],
 )
 
+# Outermost, so latency includes compression and CORS handling
+app.add_middleware(MetricsMiddleware)
+
 # Include routers
 app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
 app.include_router(config.router, prefix="/api/config", tags=["config"])
 app.include_router(linkedin.router, prefix="/api/linkedin", tags=["linkedin"])
+app.include_router(metrics.router, tags=["metrics"])
 
 @app.get("/")
 async def root():
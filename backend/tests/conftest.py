@@ -0,0 +1,10 @@
+import pytest
+from app.config import settings
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    """Run in a throwaway directory; the app keeps data/ and config/ under the working directory"""
+    monkeypatch.chdir(tmp_path)
+    # Tests drive syncs themselves
+    monkeypatch.setattr(settings, "LINKEDIN_REFRESH_ENABLED", False)
+    return tmp_path
\ No newline at end of file
@@ -0,0 +1,39 @@
+import asyncio
+import multiprocessing
+import httpx
+from app.services.config_service import ConfigService
+from main import app
+
+def save_accounts(prefix: str, count: int):
+    config = ConfigService()
+    for i in range(count):
+        config.save_account_credentials(f"{prefix}{i}", {"access_token": f"{prefix}{i}"})
+
+def test_concurrent_workers_do_not_lose_account_updates(workdir):
+    ConfigService()
+    # Separate processes, like uvicorn workers, each with their own in-memory state
+    workers = [multiprocessing.Process(target=save_accounts, args=(prefix, 15)) for prefix in "abc"]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert len(ConfigService().list_accounts()) == 45
+
+def test_removed_account_releases_its_database(workdir):
+    async def run():
+        async with app.router.lifespan_context(app):
+            container = app.state.container
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                await client.put("/api/config/accounts/acme",
+                                 json={"client_id": "a", "client_secret": "b", "access_token": "t"})
+                async with container.account_service("acme") as service:
+                    closed = []
+                    service.storage.close = lambda: closed.append(True)
+                response = await client.delete("/api/config/accounts/acme")
+            return response, closed, "acme" in container.account_services
+
+    response, closed, cached = asyncio.run(run())
+    assert response.status_code == 200
+    assert not cached
+    assert closed == [True]
\ No newline at end of file
@@ -0,0 +1,60 @@
+import asyncio
+import time
+from datetime import timedelta
+import httpx
+from main import app
+
+class SlowApplication:
+    """Stand-in for linkedin.LinkedInApplication with a slow, blocking get_profile()"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+
+    def get_profile(self):
+        time.sleep(self.delay)
+        return {"id": "test", "firstName": "Test", "lastName": "User"}
+
+def test_slow_legacy_call_does_not_stall_other_requests(workdir):
+    async def run():
+        async with app.router.lifespan_context(app):
+            service = app.state.container.linkedin_service
+            service.__dict__["application"] = SlowApplication(0.5)
+            service.cache_duration = timedelta(0)
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                await client.get("/api/config/status")
+                slow = asyncio.ensure_future(service.get_profile_data())
+                await asyncio.sleep(0.05)
+                started = time.perf_counter()
+                response = await client.get("/api/config/status")
+                latency = time.perf_counter() - started
+                # Answered while the legacy call is still blocking its pool thread
+                assert not slow.done()
+                profile = await slow
+        return response, latency, profile
+
+    response, latency, profile = asyncio.run(run())
+    assert response.status_code == 200
+    assert latency < 0.25
+    assert profile.firstName == "Test"
+
+def test_blocking_executor_runs_off_the_event_loop():
+    from app.services.executor import BlockingExecutor
+
+    async def run():
+        executor = BlockingExecutor(1, "test")
+        ticks = 0
+
+        async def tick():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        ticker = asyncio.ensure_future(tick())
+        await executor.run(time.sleep, 0.2)
+        ticker.cancel()
+        executor.shutdown()
+        return ticks
+
+    # The loop kept running its other tasks while the pool thread slept
+    assert asyncio.run(run()) >= 5
\ No newline at end of file
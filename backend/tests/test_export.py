@@ -0,0 +1,94 @@
+import asyncio
+import gzip
+import json
+from datetime import datetime, timedelta
+import httpx
+from app.config import settings
+from app.models.linkedin_data import PostData
+from app.services.executor import BlockingExecutor
+from app.services.export_service import ExportService
+from app.services.storage_service import POST_COLUMNS, StorageService
+from benchmarks.fake_linkedin import FakeLinkedIn
+
+def make_storage(data_dir, count: int) -> StorageService:
+    storage = StorageService(str(data_dir))
+    start = datetime(2020, 1, 1)
+    storage.save_posts([
+        PostData(id=f"urn:li:share:{i}", text=f"Post {i}", created_time=start + timedelta(hours=i),
+                 likes_count=i, comments_count=0, shares_count=0, url=None, type="post" if i % 5 else "article")
+        for i in range(count)
+    ])
+    return storage
+
+def collect(exporter: ExportService, fmt: str, **kwargs) -> list:
+    async def run():
+        return [chunk async for chunk in exporter.stream(fmt, **kwargs)]
+    return asyncio.run(run())
+
+def test_export_streams_one_bounded_chunk_at_a_time(tmp_path):
+    storage = make_storage(tmp_path, 25)
+    reads = []
+    export_posts = storage.export_posts
+
+    def recording_export_posts(*args, **kwargs):
+        rows = export_posts(*args, **kwargs)
+        reads.append(len(rows))
+        return rows
+
+    storage.export_posts = recording_export_posts
+    executor = BlockingExecutor(1, "test")
+    chunks = collect(ExportService(storage, executor, chunk_size=10), "ndjson")
+    executor.shutdown()
+
+    # Each storage read is bounded by the chunk size and sent on before the next one
+    assert reads == [10, 10, 5]
+    assert [chunk.count(b"\n") for chunk in chunks] == [10, 10, 5]
+    rows = [json.loads(line) for chunk in chunks for line in chunk.splitlines()]
+    assert [row["id"] for row in rows] == [f"urn:li:share:{i}" for i in range(25)]
+    assert set(rows[0]) == set(POST_COLUMNS)
+
+def test_export_csv_and_gzip_match_the_plain_export(tmp_path):
+    storage = make_storage(tmp_path, 12)
+    executor = BlockingExecutor(1, "test")
+    exporter = ExportService(storage, executor, chunk_size=5)
+    csv_body = b"".join(collect(exporter, "csv"))
+    ndjson_body = b"".join(collect(exporter, "ndjson"))
+    compressed = b"".join(collect(exporter, "ndjson", compress=True))
+    articles = b"".join(collect(exporter, "ndjson", post_type="article"))
+    executor.shutdown()
+
+    lines = csv_body.decode().splitlines()
+    assert lines[0] == ",".join(POST_COLUMNS)
+    assert len(lines) == 13
+    assert gzip.decompress(compressed) == ndjson_body
+    assert [json.loads(line)["id"] for line in articles.splitlines()] == ["urn:li:share:0", "urn:li:share:5", "urn:li:share:10"]
+
+def test_export_route_streams_the_synced_history(workdir, monkeypatch):
+    monkeypatch.setattr(settings, "EXPORT_CHUNK_SIZE", 7)
+
+    async def run():
+        fake = FakeLinkedIn(latency=0, posts=30)
+        monkeypatch.setattr(settings, "LINKEDIN_API_BASE_URL", await fake.start())
+        from main import app
+        try:
+            async with app.router.lifespan_context(app):
+                transport = httpx.ASGITransport(app=app)
+                async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                    await client.post("/api/config/credentials",
+                                      json={"client_id": "a", "client_secret": "b", "access_token": "t"})
+                    plain = await client.get("/api/linkedin/export")
+                    compressed = await client.get("/api/linkedin/export", params={"format": "csv", "gzip": "true"})
+        finally:
+            await fake.stop()
+        return plain, compressed
+
+    plain, compressed = asyncio.run(run())
+    assert plain.status_code == 200
+    assert plain.headers["content-type"] == "application/x-ndjson"
+    assert plain.headers["content-disposition"] == 'attachment; filename="linkedin-export.ndjson"'
+    assert "content-length" not in plain.headers
+    ids = [json.loads(line)["id"] for line in plain.content.splitlines()]
+    # Oldest first
+    assert ids == [f"urn:li:ugcPost:{i}" for i in range(30)]
+    assert compressed.headers["content-type"] == "application/gzip"
+    assert len(gzip.decompress(compressed.content).decode().splitlines()) == 31
\ No newline at end of file
@@ -0,0 +1,46 @@
+import asyncio
+import os
+import shutil
+from app.config import settings
+from app.services import media_cache
+from app.services.executor import BlockingExecutor
+from app.services.http_client import LinkedInHttpClient
+from app.services.media_cache import MediaCache
+from benchmarks.fake_linkedin import FakeLinkedIn
+
+def test_original_evicted_before_resizing_is_fetched_again(tmp_path, monkeypatch):
+    evicted = []
+
+    def resize_image(source: str, target: str, width: int, ext: str):
+        # Another worker evicts the original just before the first resize reads it
+        if not evicted:
+            os.remove(source)
+            evicted.append(source)
+        shutil.copyfile(source, target)
+
+    # Pillow is optional; copying stands in for resizing
+    monkeypatch.setattr(media_cache, "thumbnails_available", lambda: True)
+    monkeypatch.setattr(media_cache, "resize_image", resize_image)
+
+    async def run():
+        fake = FakeLinkedIn(latency=0)
+        source = (await fake.start()).removesuffix("/v2") + "/media/800.png"
+        client = LinkedInHttpClient()
+        io, media = BlockingExecutor(1, "io"), BlockingExecutor(1, "media")
+        cache = MediaCache(str(tmp_path), client, io, media, settings.MEDIA_CACHE_MAX_BYTES,
+                           settings.MEDIA_MAX_SOURCE_BYTES)
+        try:
+            digest, ext = await cache.register(source)
+            path, stat_result = await cache.open(digest, ext, 200)
+            return os.path.getsize(path), stat_result.st_size, cache.stats()
+        finally:
+            await client.close()
+            await fake.stop()
+            io.shutdown()
+            media.shutdown()
+
+    size, stat_size, stats = asyncio.run(run())
+    assert evicted
+    assert size == stat_size
+    assert stats["downloads"] == 2
+    assert stats["resized"] == 1
\ No newline at end of file
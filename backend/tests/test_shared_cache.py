@@ -0,0 +1,141 @@
+import asyncio
+import httpx
+from app.config import settings
+from app.services.cache_service import AsyncTTLCache
+from app.services.redis_client import RedisClient
+from app.services.shared_cache import SharedCache, TieredCache
+from benchmarks.fake_linkedin import FakeLinkedIn
+from benchmarks.fake_redis import FakeRedis
+
+KEY = ("account", "profile")
+
+async def start_nodes(count: int):
+    """TieredCache "nodes" sharing one stand-in Redis, as separate workers would"""
+    redis = FakeRedis()
+    url = await redis.start()
+    caches = [TieredCache(AsyncTTLCache(ttl=60), SharedCache(RedisClient(url), "test")) for _ in range(count)]
+    for cache in caches:
+        await cache.start()
+    # Let every node subscribe to invalidations
+    await asyncio.sleep(0.1)
+    return redis, caches
+
+async def stop_nodes(redis: FakeRedis, caches: list):
+    for cache in caches:
+        await cache.stop()
+    await redis.stop()
+
+class Upstream:
+    def __init__(self):
+        self.calls = 0
+
+    async def fetch(self):
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        return {"fetched": self.calls}
+
+def test_cold_key_is_fetched_once_across_nodes():
+    async def run():
+        redis, caches = await start_nodes(4)
+        upstream = Upstream()
+        try:
+            values = await asyncio.gather(*[cache.get_or_fetch(KEY, upstream.fetch, shared=True) for cache in caches])
+            held = [cache.peek(KEY) for cache in caches]
+        finally:
+            await stop_nodes(redis, caches)
+        return upstream.calls, values, held
+
+    calls, values, held = asyncio.run(run())
+    assert calls == 1
+    assert values == [{"fetched": 1}] * 4
+    assert held == values
+
+def test_invalidation_reaches_every_node():
+    async def run():
+        redis, caches = await start_nodes(3)
+        upstream = Upstream()
+        try:
+            await asyncio.gather(*[cache.get_or_fetch(KEY, upstream.fetch, shared=True) for cache in caches])
+            await caches[0].invalidate_resources(*KEY)
+            for _ in range(500):
+                if all(cache.stats()["invalidations_received"] >= 1 for cache in caches[1:]):
+                    break
+                await asyncio.sleep(0.01)
+            dropped = [cache.peek(KEY) for cache in caches]
+            values = await asyncio.gather(*[cache.get_or_fetch(KEY, upstream.fetch, shared=True) for cache in caches])
+        finally:
+            await stop_nodes(redis, caches)
+        return upstream.calls, dropped, values
+
+    calls, dropped, values = asyncio.run(run())
+    assert dropped == [None] * 3
+    # One refetch, shared by every node
+    assert calls == 2
+    assert values == [{"fetched": 2}] * 3
+
+def test_lock_has_one_holder_at_a_time():
+    async def run():
+        redis, caches = await start_nodes(4)
+        holders = 0
+
+        async def refresh(cache: TieredCache):
+            nonlocal holders
+            async with cache.lock("refresh:account") as acquired:
+                if acquired:
+                    holders += 1
+                    await asyncio.sleep(0.05)
+
+        try:
+            await asyncio.gather(*[refresh(cache) for cache in caches])
+            concurrent = holders
+            # Released after the holder finished
+            await refresh(caches[1])
+        finally:
+            await stop_nodes(redis, caches)
+        return concurrent, holders
+
+    assert asyncio.run(run()) == (1, 2)
+
+def test_unreachable_shared_tier_falls_back_to_the_local_cache():
+    async def run():
+        cache = TieredCache(AsyncTTLCache(ttl=60), SharedCache(RedisClient("redis://127.0.0.1:1/0"), "test"))
+        upstream = Upstream()
+        first = await cache.get_or_fetch(KEY, upstream.fetch, shared=True)
+        second = await cache.get_or_fetch(KEY, upstream.fetch, shared=True)
+        return first, second, upstream.calls, cache.stats()
+
+    first, second, calls, stats = asyncio.run(run())
+    assert first == second == {"fetched": 1}
+    assert calls == 1
+    assert stats["l2_errors"] >= 1
+
+def test_etags_survive_cache_invalidation(workdir, monkeypatch):
+    async def run():
+        fake = FakeLinkedIn(latency=0, posts=5)
+        monkeypatch.setattr(settings, "LINKEDIN_API_BASE_URL", await fake.start())
+        from main import app
+        results = {}
+        try:
+            async with app.router.lifespan_context(app):
+                transport = httpx.ASGITransport(app=app)
+                async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                    await client.post("/api/config/credentials",
+                                      json={"client_id": "a", "client_secret": "b", "access_token": "t"})
+                    for path in ("/api/linkedin/profile", "/api/linkedin/posts", "/api/linkedin/analytics"):
+                        # The first request syncs; validators are stable from then on
+                        await client.get(path)
+                        etag = (await client.get(path)).headers["etag"]
+                        app.state.container.response_cache.invalidate()
+                        requests = fake.requests
+                        revalidated = await client.get(path, headers={"If-None-Match": etag})
+                        results[path] = (revalidated.status_code, revalidated.headers.get("etag") == etag,
+                                         fake.requests - requests)
+        finally:
+            await fake.stop()
+        return results
+
+    results = asyncio.run(run())
+    # Stored data answers without LinkedIn; the profile is refetched once to hash it
+    assert results["/api/linkedin/posts"] == (304, True, 0)
+    assert results["/api/linkedin/analytics"] == (304, True, 0)
+    assert results["/api/linkedin/profile"][:2] == (304, True)
\ No newline at end of file
@@ -0,0 +1,35 @@
+import time
+from datetime import datetime, timedelta, timezone
+import pytest
+from app.models.linkedin_data import PostData
+from app.services.storage_service import StorageService
+
+@pytest.fixture
+def local_zone(monkeypatch):
+    """Run with stored times in a zone away from UTC, so aware and naive bounds differ"""
+    monkeypatch.setenv("TZ", "America/New_York")
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+def make_storage(data_dir) -> StorageService:
+    storage = StorageService(str(data_dir))
+    start = datetime(2024, 3, 4)
+    storage.save_posts([
+        PostData(id=f"urn:li:share:{i}", text=f"Post {i}", created_time=start + timedelta(hours=6 * i),
+                 likes_count=1, comments_count=0, shares_count=0, url=None, type="post")
+        for i in range(12)
+    ])
+    return storage
+
+def test_aware_bounds_match_their_local_time(tmp_path, local_zone):
+    storage = make_storage(tmp_path)
+    start, end = datetime(2024, 3, 4, 9), datetime(2024, 3, 6, 15)
+    aware = [bound.astimezone(timezone.utc) for bound in (start, end)]
+
+    naive_days = storage.query_rollups(start, end).fetchall()
+    assert storage.query_rollups(*aware).fetchall() == naive_days
+    assert [day for day, *_ in naive_days] == ["2024-03-04", "2024-03-05", "2024-03-06"]
+    assert sum(row[1] for row in naive_days) == 9
+    assert storage.top_posts(20, *aware) == storage.top_posts(20, start, end)
\ No newline at end of file
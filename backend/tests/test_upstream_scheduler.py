@@ -0,0 +1,119 @@
+import asyncio
+import time
+import pytest
+from app.services.upstream_scheduler import LinkedInAPIError, UpstreamScheduler, UpstreamUnavailable
+
+def make_scheduler(**overrides) -> UpstreamScheduler:
+    options = dict(app_rate=100, app_burst=50, token_rate=50, token_burst=50, max_retries=4,
+                   backoff_base=0.01, backoff_max=0.05, breaker_threshold=3, breaker_cooldown=0.2)
+    return UpstreamScheduler(**{**options, **overrides})
+
+class Upstream:
+    """Answers each call with the next queued error, then succeeds"""
+
+    def __init__(self, *errors: Exception, latency: float = 0.0):
+        self.errors = list(errors)
+        self.latency = latency
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        if self.errors:
+            raise self.errors.pop(0)
+        return {"ok": True}
+
+def throttled(retry_after=None, limit: str = "MEMBER") -> LinkedInAPIError:
+    return LinkedInAPIError(429, f"Resource level throttle {limit} DAY limit for calls to this resource is reached.",
+                            retry_after)
+
+def test_retry_after_is_waited_out_before_retrying():
+    scheduler = make_scheduler()
+    upstream = Upstream(throttled(retry_after=0.3))
+
+    async def run():
+        started = time.perf_counter()
+        result = await scheduler.run("token", upstream)
+        return result, time.perf_counter() - started
+
+    result, elapsed = asyncio.run(run())
+    assert result == {"ok": True}
+    assert upstream.calls == 2
+    assert elapsed >= 0.3
+    assert scheduler.stats()["throttled"] == 1
+
+def test_throttling_does_not_open_the_breaker():
+    scheduler = make_scheduler(breaker_threshold=2)
+    # More 429s in a row than the breaker threshold
+    upstream = Upstream(*[throttled() for _ in range(4)])
+
+    assert asyncio.run(scheduler.run("token", upstream)) == {"ok": True}
+    stats = scheduler.stats()
+    assert stats["circuit"] == "closed"
+    assert stats["failures"] == 0
+    assert stats["throttled"] == 4
+
+def test_server_errors_open_the_breaker_and_short_circuit():
+    scheduler = make_scheduler(max_retries=1, breaker_threshold=2)
+    upstream = Upstream(*[LinkedInAPIError(500, "Internal error") for _ in range(2)])
+
+    async def run():
+        with pytest.raises(LinkedInAPIError):
+            await scheduler.run("token", upstream)
+        with pytest.raises(UpstreamUnavailable) as raised:
+            await scheduler.run("token", upstream)
+        return raised.value
+
+    error = asyncio.run(run())
+    assert error.retry_after > 0
+    # The short-circuited call never reached LinkedIn
+    assert upstream.calls == 2
+    assert scheduler.stats()["circuit"] == "open"
+
+def test_member_limit_pauses_only_that_token():
+    scheduler = make_scheduler()
+
+    async def run():
+        throttled_call = asyncio.ensure_future(scheduler.run("member", Upstream(throttled(retry_after=0.5))))
+        await asyncio.sleep(0.05)
+        started = time.perf_counter()
+        await scheduler.run("other", Upstream())
+        other = time.perf_counter() - started
+        await throttled_call
+        return other
+
+    assert asyncio.run(run()) < 0.2
+
+def test_application_limit_pauses_every_token():
+    scheduler = make_scheduler()
+
+    async def run():
+        throttled_call = asyncio.ensure_future(
+            scheduler.run("member", Upstream(throttled(retry_after=0.5, limit="APPLICATION")))
+        )
+        await asyncio.sleep(0.05)
+        started = time.perf_counter()
+        await scheduler.run("other", Upstream())
+        other = time.perf_counter() - started
+        await throttled_call
+        return other
+
+    # The app quota is shared, so another token's call waits for the pause too
+    assert asyncio.run(run()) >= 0.4
+
+def test_cancelled_half_open_probe_releases_its_slot():
+    scheduler = make_scheduler(max_retries=0, breaker_threshold=1)
+
+    async def run():
+        with pytest.raises(LinkedInAPIError):
+            await scheduler.run("token", Upstream(LinkedInAPIError(500, "Internal error")))
+        await asyncio.sleep(scheduler.breaker.retry_after())
+        probe = asyncio.ensure_future(scheduler.run("token", Upstream(latency=0.2)))
+        await asyncio.sleep(0.05)
+        probe.cancel()
+        await asyncio.gather(probe, return_exceptions=True)
+        released = scheduler.breaker.state == "half_open" and not scheduler.breaker.probing
+        await scheduler.run("token", Upstream())
+        return released, scheduler.breaker.state
+
+    assert asyncio.run(run()) == (True, "closed")
\ No newline at end of file
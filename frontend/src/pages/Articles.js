@@ -70,6 +70,8 @@ function Articles() {
   const [articles, setArticles] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [isConfigured, setIsConfigured] = useState(true);
 
   useEffect(() => {
@@ -86,7 +88,8 @@ function Articles() {
 
       if (status.isConfigured) {
         const data = await linkedinApi.getArticles();
-        setArticles(data);
+        setArticles(data.items);
+        setNextCursor(data.next_cursor);
       } else {
         setArticles(dummyArticles);
         setError('LinkedIn credentials not configured. Showing sample data.');
@@ -101,6 +104,20 @@ function Articles() {
     }
   };
 
+  // Appends the next page after the last loaded article
+  const loadMore = async () => {
+    try {
+      setLoadingMore(true);
+      const data = await linkedinApi.getArticles({ cursor: nextCursor });
+      setArticles((loaded) => [...loaded, ...data.items]);
+      setNextCursor(data.next_cursor);
+    } catch (err) {
+      console.error('Error loading more articles:', err);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const renderSkeleton = () => (
     <Container maxWidth="md">
       <Paper sx={{ p: 4, mt: 4 }}>
@@ -290,6 +307,20 @@ function Articles() {
               </Grid>
             ))}
           </Grid>
+
+          {isConfigured && nextCursor && (
+            <Box display="flex" justifyContent="center" mt={3}>
+              <Button
+                variant="outlined"
+                onClick={loadMore}
+                disabled={loadingMore}
+                startIcon={loadingMore ? <CircularProgress size={16} /> : null}
+                sx={{ borderRadius: 2 }}
+              >
+                Load More Articles
+              </Button>
+            </Box>
+          )}
         </Paper>
       )}
     </Container>
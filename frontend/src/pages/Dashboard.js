@@ -30,17 +30,16 @@ function Dashboard() {
   useEffect(() => {
     const fetchData = async () => {
       try {
-        const [posts, articles] = await Promise.all([
-          linkedinApi.getPosts(),
-          linkedinApi.getArticles(),
+        // Totals cover everything stored, so they come from analytics rather than the (paged) lists;
+        // the chart only needs the newest items, which are on the first page of each list
+        const [analytics, postsPage, articlesPage] = await Promise.all([
+          linkedinApi.getAnalytics(),
+          linkedinApi.getPosts({ limit: 10 }),
+          linkedinApi.getArticles({ limit: 10 }),
         ]);
 
-        const allContent = [...posts, ...articles];
-        const totalLikes = allContent.reduce((sum, item) => sum + (item.likes_count || 0), 0);
-        const totalComments = allContent.reduce((sum, item) => sum + (item.comments_count || 0), 0);
-
         // Prepare engagement data for the chart
-        const engagementData = allContent
+        const engagementData = [...postsPage.items, ...articlesPage.items]
           .sort((a, b) => new Date(b.created_time) - new Date(a.created_time))
           .slice(0, 10)
           .map(item => ({
@@ -50,10 +49,10 @@ function Dashboard() {
           }));
 
         setStats({
-          totalPosts: posts.length,
-          totalArticles: articles.length,
-          totalLikes,
-          totalComments,
+          totalPosts: analytics.totalPosts,
+          totalArticles: analytics.totalArticles,
+          totalLikes: analytics.totalLikes,
+          totalComments: analytics.totalComments,
           engagementData,
         });
       } catch (error) {
@@ -65,6 +65,8 @@ function Posts() {
   const [posts, setPosts] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [isConfigured, setIsConfigured] = useState(true); // Assume configured initially
 
   useEffect(() => {
@@ -82,7 +84,8 @@ function Posts() {
 
       if (status.isConfigured) {
         const data = await linkedinApi.getPosts();
-        setPosts(data);
+        setPosts(data.items);
+        setNextCursor(data.next_cursor);
       } else {
         // If not configured, show dummy data and warning
         setPosts(dummyPosts);
@@ -100,6 +103,20 @@ function Posts() {
     }
   };
 
+  // Appends the next page after the last loaded post
+  const loadMore = async () => {
+    try {
+      setLoadingMore(true);
+      const data = await linkedinApi.getPosts({ cursor: nextCursor });
+      setPosts((loaded) => [...loaded, ...data.items]);
+      setNextCursor(data.next_cursor);
+    } catch (err) {
+      console.error('Error loading more posts:', err);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const renderSkeleton = () => (
     <Container maxWidth="md">
       <Paper sx={{ p: 4, mt: 4 }}>
@@ -265,6 +282,20 @@ function Posts() {
               </Grid>
             ))}
           </Grid>
+
+          {isConfigured && nextCursor && (
+            <Box display="flex" justifyContent="center" mt={3}>
+              <Button
+                variant="outlined"
+                onClick={loadMore}
+                disabled={loadingMore}
+                startIcon={loadingMore ? <CircularProgress size={16} /> : null}
+                sx={{ borderRadius: 2 }}
+              >
+                Load More Posts
+              </Button>
+            </Box>
+          )}
         </Paper>
       )}
     </Container>
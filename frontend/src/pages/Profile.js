@@ -27,7 +27,7 @@ import {
   Error as ErrorIcon,
   Warning as WarningIcon,
 } from '@mui/icons-material';
-import { linkedinApi } from '../services/api';
+import { linkedinApi, mediaUrl } from '../services/api';
 
 const dummyProfile = {
   firstName: 'John',
@@ -199,7 +199,7 @@ function Profile() {
             <Grid item xs={12}>
               <Box display="flex" alignItems="center" gap={3}>
                 <Avatar
-                  src={profile.profilePicture}
+                  src={mediaUrl(profile.profilePicture)}
                   alt={profile.firstName}
                   sx={{ width: 120, height: 120, border: '4px solid #0077B5' }}
                 />
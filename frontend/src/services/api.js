@@ -18,31 +18,51 @@ api.interceptors.response.use(
   }
 );
 
+// Last body and ETag per URL, so repeat views revalidate with If-None-Match instead of re-downloading
+const MAX_CACHED_RESPONSES = 100;
+const responseCache = new Map();
+
+const getConditional = async (url, params) => {
+  const key = api.getUri({ url, params });
+  const cached = responseCache.get(key);
+  const response = await api.get(url, {
+    params,
+    headers: cached ? { 'If-None-Match': cached.etag } : {},
+    validateStatus: (status) => (status >= 200 && status < 300) || (status === 304 && !!cached),
+  });
+  if (response.status === 304) {
+    return cached.data;
+  }
+  const { etag } = response.headers;
+  if (etag) {
+    responseCache.delete(key);
+    responseCache.set(key, { etag, data: response.data });
+    if (responseCache.size > MAX_CACHED_RESPONSES) {
+      responseCache.delete(responseCache.keys().next().value);
+    }
+  }
+  return response.data;
+};
+
+// Media URLs in API responses (such as profilePicture) are paths on the API server; links elsewhere pass through
+export const mediaUrl = (url) => (url && url.startsWith('/') ? api.getUri({ url }) : url);
+
 export const linkedinApi = {
-  getProfile: async () => {
-    const response = await api.get('/api/linkedin/profile');
-    return response.data;
-  },
+  getProfile: async () => getConditional('/api/linkedin/profile'),
 
-  getPosts: async () => {
-    const response = await api.get('/api/linkedin/posts');
-    return response.data;
-  },
+  // Paged: resolves to { items, next_cursor }; pass next_cursor back to load the next page
+  getPosts: async ({ cursor, limit } = {}) => getConditional('/api/linkedin/posts', { cursor, limit }),
 
-  getArticles: async () => {
-    const response = await api.get('/api/linkedin/articles');
-    return response.data;
-  },
+  getArticles: async ({ cursor, limit } = {}) => getConditional('/api/linkedin/articles', { cursor, limit }),
 
-  getAnalytics: async () => {
-    const response = await api.get('/api/linkedin/analytics');
-    return response.data;
-  },
+  // params: { start, end, granularity: 'day' | 'week' | 'month', type: 'post' | 'article', top }
+  getAnalytics: async (params = {}) => getConditional('/api/linkedin/analytics', params),
 };
 
 export const configApi = {
   saveCredentials: async (credentials) => {
     const response = await api.post('/api/config/credentials', credentials);
+    responseCache.clear();
     return response.data;
   },
 
@@ -58,6 +78,8 @@ export const configApi = {
 
   clearCredentials: async () => {
     const response = await api.delete('/api/config/credentials');
+    // Cached bodies belong to the old account
+    responseCache.clear();
     return response.data;
   },
 };